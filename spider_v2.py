@@ -6,8 +6,11 @@ import json
 import signal
 import contextlib
 
+from src import structured_log
+from src.ai_handler import image_fetcher
 from src.config import STATE_FILE
 from src.scraper import scrape_xianyu
+from src.task_runner import attach_prompt_text
 
 
 async def main():
@@ -30,6 +33,7 @@ Usage example:
     parser.add_argument("--config", type=str, default="config.json", help="Specify the task configuration file path (default is config.json）")
     parser.add_argument("--task-name", type=str, help="Run only a single task with the specified name (Used for scheduled task scheduling)")
     args = parser.parse_args()
+    structured_log.install_stdout()
 
     if not os.path.exists(args.config):
         sys.exit(f"mistake: Configuration file '{args.config}' does not exist。")
@@ -62,41 +66,7 @@ Usage example:
 
     # read allpromptFile content
     for task in tasks_config:
-        if task.get("enabled", False) and task.get("ai_prompt_base_file") and task.get("ai_prompt_criteria_file"):
-            try:
-                with open(task["ai_prompt_base_file"], 'r', encoding='utf-8') as f_base:
-                    base_prompt = f_base.read()
-                with open(task["ai_prompt_criteria_file"], 'r', encoding='utf-8') as f_criteria:
-                    criteria_text = f_criteria.read()
-                
-                # dynamically combined into the finalPrompt
-                task['ai_prompt_text'] = base_prompt.replace("{{CRITERIA_SECTION}}", criteria_text)
-                
-                # Verify the generatedpromptIs it valid?
-                if len(task['ai_prompt_text']) < 100:
-                    print(f"warn: Task '{task['task_name']}' generatedprompttoo short ({len(task['ai_prompt_text'])} character)，There may be a problem。")
-                elif "{{CRITERIA_SECTION}}" in task['ai_prompt_text']:
-                    print(f"warn: Task '{task['task_name']}' ofpromptstill contains placeholders, replacement may fail。")
-                else:
-                    print(f"✅ Task '{task['task_name']}' ofpromptGenerated successfully, length: {len(task['ai_prompt_text'])} character")
-
-            except FileNotFoundError as e:
-                print(f"warn: Task '{task['task_name']}' ofpromptFile missing: {e}，of this taskAIAnalysis will be skipped。")
-                task['ai_prompt_text'] = ""
-            except Exception as e:
-                print(f"mistake: Task '{task['task_name']}' deal withpromptException occurred while file: {e}，of this taskAIAnalysis will be skipped。")
-                task['ai_prompt_text'] = ""
-        elif task.get("enabled", False) and task.get("ai_prompt_file"):
-            try:
-                with open(task["ai_prompt_file"], 'r', encoding='utf-8') as f:
-                    task['ai_prompt_text'] = f.read()
-                print(f"✅ Task '{task['task_name']}' ofpromptFile read successfully, length: {len(task['ai_prompt_text'])} character")
-            except FileNotFoundError:
-                print(f"warn: Task '{task['task_name']}' ofpromptdocument '{task['ai_prompt_file']}' Not found, the task'sAIAnalysis will be skipped。")
-                task['ai_prompt_text'] = ""
-            except Exception as e:
-                print(f"mistake: Task '{task['task_name']}' readpromptException occurred while file: {e}，of this taskAIAnalysis will be skipped。")
-                task['ai_prompt_text'] = ""
+        attach_prompt_text(task)
 
     print("\n--- Start monitoring tasks ---")
     if args.debug_limit > 0:
@@ -157,6 +127,7 @@ Usage example:
         shutdown_task.cancel()
         with contextlib.suppress(asyncio.CancelledError):
             await shutdown_task
+        await image_fetcher.aclose()
 
     print("\n--- All tasks completed ---")
     for i, result in enumerate(results):
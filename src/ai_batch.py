@@ -0,0 +1,183 @@
+import asyncio
+import json
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from src.ai_handler import (
+    analyze_prepared_item,
+    build_image_content,
+    client,
+    get_ai_analysis,
+    lookup_cached_analysis,
+    prepare_ai_images,
+    request_ai_analysis,
+    safe_print,
+    store_analysis_result,
+    validate_ai_response_format,
+    write_ai_request_log,
+)
+from src.image_fetcher import FetchedImage
+
+
+@dataclass
+class _BatchEntry:
+    product_data: dict
+    ai_images: List[FetchedImage]
+    cache_key: Optional[str]
+    future: asyncio.Future = field(repr=False)
+
+
+def _batch_instructions(count: int) -> str:
+    return f"""
+The {count} offers above are independent. Analyse each one on its own, exactly as described in the requirements.
+Reply with a single JSON object of the form {{"results": [{{"item": "<item number>", "analysis": <analysis object>}}, ...]}}
+with exactly one entry per offer, in the same order. Every analysis object must have the full structure required above.
+"""
+
+
+def _is_batch_response(parsed_response) -> bool:
+    return isinstance(parsed_response, dict) and isinstance(parsed_response.get("results"), list)
+
+
+class AIBatchAnalyzer:
+    """
+    Groups text-only / low-image items of one task into a single model request.
+
+    Items are queued until batch_size is reached or max_wait seconds passed since the
+    first queued item. The prompt is sent once per batch and the model answers with a
+    per-item JSON array; entries that are missing or fail validate_ai_response_format
+    are re-analysed with a normal per-item call. Items with more pictures than
+    max_images_per_item never enter a batch. The output budget of a batch is
+    max_tokens_per_item per item, capped at max_tokens (the model's output limit).
+    """
+
+    def __init__(
+        self,
+        prompt_text: str,
+        batch_size: int = 4,
+        max_wait: float = 60.0,
+        max_images_per_item: int = 1,
+        max_tokens: int = 4096,
+        max_tokens_per_item: int = 4000,
+    ):
+        self.prompt_text = prompt_text
+        self.batch_size = max(1, batch_size)
+        self.max_wait = max(0.0, max_wait)
+        self.max_images_per_item = max(0, max_images_per_item)
+        self.max_tokens = max(1, max_tokens)
+        self.max_tokens_per_item = max(1, max_tokens_per_item)
+        self._pending: List[_BatchEntry] = []
+        self._timer: Optional[asyncio.Task] = None
+        self._inflight: set = set()
+
+    async def analyze(self, product_data: dict, images: Optional[List[FetchedImage]] = None) -> Optional[dict]:
+        images = images or []
+        if not client or not self.prompt_text or len(images) > self.max_images_per_item:
+            return await get_ai_analysis(product_data, prompt_text=self.prompt_text, images=images)
+
+        ai_images = await prepare_ai_images(images=images)
+        cache_key, cached_result = await lookup_cached_analysis(product_data, ai_images, self.prompt_text)
+        if cached_result is not None:
+            safe_print("   [AIanalyze] Identical request found in the AI cache, model call skipped")
+            return cached_result
+
+        entry = _BatchEntry(product_data, ai_images, cache_key, asyncio.get_running_loop().create_future())
+        self._pending.append(entry)
+        safe_print(f"   [AIanalyze] Queued for batch analysis ({len(self._pending)}/{self.batch_size})")
+        if len(self._pending) >= self.batch_size:
+            self._start_flush()
+        elif self._timer is None:
+            self._timer = asyncio.create_task(self._flush_after_wait())
+        return await entry.future
+
+    async def _flush_after_wait(self) -> None:
+        await asyncio.sleep(self.max_wait)
+        self._timer = None
+        self._start_flush()
+
+    def _start_flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch = [entry for entry in self._pending if not entry.future.done()]
+        self._pending = []
+        if batch:
+            task = asyncio.create_task(self._run_batch(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def flush(self) -> None:
+        """Send whatever is queued now and wait for all running batches"""
+        self._start_flush()
+        if self._inflight:
+            await asyncio.gather(*list(self._inflight), return_exceptions=True)
+
+    def _build_messages(self, batch: List[_BatchEntry]) -> list:
+        content = [{"type": "text", "text": self.prompt_text}]
+        for number, entry in enumerate(batch, 1):
+            product_details_json = json.dumps(entry.product_data, ensure_ascii=False, indent=2)
+            content.append({"type": "text", "text": f"### Offer {number}\n```json\n{product_details_json}\n```"})
+            content.extend(build_image_content(entry.ai_images))
+        content.append({"type": "text", "text": _batch_instructions(len(batch))})
+        return [{"role": "user", "content": content}]
+
+    @staticmethod
+    def _match_results(batch: List[_BatchEntry], results: list) -> List[Optional[dict]]:
+        matched: List[Optional[dict]] = [None] * len(batch)
+        for position, entry in enumerate(results):
+            if not isinstance(entry, dict):
+                continue
+            analysis = entry.get("analysis", entry)
+            try:
+                index = int(entry.get("item", position + 1)) - 1
+            except (TypeError, ValueError):
+                index = position
+            if 0 <= index < len(batch) and matched[index] is None and isinstance(analysis, dict):
+                matched[index] = analysis
+        return matched
+
+    async def _run_batch(self, batch: List[_BatchEntry]) -> None:
+        safe_print(f"\n   [AIanalyze] Sending a batch of {len(batch)} products in one request...")
+        write_ai_request_log({
+            "task_name": batch[0].product_data.get("Task name") or "unknown",
+            "product_ids": [(e.product_data.get("Product information") or {}).get("commodityID") for e in batch],
+            "image_count": sum(len(e.ai_images) for e in batch),
+            "batch_size": len(batch),
+        })
+        usage = {"prompt_tokens": 0, "completion_tokens": 0}
+        analyses: List[Optional[dict]] = [None] * len(batch)
+        try:
+            parsed = await request_ai_analysis(
+                self._build_messages(batch),
+                usage,
+                validator=_is_batch_response,
+                max_tokens=min(self.max_tokens, self.max_tokens_per_item * len(batch)),
+            )
+            if _is_batch_response(parsed):
+                analyses = self._match_results(batch, parsed["results"])
+        except Exception as e:
+            safe_print(f"   [AIanalyze] Batch request failed, analysing items one by one: {e}")
+
+        share = len(batch)
+        fallbacks = []
+        for entry, analysis in zip(batch, analyses):
+            if analysis is not None and validate_ai_response_format(analysis):
+                await store_analysis_result(entry.cache_key, analysis, usage["prompt_tokens"] // share, usage["completion_tokens"] // share)
+                if not entry.future.done():
+                    entry.future.set_result(analysis)
+            else:
+                fallbacks.append(entry)
+
+        if fallbacks:
+            safe_print(f"   [AIanalyze] {len(fallbacks)}/{len(batch)} batch results invalid, falling back to single requests")
+            await asyncio.gather(*(self._run_single(entry) for entry in fallbacks))
+
+    async def _run_single(self, entry: _BatchEntry) -> None:
+        try:
+            result = await analyze_prepared_item(entry.product_data, entry.ai_images, self.prompt_text, entry.cache_key)
+        except Exception as e:
+            if not entry.future.done():
+                entry.future.set_exception(e)
+            return
+        if not entry.future.done():
+            entry.future.set_result(result)
@@ -0,0 +1,182 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Iterable, Optional
+
+
+# Fields that change between crawls of the same listing without changing what the model sees as relevant
+VOLATILE_PRODUCT_FIELDS = {
+    "Views",
+    '“"Want" number of people',
+    "Product link",
+    "Product picture list",
+    "Product main image link",
+    "commodityID",
+}
+VOLATILE_SELLER_FIELDS = {"Product list posted by seller"}
+
+
+def normalize_product(product_data: dict) -> dict:
+    """Reduce a crawl record to the fields that identify the listing content"""
+    item_info = product_data.get("Product information") or {}
+    seller_info = product_data.get("Seller information") or {}
+    return {
+        "product": {k: v for k, v in item_info.items() if k not in VOLATILE_PRODUCT_FIELDS},
+        "seller": {k: v for k, v in seller_info.items() if k not in VOLATILE_SELLER_FIELDS},
+    }
+
+
+def analysis_cache_key(product_data: dict, image_blobs: Iterable[bytes], prompt_text: str, model_name: str) -> str:
+    """Content address of one AI analysis request"""
+    digest = hashlib.sha256()
+    for part in (
+        json.dumps(normalize_product(product_data), ensure_ascii=False, sort_keys=True),
+        ",".join(hashlib.sha256(blob).hexdigest() for blob in image_blobs),
+        prompt_text or "",
+        model_name or "",
+    ):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class AIResultCache:
+    """
+    Persistent cache of AI analysis results, shared by all spider processes.
+
+    Entries expire after ttl seconds; beyond max_entries the least recently used ones
+    are evicted. Each entry remembers the tokens its original call consumed so hits
+    can be reported as saved tokens.
+    """
+
+    def __init__(self, db_path: str, ttl: int = 7 * 24 * 3600, max_entries: int = 20000):
+        self.db_path = db_path
+        self.ttl = max(0, int(ttl))
+        self.max_entries = max(1, int(max_entries))
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            db_dir = os.path.dirname(self.db_path)
+            if db_dir:
+                os.makedirs(db_dir, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS ai_results (
+                    cache_key TEXT PRIMARY KEY,
+                    result TEXT NOT NULL,
+                    model_name TEXT,
+                    prompt_tokens INTEGER NOT NULL DEFAULT 0,
+                    completion_tokens INTEGER NOT NULL DEFAULT 0,
+                    created_at REAL NOT NULL,
+                    last_used_at REAL NOT NULL,
+                    hits INTEGER NOT NULL DEFAULT 0
+                );
+                CREATE INDEX IF NOT EXISTS idx_ai_results_last_used ON ai_results(last_used_at);
+                CREATE TABLE IF NOT EXISTS ai_cache_stats (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    hits INTEGER NOT NULL DEFAULT 0,
+                    misses INTEGER NOT NULL DEFAULT 0,
+                    saved_prompt_tokens INTEGER NOT NULL DEFAULT 0,
+                    saved_completion_tokens INTEGER NOT NULL DEFAULT 0
+                );
+                INSERT OR IGNORE INTO ai_cache_stats (id) VALUES (1);
+                """
+            )
+            self._conn = conn
+        return self._conn
+
+    def get(self, cache_key: str) -> Optional[dict]:
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT result, created_at, prompt_tokens, completion_tokens FROM ai_results WHERE cache_key = ?",
+                (cache_key,),
+            ).fetchone()
+            if row and self.ttl and now - row[1] >= self.ttl:
+                conn.execute("DELETE FROM ai_results WHERE cache_key = ?", (cache_key,))
+                row = None
+            if row:
+                conn.execute(
+                    "UPDATE ai_results SET last_used_at = ?, hits = hits + 1 WHERE cache_key = ?",
+                    (now, cache_key),
+                )
+                conn.execute(
+                    "UPDATE ai_cache_stats SET hits = hits + 1, saved_prompt_tokens = saved_prompt_tokens + ?, "
+                    "saved_completion_tokens = saved_completion_tokens + ? WHERE id = 1",
+                    (row[2], row[3]),
+                )
+            else:
+                conn.execute("UPDATE ai_cache_stats SET misses = misses + 1 WHERE id = 1")
+            conn.commit()
+        return json.loads(row[0]) if row else None
+
+    def put(self, cache_key: str, result: dict, model_name: str = "", prompt_tokens: int = 0, completion_tokens: int = 0) -> None:
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT INTO ai_results (cache_key, result, model_name, prompt_tokens, completion_tokens, created_at, last_used_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(cache_key) DO UPDATE SET result = excluded.result, model_name = excluded.model_name, "
+                "prompt_tokens = excluded.prompt_tokens, completion_tokens = excluded.completion_tokens, "
+                "created_at = excluded.created_at, last_used_at = excluded.last_used_at",
+                (cache_key, json.dumps(result, ensure_ascii=False), model_name, prompt_tokens, completion_tokens, now, now),
+            )
+            self._evict(conn, now)
+            conn.commit()
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        if self.ttl:
+            conn.execute("DELETE FROM ai_results WHERE created_at <= ?", (now - self.ttl,))
+        overflow = conn.execute("SELECT COUNT(*) FROM ai_results").fetchone()[0] - self.max_entries
+        if overflow > 0:
+            conn.execute(
+                "DELETE FROM ai_results WHERE cache_key IN "
+                "(SELECT cache_key FROM ai_results ORDER BY last_used_at ASC LIMIT ?)",
+                (overflow,),
+            )
+
+    def stats(self) -> dict:
+        with self._lock:
+            conn = self._connect()
+            hits, misses, saved_prompt, saved_completion = conn.execute(
+                "SELECT hits, misses, saved_prompt_tokens, saved_completion_tokens FROM ai_cache_stats WHERE id = 1"
+            ).fetchone()
+            entries = conn.execute("SELECT COUNT(*) FROM ai_results").fetchone()[0]
+        total = hits + misses
+        return {
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / total, 4) if total else 0.0,
+            "saved_prompt_tokens": saved_prompt,
+            "saved_completion_tokens": saved_completion,
+            "saved_tokens": saved_prompt + saved_completion,
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM ai_results")
+            conn.execute(
+                "UPDATE ai_cache_stats SET hits = 0, misses = 0, saved_prompt_tokens = 0, "
+                "saved_completion_tokens = 0 WHERE id = 1"
+            )
+            conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -2,7 +2,7 @@ import asyncio
 import base64
 import json
 import os
-import re
+import sqlite3
 import sys
 import shutil
 from datetime import datetime, timedelta
@@ -18,7 +18,21 @@ if sys.platform.startswith('win'):
 
 from src.config import (
     AI_DEBUG_MODE,
+    AI_CACHE_DB,
+    AI_CACHE_ENABLED,
+    AI_CACHE_MAX_ENTRIES,
+    AI_CACHE_TTL_SECONDS,
+    AI_IMAGE_FORMAT,
+    AI_IMAGE_MAX_EDGE,
+    AI_IMAGE_PREPROCESS_ENABLED,
+    AI_IMAGE_QUALITY,
+    AI_MAX_IMAGES_PER_ITEM,
     IMAGE_DOWNLOAD_HEADERS,
+    IMAGE_ITEM_MAX_BYTES,
+    IMAGE_ITEM_TIMEOUT_SECONDS,
+    IMAGE_MAX_BYTES,
+    IMAGE_MAX_CONNECTIONS,
+    IMAGE_PER_HOST_CONCURRENCY,
     IMAGE_SAVE_DIR,
     TASK_IMAGE_DIR_PREFIX,
     MODEL_NAME,
@@ -39,11 +53,20 @@ from src.config import (
     ENABLE_RESPONSE_FORMAT,
     client,
 )
+from src import structured_log
+from src.ai_cache import AIResultCache, analysis_cache_key
+from src.image_fetcher import ImageFetcher
+from src.image_preprocess import ImagePreprocessor
 from src.utils import convert_goofish_link, retry_on_failure
 
 
-def safe_print(text):
-    """Safe printing functions that handle encoding errors"""
+def safe_print(text, level: str = "info"):
+    """Safe printing functions that handle encoding errors; level is used by the structured log mode"""
+    if structured_log.json_mode():
+        structured_log.log_event(str(text).strip(), level)
+        return
+    if not structured_log.enabled(level):
+        return
     try:
         print(text)
     except UnicodeEncodeError:
@@ -55,61 +78,37 @@ def safe_print(text):
             print("[Output contains characters that cannot be displayed]")
 
 
-@retry_on_failure(retries=2, delay=3)
-async def _download_single_image(url, save_path):
-    """An internal function with retries for asynchronously downloading a single image。"""
-    loop = asyncio.get_running_loop()
-    # use run_in_executor run synchronized requests code to avoid blocking the event loop
-    response = await loop.run_in_executor(
-        None,
-        lambda: requests.get(url, headers=IMAGE_DOWNLOAD_HEADERS, timeout=20, stream=True)
-    )
-    response.raise_for_status()
-    with open(save_path, 'wb') as f:
-        for chunk in response.iter_content(chunk_size=8192):
-            f.write(chunk)
-    return save_path
-
-
-async def download_all_images(product_id, image_urls, task_name="default"):
-    """Download all images of a product asynchronously. Skip if image already exists。Support task isolation。"""
-    if not image_urls:
-        return []
-
-    # Create separate image directories for each task
-    task_image_dir = os.path.join(IMAGE_SAVE_DIR, f"{TASK_IMAGE_DIR_PREFIX}{task_name}")
-    os.makedirs(task_image_dir, exist_ok=True)
+# Keep-alive image client shared by every item of this process
+image_fetcher = ImageFetcher(
+    headers=IMAGE_DOWNLOAD_HEADERS,
+    max_connections=IMAGE_MAX_CONNECTIONS,
+    per_host_concurrency=IMAGE_PER_HOST_CONCURRENCY,
+    max_image_bytes=IMAGE_MAX_BYTES,
+    max_item_bytes=IMAGE_ITEM_MAX_BYTES,
+    item_timeout=IMAGE_ITEM_TIMEOUT_SECONDS,
+)
 
-    urls = [url.strip() for url in image_urls if url.strip().startswith('http')]
-    if not urls:
-        return []
+# Downscale / re-encode stage applied to every picture sent to AI
+image_preprocessor = ImagePreprocessor(
+    max_edge=AI_IMAGE_MAX_EDGE,
+    image_format=AI_IMAGE_FORMAT,
+    quality=AI_IMAGE_QUALITY,
+    max_images=AI_MAX_IMAGES_PER_ITEM,
+)
 
-    saved_paths = []
-    total_images = len(urls)
-    for i, url in enumerate(urls):
-        try:
-            clean_url = url.split('.heic')[0] if '.heic' in url else url
-            file_name_base = os.path.basename(clean_url).split('?')[0]
-            file_name = f"product_{product_id}_{i + 1}_{file_name_base}"
-            file_name = re.sub(r'[\\/*?:"<>|]', "", file_name)
-            if not os.path.splitext(file_name)[1]:
-                file_name += ".jpg"
-
-            save_path = os.path.join(task_image_dir, file_name)
-
-            if os.path.exists(save_path):
-                safe_print(f"   [picture] picture {i + 1}/{total_images} Already exists, skip download: {os.path.basename(save_path)}")
-                saved_paths.append(save_path)
-                continue
+# Content-addressed cache of analysis results shared by all spider processes
+ai_result_cache = AIResultCache(AI_CACHE_DB, ttl=AI_CACHE_TTL_SECONDS, max_entries=AI_CACHE_MAX_ENTRIES) if AI_CACHE_ENABLED else None
 
-            safe_print(f"   [picture] Downloading pictures {i + 1}/{total_images}: {url}")
-            if await _download_single_image(url, save_path):
-                safe_print(f"   [picture] picture {i + 1}/{total_images} Successfully downloaded to: {os.path.basename(save_path)}")
-                saved_paths.append(save_path)
-        except Exception as e:
-            safe_print(f"   [picture] Process pictures {url} An error occurred and this image has been skipped: {e}")
 
-    return saved_paths
+async def fetch_product_images(product_id, image_urls):
+    """Download all images of a product concurrently into memory, ready to be sent to AI。"""
+    urls = [url.strip() for url in (image_urls or []) if url.strip().startswith('http')]
+    if not urls:
+        return []
+    safe_print(f"   [picture] Downloading {len(urls)} pictures of product #{product_id}...", level="debug")
+    images = await image_fetcher.fetch_all(urls)
+    safe_print(f"   [picture] {len(images)}/{len(urls)} pictures downloaded, {sum(len(img.data) for img in images)} bytes", level="debug")
+    return images
 
 
 def cleanup_task_images(task_name):
@@ -120,7 +119,7 @@ def cleanup_task_images(task_name):
             shutil.rmtree(task_image_dir)
             safe_print(f"   [clean up] Task deleted '{task_name}' Temporary picture directory: {task_image_dir}")
         except Exception as e:
-            safe_print(f"   [clean up] Delete task '{task_name}' An error occurred while creating the temporary image directory: {e}")
+            safe_print(f"   [clean up] Delete task '{task_name}' An error occurred while creating the temporary image directory: {e}", level="warning")
     else:
         safe_print(f"   [clean up] Task '{task_name}' The temporary picture directory does not exist: {task_image_dir}")
 
@@ -138,19 +137,7 @@ def cleanup_ai_logs(logs_dir: str, keep_days: int = 1) -> None:
             if timestamp < cutoff:
                 os.remove(os.path.join(logs_dir, filename))
     except Exception as e:
-        safe_print(f"   [log] clean upAIError while logging: {e}")
-
-
-def encode_image_to_base64(image_path):
-    """Encode local image files to Base64 string。"""
-    if not image_path or not os.path.exists(image_path):
-        return None
-    try:
-        with open(image_path, "rb") as image_file:
-            return base64.b64encode(image_file.read()).decode('utf-8')
-    except Exception as e:
-        safe_print(f"Error while encoding image: {e}")
-        return None
+        safe_print(f"   [log] clean upAIError while logging: {e}", level="warning")
 
 
 def validate_ai_response_format(parsed_response):
@@ -166,27 +153,27 @@ def validate_ai_response_format(parsed_response):
     # Check top-level fields
     for field in required_fields:
         if field not in parsed_response:
-            safe_print(f"   [AIanalyze] Warning: Response is missing a required field '{field}'")
+            safe_print(f"   [AIanalyze] Warning: Response is missing a required field '{field}'", level="warning")
             return False
 
     # examinecriteria_analysisWhether it is a dictionary and not empty
     criteria_analysis = parsed_response.get("criteria_analysis", {})
     if not isinstance(criteria_analysis, dict) or not criteria_analysis:
-        safe_print("   [AIanalyze] warn：criteria_analysisMust be a non-empty dictionary")
+        safe_print("   [AIanalyze] warn：criteria_analysisMust be a non-empty dictionary", level="warning")
         return False
 
     # examineseller_typeField (required for all products）
     if "seller_type" not in criteria_analysis:
-        safe_print("   [AIanalyze] warn：criteria_analysisMissing required field 'seller_type'")
+        safe_print("   [AIanalyze] warn：criteria_analysisMissing required field 'seller_type'", level="warning")
         return False
 
     # Check data type
     if not isinstance(parsed_response.get("is_recommended"), bool):
-        safe_print("   [AIanalyze] warn：is_recommendedField is not of type boolean")
+        safe_print("   [AIanalyze] warn：is_recommendedField is not of type boolean", level="warning")
         return False
 
     if not isinstance(parsed_response.get("risk_tags"), list):
-        safe_print("   [AIanalyze] warn：risk_tagsField is not a list type")
+        safe_print("   [AIanalyze] warn：risk_tagsField is not a list type", level="warning")
         return False
 
     return True
@@ -196,7 +183,7 @@ def validate_ai_response_format(parsed_response):
 async def send_ntfy_notification(product_data, reason):
     """When a recommended product is found, a high-priority message is sent asynchronously ntfy.sh notify。"""
     if not NTFY_TOPIC_URL and not WX_BOT_URL and not (GOTIFY_URL and GOTIFY_TOKEN) and not BARK_URL and not (TELEGRAM_BOT_TOKEN and TELEGRAM_CHAT_ID) and not WEBHOOK_URL:
-        safe_print("Warning: not present .env Configure any notification services in the file (NTFY_TOPIC_URL, WX_BOT_URL, GOTIFY_URL/TOKEN, BARK_URL, TELEGRAM_BOT_TOKEN/CHAT_ID, WEBHOOK_URL)，Skip notification。")
+        safe_print("Warning: not present .env Configure any notification services in the file (NTFY_TOPIC_URL, WX_BOT_URL, GOTIFY_URL/TOKEN, BARK_URL, TELEGRAM_BOT_TOKEN/CHAT_ID, WEBHOOK_URL)，Skip notification。", level="warning")
         return
 
     title = product_data.get('Product title', 'N/A')
@@ -230,7 +217,7 @@ async def send_ntfy_notification(product_data, reason):
             )
             safe_print("   -> ntfy Notification sent successfully。")
         except Exception as e:
-            safe_print(f"   -> send ntfy Notification failed: {e}")
+            safe_print(f"   -> send ntfy Notification failed: {e}", level="warning")
 
     # --- send Gotify notify ---
     if GOTIFY_URL and GOTIFY_TOKEN:
@@ -257,9 +244,9 @@ async def send_ntfy_notification(product_data, reason):
             response.raise_for_status()
             safe_print("   -> Gotify Notification sent successfully。")
         except requests.exceptions.RequestException as e:
-            safe_print(f"   -> send Gotify Notification failed: {e}")
+            safe_print(f"   -> send Gotify Notification failed: {e}", level="warning")
         except Exception as e:
-            safe_print(f"   -> send Gotify An unknown error occurred while notifying: {e}")
+            safe_print(f"   -> send Gotify An unknown error occurred while notifying: {e}", level="warning")
 
     # --- send Bark notify ---
     if BARK_URL:
@@ -301,9 +288,9 @@ async def send_ntfy_notification(product_data, reason):
             response.raise_for_status()
             safe_print("   -> Bark Notification sent successfully。")
         except requests.exceptions.RequestException as e:
-            safe_print(f"   -> send Bark Notification failed: {e}")
+            safe_print(f"   -> send Bark Notification failed: {e}", level="warning")
         except Exception as e:
-            safe_print(f"   -> send Bark An unknown error occurred while notifying: {e}")
+            safe_print(f"   -> send Bark An unknown error occurred while notifying: {e}", level="warning")
 
     # --- Send enterprise WeChat robot notifications ---
     if WX_BOT_URL:
@@ -356,7 +343,7 @@ async def send_ntfy_notification(product_data, reason):
         except requests.exceptions.RequestException as e:
             safe_print(f"   -> Failed to send corporate WeChat notification: {e}")
         except Exception as e:
-            safe_print(f"   -> An unknown error occurred while sending corporate WeChat notifications: {e}")
+            safe_print(f"   -> An unknown error occurred while sending corporate WeChat notifications: {e}", level="warning")
 
     # --- send Telegram Bot notifications ---
     if TELEGRAM_BOT_TOKEN and TELEGRAM_CHAT_ID:
@@ -402,11 +389,11 @@ async def send_ntfy_notification(product_data, reason):
             if result.get("ok"):
                 safe_print("   -> Telegram Notification sent successfully。")
             else:
-                safe_print(f"   -> Telegram Notification failed to send: {result.get('description', 'unknown error')}")
+                safe_print(f"   -> Telegram Notification failed to send: {result.get('description', 'unknown error')}", level="warning")
         except requests.exceptions.RequestException as e:
-            safe_print(f"   -> send Telegram Notification failed: {e}")
+            safe_print(f"   -> send Telegram Notification failed: {e}", level="warning")
         except Exception as e:
-            safe_print(f"   -> send Telegram An unknown error occurred while notifying: {e}")
+            safe_print(f"   -> send Telegram An unknown error occurred while notifying: {e}", level="warning")
 
     # --- send universal Webhook notify ---
     if WEBHOOK_URL:
@@ -429,7 +416,7 @@ async def send_ntfy_notification(product_data, reason):
                 try:
                     headers = json.loads(WEBHOOK_HEADERS)
                 except json.JSONDecodeError:
-                    safe_print(f"   -> [warn] Webhook The request header format is wrong, please check .env in WEBHOOK_HEADERS。")
+                    safe_print(f"   -> [warn] Webhook The request header format is wrong, please check .env in WEBHOOK_HEADERS。", level="warning")
 
             loop = asyncio.get_running_loop()
 
@@ -448,7 +435,7 @@ async def send_ntfy_notification(product_data, reason):
                         url_parts[4] = urlencode(query)
                         final_url = urlunparse(url_parts)
                     except json.JSONDecodeError:
-                        safe_print(f"   -> [warn] Webhook Query parameter format is wrong, please check .env in WEBHOOK_QUERY_PARAMETERS。")
+                        safe_print(f"   -> [warn] Webhook Query parameter format is wrong, please check .env in WEBHOOK_QUERY_PARAMETERS。", level="warning")
 
                 response = await loop.run_in_executor(
                     None,
@@ -470,7 +457,7 @@ async def send_ntfy_notification(product_data, reason):
                         url_parts[4] = urlencode(query)
                         final_url = urlunparse(url_parts)
                     except json.JSONDecodeError:
-                        safe_print(f"   -> [warn] Webhook Query parameter format is wrong, please check .env in WEBHOOK_QUERY_PARAMETERS。")
+                        safe_print(f"   -> [warn] Webhook Query parameter format is wrong, please check .env in WEBHOOK_QUERY_PARAMETERS。", level="warning")
 
                 # Prepare request body
                 data = None
@@ -488,44 +475,128 @@ async def send_ntfy_notification(product_data, reason):
                             if 'Content-Type' not in headers and 'content-type' not in headers:
                                 headers['Content-Type'] = 'application/x-www-form-urlencoded'
                         else:
-                            safe_print(f"   -> [warn] Not supported WEBHOOK_CONTENT_TYPE: {WEBHOOK_CONTENT_TYPE}。")
+                            safe_print(f"   -> [warn] Not supported WEBHOOK_CONTENT_TYPE: {WEBHOOK_CONTENT_TYPE}。", level="warning")
                     except json.JSONDecodeError:
-                        safe_print(f"   -> [warn] Webhook The request body format is wrong, please check .env in WEBHOOK_BODY。")
+                        safe_print(f"   -> [warn] Webhook The request body format is wrong, please check .env in WEBHOOK_BODY。", level="warning")
 
                 response = await loop.run_in_executor(
                     None,
                     lambda: requests.post(final_url, headers=headers, json=json_payload, data=data, timeout=15)
                 )
             else:
-                safe_print(f"   -> [warn] Not supported WEBHOOK_METHOD: {WEBHOOK_METHOD}。")
+                safe_print(f"   -> [warn] Not supported WEBHOOK_METHOD: {WEBHOOK_METHOD}。", level="warning")
                 return
 
             response.raise_for_status()
             safe_print(f"   -> Webhook Notification sent successfully. status code: {response.status_code}")
 
         except requests.exceptions.RequestException as e:
-            safe_print(f"   -> send Webhook Notification failed: {e}")
+            safe_print(f"   -> send Webhook Notification failed: {e}", level="warning")
         except Exception as e:
-            safe_print(f"   -> send Webhook An unknown error occurred while notifying: {e}")
+            safe_print(f"   -> send Webhook An unknown error occurred while notifying: {e}", level="warning")
 
 
-@retry_on_failure(retries=3, delay=5)
-async def get_ai_analysis(product_data, image_paths=None, prompt_text=""):
-    """complete productJSONData and all images are sent to AI Perform analysis (asynchronous）。"""
+async def prepare_ai_images(images=None):
+    """Apply the downscale / re-encode stage to the in-memory pictures of one item。"""
+    ai_images = list(images or [])
+    if AI_IMAGE_PREPROCESS_ENABLED and ai_images:
+        ai_images, image_stats = await asyncio.to_thread(image_preprocessor.process, ai_images)
+        safe_print(f"   [picture] AIImage payload: {image_stats.summary()}")
+    elif AI_MAX_IMAGES_PER_ITEM:
+        ai_images = ai_images[:AI_MAX_IMAGES_PER_ITEM]
+    return ai_images
+
+
+def build_image_content(ai_images):
+    """Turn prepared pictures into chat message image parts。"""
+    content = []
+    for image in ai_images:
+        base64_image = base64.b64encode(image.data).decode('utf-8')
+        content.append(
+            {"type": "image_url", "image_url": {"url": f"data:{image.content_type};base64,{base64_image}"}})
+    return content
+
+
+def _lookup_cached_analysis(product_data, ai_images, prompt_text):
+    cache_key = analysis_cache_key(product_data, (img.data for img in ai_images), prompt_text, MODEL_NAME)
+    return cache_key, ai_result_cache.get(cache_key)
+
+
+async def lookup_cached_analysis(product_data, ai_images, prompt_text):
+    """Return (cache_key, cached result or None) for one prepared item; hashing and SQLite run off the loop。"""
+    if not ai_result_cache:
+        return None, None
+    try:
+        return await asyncio.to_thread(_lookup_cached_analysis, product_data, ai_images, prompt_text)
+    except sqlite3.Error as e:
+        safe_print(f"   [AIanalyze] AI cache unavailable: {e}")
+        return None, None
+
+
+async def store_analysis_result(cache_key, parsed_response, prompt_tokens=0, completion_tokens=0):
+    if not (ai_result_cache and cache_key and parsed_response and validate_ai_response_format(parsed_response)):
+        return
+    try:
+        await asyncio.to_thread(ai_result_cache.put, cache_key, parsed_response, MODEL_NAME, prompt_tokens, completion_tokens)
+    except sqlite3.Error as e:
+        safe_print(f"   [AIanalyze] Failed to store the result in the AI cache: {e}")
+
+
+def write_ai_request_log(payload):
+    """Save a summary of the request sent to AI under logs/ai。"""
+    try:
+        # createlogsfolder
+        logs_dir = os.path.join("logs", "ai")
+        os.makedirs(logs_dir, exist_ok=True)
+        cleanup_ai_logs(logs_dir, keep_days=1)
+
+        # Generate log file name (current time）
+        current_time = datetime.now().strftime("%Y%m%d_%H%M%S")
+        log_filename = f"{current_time}.log"
+        log_filepath = os.path.join(logs_dir, log_filename)
+
+        log_content = json.dumps({"timestamp": current_time, **payload}, ensure_ascii=False)
+
+        # Write to log file
+        with open(log_filepath, 'w', encoding='utf-8') as f:
+            f.write(log_content)
+
+        safe_print(f"   [log] AIAnalysis request saved to: {log_filepath}")
+
+    except Exception as e:
+        safe_print(f"   [log] saveAIAn error occurred while parsing the log: {e}", level="warning")
+
+
+async def get_ai_analysis(product_data, prompt_text="", images=None):
+    """
+    complete productJSONData and all images are sent to AI Perform analysis (asynchronous）。
+    images: in-memory FetchedImage list, used as is without touching the disk。
+    """
     if not client:
         safe_print("   [AIanalyze] mistake：AIThe client is not initialized and analysis is skipped.。")
         return None
 
+    if not prompt_text:
+        safe_print("   [AIanalyze] Error: Not providedAIrequired for analysisprompttext。")
+        return None
+
+    ai_images = await prepare_ai_images(images)
+    cache_key, cached_result = await lookup_cached_analysis(product_data, ai_images, prompt_text)
+    if cached_result is not None:
+        safe_print(f"   [AIanalyze] Identical request found in the AI cache, model call skipped")
+        return cached_result
+    return await analyze_prepared_item(product_data, ai_images, prompt_text, cache_key)
+
+
+@retry_on_failure(retries=3, delay=5)
+async def analyze_prepared_item(product_data, ai_images, prompt_text, cache_key=None):
+    """Single-item model call for pictures already prepared by prepare_ai_images。"""
     item_info = product_data.get('Product information', {})
     product_id = item_info.get('commodityID', 'N/A')
 
-    safe_print(f"\n   [AIanalyze] Start analyzing products #{product_id} (Contains {len(image_paths or [])} pictures)...")
+    safe_print(f"\n   [AIanalyze] Start analyzing products #{product_id} (Contains {len(ai_images)} pictures)...")
     safe_print(f"   [AIanalyze] title: {item_info.get('Product title', 'none')}")
 
-    if not prompt_text:
-        safe_print("   [AIanalyze] Error: Not providedAIrequired for analysisprompttext。")
-        return None
-
     product_details_json = json.dumps(product_data, ensure_ascii=False, indent=2)
     system_prompt = prompt_text
 
@@ -545,15 +616,8 @@ async def get_ai_analysis(product_data, image_paths=None, prompt_text=""):
 
 {system_prompt}
 """
-    user_content_list = []
-
     # Add image content first
-    if image_paths:
-        for path in image_paths:
-            base64_image = encode_image_to_base64(path)
-            if base64_image:
-                user_content_list.append(
-                    {"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{base64_image}"}})
+    user_content_list = build_image_content(ai_images)
 
     # Add text content
     user_content_list.append({"type": "text", "text": combined_text_prompt})
@@ -561,36 +625,24 @@ async def get_ai_analysis(product_data, image_paths=None, prompt_text=""):
     messages = [{"role": "user", "content": user_content_list}]
 
     # Save final transfer content to log file
-    try:
-        # createlogsfolder
-        logs_dir = os.path.join("logs", "ai")
-        os.makedirs(logs_dir, exist_ok=True)
-        cleanup_ai_logs(logs_dir, keep_days=1)
-
-        # Generate log file name (current time）
-        current_time = datetime.now().strftime("%Y%m%d_%H%M%S")
-        log_filename = f"{current_time}.log"
-        log_filepath = os.path.join(logs_dir, log_filename)
-
-        task_name = product_data.get("Task name") or product_data.get("Task name") or "unknown"
-        log_payload = {
-            "timestamp": current_time,
-            "task_name": task_name,
-            "product_id": product_id,
-            "title": item_info.get("Product title", "none"),
-            "image_count": len(image_paths or []),
-        }
-        log_content = json.dumps(log_payload, ensure_ascii=False)
-
-        # Write to log file
-        with open(log_filepath, 'w', encoding='utf-8') as f:
-            f.write(log_content)
-
-        safe_print(f"   [log] AIAnalysis request saved to: {log_filepath}")
-
-    except Exception as e:
-        safe_print(f"   [log] saveAIAn error occurred while parsing the log: {e}")
-
+    task_name = product_data.get("Task name") or "unknown"
+    write_ai_request_log({
+        "task_name": task_name,
+        "product_id": product_id,
+        "title": item_info.get("Product title", "none"),
+        "image_count": len(ai_images),
+        "image_bytes": sum(len(img.data) for img in ai_images),
+    })
+
+    usage = {'prompt_tokens': 0, 'completion_tokens': 0}
+    parsed_response = await request_ai_analysis(messages, usage)
+    await store_analysis_result(cache_key, parsed_response, usage['prompt_tokens'], usage['completion_tokens'])
+    return parsed_response
+
+
+async def request_ai_analysis(messages, usage, validator=None, max_tokens=4000):
+    """Send the request to the model with format checks and retries; token usage is added to usage。"""
+    validator = validator or validate_ai_response_format
     # enhancedAICall, including stricter format control and retry mechanism
     max_retries = 3
     for attempt in range(max_retries):
@@ -605,7 +657,7 @@ async def get_ai_analysis(product_data, image_paths=None, prompt_text=""):
                 "model": MODEL_NAME,
                 "messages": messages,
                 "temperature": current_temperature,
-                "max_tokens": 4000
+                "max_tokens": max_tokens
             }
             
             # Only enableresponse_formatThis parameter is added only when
@@ -615,6 +667,10 @@ async def get_ai_analysis(product_data, image_paths=None, prompt_text=""):
             response = await client.chat.completions.create(
                 **get_ai_request_params(**request_params)
             )
+            usage_info = getattr(response, 'usage', None)
+            if usage_info is not None:
+                usage['prompt_tokens'] += getattr(usage_info, 'prompt_tokens', 0) or 0
+                usage['completion_tokens'] += getattr(usage_info, 'completion_tokens', 0) or 0
 
             # Compatible with differentAPIresponse format, checkresponseWhether it is a string
             if hasattr(response, 'choices'):
@@ -634,11 +690,11 @@ async def get_ai_analysis(product_data, image_paths=None, prompt_text=""):
                 parsed_response = json.loads(ai_response_content)
 
                 # Verify response format
-                if validate_ai_response_format(parsed_response):
+                if validator(parsed_response):
                     safe_print(f"   [AIanalyze] No.{attempt + 1}Successful attempts, response format verification passed")
                     return parsed_response
                 else:
-                    safe_print(f"   [AIanalyze] No.{attempt + 1}Format validation failed in attempts")
+                    safe_print(f"   [AIanalyze] No.{attempt + 1}Format validation failed in attempts", level="warning")
                     if attempt < max_retries - 1:
                         safe_print(f"   [AIanalyze] Prepare for Chapter{attempt + 2}retries...")
                         continue
@@ -647,7 +703,7 @@ async def get_ai_analysis(product_data, image_paths=None, prompt_text=""):
                         return parsed_response
 
             except json.JSONDecodeError:
-                safe_print(f"   [AIanalyze] No.{attempt + 1}attemptsJSONParsing failed, try to clean response content...")
+                safe_print(f"   [AIanalyze] No.{attempt + 1}attemptsJSONParsing failed, try to clean response content...", level="warning")
 
                 # Clean up possibleMarkdowncode block tag
                 cleaned_content = ai_response_content.strip()
@@ -667,7 +723,7 @@ async def get_ai_analysis(product_data, image_paths=None, prompt_text=""):
                     json_str = cleaned_content[json_start_index:json_end_index + 1]
                     try:
                         parsed_response = json.loads(json_str)
-                        if validate_ai_response_format(parsed_response):
+                        if validator(parsed_response):
                             safe_print(f"   [AIanalyze] No.{attempt + 1}Cleanup succeeded after attempts")
                             return parsed_response
                         else:
@@ -685,7 +741,7 @@ async def get_ai_analysis(product_data, image_paths=None, prompt_text=""):
                         else:
                             raise e
                 else:
-                    safe_print(f"   [AIanalyze] No.{attempt + 1}attempts failed to find a validJSONobject")
+                    safe_print(f"   [AIanalyze] No.{attempt + 1}attempts failed to find a validJSONobject", level="warning")
                     if attempt < max_retries - 1:
                         safe_print(f"   [AIanalyze] Prepare for Chapter{attempt + 2}retries...")
                         continue
@@ -693,7 +749,7 @@ async def get_ai_analysis(product_data, image_paths=None, prompt_text=""):
                         raise json.JSONDecodeError("No valid JSON object found", ai_response_content, 0)
 
         except Exception as e:
-            safe_print(f"   [AIanalyze] No.{attempt + 1}attemptsAICall failed: {e}")
+            safe_print(f"   [AIanalyze] No.{attempt + 1}attemptsAICall failed: {e}", level="warning")
             if attempt < max_retries - 1:
                 safe_print(f"   [AIanalyze] Prepare for Chapter{attempt + 2}retries...")
                 continue
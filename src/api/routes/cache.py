@@ -0,0 +1,56 @@
+"""
+Crawler cache statistics routes for admin
+"""
+import asyncio
+
+from fastapi import APIRouter
+
+from src.ai_cache import AIResultCache
+from src.infrastructure.config.settings import cache_settings
+from src.seller_cache import SellerProfileCache
+
+
+router = APIRouter(prefix="/api/admin/cache", tags=["admin-cache"])
+
+
+def _ai_cache() -> AIResultCache:
+    return AIResultCache(
+        cache_settings.ai_cache_db,
+        ttl=cache_settings.ai_cache_ttl_seconds,
+        max_entries=cache_settings.ai_cache_max_entries,
+    )
+
+
+def _read_stats(cache) -> dict:
+    try:
+        return cache.stats()
+    finally:
+        cache.close()
+
+
+@router.get("/ai")
+async def get_ai_cache_stats():
+    """AI analysis result cache: entries, hit rate and saved tokens (admin only)"""
+    return await asyncio.to_thread(_read_stats, _ai_cache())
+
+
+@router.delete("/ai", response_model=dict)
+async def clear_ai_cache():
+    """Drop all cached AI analysis results and reset the counters (admin only)"""
+    cache = _ai_cache()
+    try:
+        await asyncio.to_thread(cache.clear)
+    finally:
+        cache.close()
+    return {"message": "AI cache cleared"}
+
+
+@router.get("/sellers")
+async def get_seller_cache_stats():
+    """Seller profile cache: cached sellers and per-section hit rate (admin only)"""
+    cache = SellerProfileCache(
+        cache_settings.seller_cache_db,
+        head_ttl=cache_settings.seller_head_ttl_seconds,
+        ratings_ttl=cache_settings.seller_ratings_ttl_seconds,
+    )
+    return await asyncio.to_thread(_read_stats, cache)
@@ -1,64 +1,85 @@
 """
 Log management routing
 """
+import asyncio
 import os
+from collections import OrderedDict
 from typing import Optional, Tuple, List
 import aiofiles
 from fastapi import APIRouter, Depends, Query
 from fastapi.responses import JSONResponse
 from src.api.dependencies import get_task_service
+from src.infrastructure.config.settings import settings
+from src.log_rotation import LogSegments
 from src.services.task_service import TaskService
+from src.structured_log import event_matches
 from src.utils import resolve_task_log_path
 
 
 router = APIRouter(prefix="/api/logs", tags=["logs"])
 
+# Recently read logs (archived segments + line index of the active file), kept between requests
+_log_segments: "OrderedDict[str, LogSegments]" = OrderedDict()
+_MAX_CACHED_LOGS = 64
+
+
+def _get_segments(log_file_path: str) -> LogSegments:
+    segments = _log_segments.pop(log_file_path, None) or LogSegments(log_file_path)
+    _log_segments[log_file_path] = segments
+    while len(_log_segments) > _MAX_CACHED_LOGS:
+        _log_segments.popitem(last=False)
+    return segments
+
+
+async def _read_log_chunk(log_file_path: str, from_pos: int, max_bytes: int) -> Tuple[bytes, int, int]:
+    """
+    At most max_bytes from from_pos, ending on a line break unless the chunk reaches EOF
+    or holds a single line longer than the cap. Positions span the rotated segments too.
+    Returns (data, next_pos, file_size).
+    """
+    return await asyncio.to_thread(_get_segments(log_file_path).read_chunk, from_pos, max_bytes)
+
 
 async def _read_tail_lines(
     log_file_path: str,
     offset_lines: int,
     limit_lines: int,
-    chunk_size: int = 8192
 ) -> Tuple[List[str], bool, int]:
-    async with aiofiles.open(log_file_path, 'rb') as f:
-        await f.seek(0, os.SEEK_END)
-        file_size = await f.tell()
+    segments = _get_segments(log_file_path)
+    return await asyncio.to_thread(segments.tail, max(0, int(offset_lines)), max(0, int(limit_lines)))
 
-        if file_size == 0 or limit_lines <= 0:
-            return [], False, file_size
 
-        offset_lines = max(0, int(offset_lines))
-        limit_lines = max(0, int(limit_lines))
-        lines_needed = offset_lines + limit_lines
-
-        pos = file_size
-        buffer = b""
-        lines: List[bytes] = []
-
-        while pos > 0 and len(lines) < lines_needed:
-            read_size = min(chunk_size, pos)
-            pos -= read_size
-            await f.seek(pos)
-            chunk = await f.read(read_size)
-            buffer = chunk + buffer
-            lines = buffer.splitlines()
-
-        start = max(0, len(lines) - lines_needed)
-        end = max(0, len(lines) - offset_lines)
-        selected = lines[start:end] if end > start else []
-
-        has_more = pos > 0 or len(lines) > lines_needed
-        decoded = [line.decode('utf-8', errors='replace') for line in selected]
-        return decoded, has_more, file_size
+async def _read_tail_events(
+    log_file_path: str,
+    offset_lines: int,
+    limit_lines: int,
+    level: Optional[str],
+    stage: Optional[str],
+) -> Tuple[List[str], bool, int, int]:
+    """Tail of the structured events matching level/stage; next_offset counts raw lines"""
+    segments = _get_segments(log_file_path)
+    return await asyncio.to_thread(
+        segments.tail_matching,
+        max(0, int(offset_lines)),
+        max(0, int(limit_lines)),
+        lambda line: event_matches(line, min_level=level, stage=stage),
+        max_scan_lines=settings.log_filter_max_scan_lines,
+    )
 
 
 @router.get("")
 async def get_logs(
-    from_pos: int = 0,
+    from_pos: int = Query(default=0, ge=0),
     task_id: Optional[int] = Query(default=None, ge=0),
+    max_bytes: Optional[int] = Query(default=None, ge=1024, le=4 * 1024 * 1024),
     task_service: TaskService = Depends(get_task_service),
 ):
-    """Get log content (incremental reading）"""
+    """
+    Get log content (incremental reading）
+
+    Returns at most max_bytes per call; new_pos is the continuation cursor and has_more tells
+    whether the client should call again right away.
+    """
     if task_id is None:
         return JSONResponse(content={
             "new_content": "Please select the task to view the log。",
@@ -81,18 +102,15 @@ async def get_logs(
         })
 
     try:
-        async with aiofiles.open(log_file_path, 'rb') as f:
-            await f.seek(0, os.SEEK_END)
-            file_size = await f.tell()
-
-            if from_pos >= file_size:
-                return {"new_content": "", "new_pos": file_size}
-
-            await f.seek(from_pos)
-            new_bytes = await f.read()
-
-        new_content = new_bytes.decode('utf-8', errors='replace')
-        return {"new_content": new_content, "new_pos": file_size}
+        new_bytes, new_pos, file_size = await _read_log_chunk(
+            log_file_path, from_pos, max_bytes or settings.log_read_max_bytes
+        )
+        return JSONResponse(content={
+            "new_content": new_bytes.decode('utf-8', errors='replace'),
+            "new_pos": new_pos,
+            "has_more": new_pos < file_size,
+            "file_size": file_size,
+        })
 
     except Exception as e:
         return JSONResponse(
@@ -106,9 +124,14 @@ async def get_logs_tail(
     task_id: Optional[int] = Query(default=None, ge=0),
     offset_lines: int = Query(default=0, ge=0),
     limit_lines: int = Query(default=50, ge=1, le=1000),
+    level: Optional[str] = Query(default=None, pattern="^(debug|info|warning|error)$"),
+    stage: Optional[str] = Query(default=None, min_length=1, max_length=64),
     task_service: TaskService = Depends(get_task_service),
 ):
-    """Get the tail content of the log (paginated by line)）"""
+    """
+    Get the tail content of the log (paginated by line)）
+    level/stage keep only structured events (LOG_FORMAT=json) at or above that level / of that stage
+    """
     if task_id is None:
         return JSONResponse(content={
             "content": "",
@@ -137,12 +160,17 @@ async def get_logs_tail(
         })
 
     try:
-        lines, has_more, file_size = await _read_tail_lines(
-            log_file_path,
-            offset_lines=offset_lines,
-            limit_lines=limit_lines
-        )
-        next_offset = offset_lines + len(lines)
+        if level or stage:
+            lines, has_more, next_offset, file_size = await _read_tail_events(
+                log_file_path, offset_lines, limit_lines, level, stage
+            )
+        else:
+            lines, has_more, file_size = await _read_tail_lines(
+                log_file_path,
+                offset_lines=offset_lines,
+                limit_lines=limit_lines
+            )
+            next_offset = offset_lines + len(lines)
         return {
             "content": "\n".join(lines),
             "has_more": has_more,
@@ -182,6 +210,8 @@ async def clear_logs(
     try:
         async with aiofiles.open(log_file_path, 'w', encoding='utf-8') as f:
             await f.write("")
+        # Rotated segments belong to the same log
+        await asyncio.to_thread(_get_segments(log_file_path).clear)
         return {"message": "The log has been cleared successfully。"}
     except Exception as e:
         return JSONResponse(
@@ -0,0 +1,40 @@
+"""
+Run performance routes: per-stage timing summaries and a Prometheus scrape endpoint
+"""
+import asyncio
+from typing import Optional
+
+from fastapi import APIRouter, Query
+from fastapi.responses import PlainTextResponse
+
+from src.infrastructure.config.settings import scraper_settings
+from src.run_history import RunHistory
+from src.stage_timer import prometheus_text
+
+
+router = APIRouter(tags=["metrics"])
+
+
+def _read_history(reader):
+    history = RunHistory(scraper_settings.run_history_db)
+    try:
+        return reader(history)
+    finally:
+        history.close()
+
+
+@router.get("/api/runs/stats")
+async def get_run_stats(
+    task_name: Optional[str] = Query(None, description="Only runs of this task"),
+    limit: int = Query(20, ge=1, le=500),
+):
+    """Latest crawl runs with wall time, new items and per-stage timing, newest first"""
+    runs = await asyncio.to_thread(_read_history, lambda history: history.run_summaries(task_name, limit))
+    return {"runs": runs}
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_prometheus_metrics():
+    """Latest run of every task in the Prometheus text exposition format"""
+    summaries = await asyncio.to_thread(_read_history, lambda history: history.latest_summaries())
+    return PlainTextResponse(prometheus_text(summaries), media_type="text/plain; version=0.0.4")
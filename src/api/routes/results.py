@@ -4,10 +4,10 @@ Results file management routing
 from fastapi import APIRouter, HTTPException, Query
 from fastapi.responses import FileResponse
 from typing import List
+import asyncio
 import os
-import glob
-import json
-import aiofiles
+
+from src.infrastructure.persistence.jsonl_tailer import result_record_cache
 
 
 router = APIRouter(prefix="/api/results", tags=["results"])
@@ -66,6 +66,7 @@ async def delete_result_file(filename: str):
 
     try:
         os.remove(file_path)
+        result_record_cache.invalidate(file_path)
         return {"message": f"document {filename} Deleted successfully"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"An error occurred while deleting the file: {str(e)}")
@@ -89,22 +90,17 @@ async def get_result_file_content(
     if not os.path.exists(filepath):
         raise HTTPException(status_code=404, detail="Result file not found")
 
-    results = []
     try:
-        async with aiofiles.open(filepath, 'r', encoding='utf-8') as f:
-            async for line in f:
-                try:
-                    record = json.loads(line)
-                    if recommended_only:
-                        if record.get("ai_analysis", {}).get("is_recommended") is True:
-                            results.append(record)
-                    else:
-                        results.append(record)
-                except json.JSONDecodeError:
-                    continue
+        # Only lines appended since the previous request are parsed
+        records = await asyncio.to_thread(result_record_cache.get_records, filepath)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"An error occurred while reading the results file: {e}")
 
+    if recommended_only:
+        results = [r for r in records if (r.get("ai_analysis") or {}).get("is_recommended") is True]
+    else:
+        results = records
+
     # Sorting logic
     def get_sort_key(item):
         info = item.get("Product information", {})
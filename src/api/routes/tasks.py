@@ -3,6 +3,7 @@ Task management routing
 """
 from fastapi import APIRouter, Depends, HTTPException
 from typing import List
+import asyncio
 import os
 import aiofiles
 from src.api.dependencies import get_task_service, get_process_service
@@ -10,6 +11,7 @@ from src.services.task_service import TaskService
 from src.services.process_service import ProcessService
 from src.domain.models.task import Task, TaskCreate, TaskUpdate, TaskGenerateRequest
 from src.api.routes.websocket import broadcast_message
+from src.log_rotation import LogSegments
 from src.prompt_utils import generate_criteria
 from src.utils import resolve_task_log_path
 
@@ -17,6 +19,15 @@ from src.utils import resolve_task_log_path
 router = APIRouter(prefix="/api/tasks", tags=["tasks"])
 
 
+def _remove_task_log(log_file_path: str) -> None:
+    """The log with its rotated archives, their manifest and the line index"""
+    segments = LogSegments(log_file_path)
+    segments.clear()
+    for path in (log_file_path, segments.line_index.index_path):
+        if os.path.exists(path):
+            os.remove(path)
+
+
 @router.get("", response_model=List[dict])
 async def get_tasks(
     service: TaskService = Depends(get_task_service),
@@ -223,8 +234,7 @@ async def delete_task(
 
     try:
         log_file_path = resolve_task_log_path(task_id, task.task_name)
-        if os.path.exists(log_file_path):
-            os.remove(log_file_path)
+        await asyncio.to_thread(_remove_task_log, log_file_path)
     except Exception as e:
         print(f"Error deleting task log file: {e}")
 
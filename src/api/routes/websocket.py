@@ -2,8 +2,14 @@
 WebSocket routing
 Provide real-time communication capabilities
 """
+import json
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
-from typing import Set
+from typing import Dict, Set
+
+from src.api.dependencies import get_task_service
+from src.infrastructure.config.settings import settings
+from src.services.log_stream_service import LogStreamHub, LogSubscription
+from src.utils import resolve_task_log_path
 
 
 router = APIRouter()
@@ -11,6 +17,49 @@ router = APIRouter()
 # overall situation WebSocket Connection management
 active_connections: Set[WebSocket] = set()
 
+# Task log subscriptions: one file watcher per task log, shared by every subscribed socket
+log_stream_hub = LogStreamHub(
+    poll_interval=settings.log_stream_poll_interval,
+    max_chunk_bytes=settings.log_stream_max_chunk_bytes,
+    max_pending=settings.log_stream_max_pending,
+)
+
+
+async def _handle_client_message(websocket: WebSocket, raw: str, subscriptions: Dict[int, LogSubscription]) -> None:
+    """
+    Client requests: {"action": "subscribe_logs" | "unsubscribe_logs", "task_id": ..., "from_pos": ...}
+    A malformed request is ignored and a failed subscription answered with log_error, so neither
+    drops the socket (and its other subscriptions).
+    """
+    try:
+        message = json.loads(raw)
+        action = message.get("action")
+        task_id = int(message.get("task_id"))
+        from_pos = message.get("from_pos")
+        from_pos = max(0, int(from_pos)) if from_pos is not None else None
+    except (ValueError, TypeError, AttributeError):
+        return
+
+    previous = subscriptions.pop(task_id, None)
+    if previous is not None:
+        log_stream_hub.unsubscribe(previous)
+    if action != "subscribe_logs":
+        return
+
+    task = await get_task_service().get_task(task_id)
+    if not task:
+        await websocket.send_json({"type": "log_error", "data": {"task_id": task_id, "message": "The task does not exist or has been deleted。"}})
+        return
+    try:
+        subscriptions[task_id] = await log_stream_hub.subscribe(
+            task_id,
+            resolve_task_log_path(task_id, task.task_name),
+            websocket.send_json,
+            from_pos=from_pos,
+        )
+    except Exception as e:
+        await websocket.send_json({"type": "log_error", "data": {"task_id": task_id, "message": f"Error reading log file: {e}"}})
+
 
 @router.websocket("/ws")
 async def websocket_endpoint(
@@ -20,20 +69,24 @@ async def websocket_endpoint(
     # accept connection
     await websocket.accept()
     active_connections.add(websocket)
+    subscriptions: Dict[int, LogSubscription] = {}
 
     try:
         # Stay connected and receive messages
         while True:
             # Receive client messages (if any）
             data = await websocket.receive_text()
-            # Messages sent by the client can be processed here
-            # At present, we mainly use it for server-side push, so we will not deal with it for the time being.
+            # Clients subscribe to task logs here; everything else is server-side push
+            await _handle_client_message(websocket, data, subscriptions)
     except WebSocketDisconnect:
         active_connections.remove(websocket)
     except Exception as e:
         print(f"WebSocket mistake: {e}")
         if websocket in active_connections:
             active_connections.remove(websocket)
+    finally:
+        for subscription in subscriptions.values():
+            log_stream_hub.unsubscribe(subscription)
 
 
 async def broadcast_message(message_type: str, data: dict):
@@ -4,10 +4,11 @@ Integrate all routes and services
 """
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 
-from src.api.routes import tasks, logs, settings, prompts, results, login_state, websocket, accounts, public, users
+from src.api.routes import tasks, logs, settings, prompts, results, login_state, websocket, accounts, public, users, cache, metrics
 from src.api.dependencies import set_process_service
 from src.services.task_service import TaskService
 from src.services.process_service import ProcessService
@@ -61,6 +62,9 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Compress larger responses (log pages, result lists) for clients that accept gzip
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 # Register route
 app.include_router(public.router)
 app.include_router(users.router)
@@ -72,6 +76,8 @@ app.include_router(results.router)
 app.include_router(login_state.router)
 app.include_router(websocket.router)
 app.include_router(accounts.router)
+app.include_router(cache.router)
+app.include_router(metrics.router)
 
 # Mount static files
 # Old static files directory (for screenshots etc.）
@@ -0,0 +1,304 @@
+import asyncio
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from src.config import (
+    BROWSER_POOL_IDLE_PAGES,
+    BROWSER_POOL_IDLE_TTL_SECONDS,
+    BROWSER_POOL_MAX_AGE_MINUTES,
+    BROWSER_POOL_MAX_NAVIGATIONS,
+    BROWSER_POOL_WARM_TTL_SECONDS,
+)
+
+
+# Anti-detection script injected into every context (emulates real mobile devices)
+ANTI_DETECTION_SCRIPT = """
+    // Removewebdriverlogo
+    Object.defineProperty(navigator, 'webdriver', {get: () => undefined});
+
+    // Simulates real mobile devicesnavigatorproperty
+    Object.defineProperty(navigator, 'plugins', {get: () => [1, 2, 3, 4, 5]});
+    Object.defineProperty(navigator, 'languages', {get: () => ['zh-CN', 'zh', 'en-US', 'en']});
+
+    // Add tochromeobject
+    window.chrome = {runtime: {}, loadTimes: function() {}, csi: function() {}};
+
+    // Analog touch support
+    Object.defineProperty(navigator, 'maxTouchPoints', {get: () => 5});
+
+    // coverpermissionsQuery (avoid exposing automation）
+    const originalQuery = window.navigator.permissions.query;
+    window.navigator.permissions.query = (parameters) => (
+        parameters.name === 'notifications' ?
+            Promise.resolve({state: Notification.permission}) :
+            originalQuery(parameters)
+    );
+"""
+
+
+@dataclass
+class _ContextEntry:
+    key: tuple
+    browser_key: str
+    context: Any
+    created_at: float = field(default_factory=time.time)
+    warmed_at: float = 0.0
+    last_used: float = field(default_factory=time.time)
+    leases: int = 0
+    navigations: int = 0
+    idle_pages: List[Any] = field(default_factory=list)
+
+
+@dataclass
+class BrowserLease:
+    """A context handed out for one scrape attempt"""
+    context: Any
+    warm: bool
+    _entry: _ContextEntry = field(repr=False)
+    _pool: "BrowserPool" = field(repr=False)
+
+    def mark_warmed(self) -> None:
+        self._entry.warmed_at = time.time()
+
+    async def new_page(self):
+        """A page of this context, reusing a parked one when available"""
+        return await self._pool._checkout_page(self._entry)
+
+    async def release_page(self, page) -> None:
+        """Hand a page back instead of closing it; it is parked for the next visit"""
+        await self._pool._checkin_page(self._entry, page)
+
+
+class BrowserPool:
+    """
+    Keeps Playwright, browsers and per-account contexts alive between scrape runs.
+
+    Browsers are keyed by their launch options (proxy, channel, headless), contexts by
+    account state file (and its modification time, so a refreshed login gets a new
+    context) plus proxy. A context counts as warm for warm_ttl seconds after it visited
+    the home page. Contexts are recycled after max_navigations page loads or max_age
+    seconds, checked for liveness before reuse, and closed after idle_ttl idle seconds.
+    Detail and profile pages are parked (up to idle_pages per context) and reused.
+    """
+
+    def __init__(
+        self,
+        warm_ttl: float = BROWSER_POOL_WARM_TTL_SECONDS,
+        idle_ttl: float = BROWSER_POOL_IDLE_TTL_SECONDS,
+        max_navigations: int = BROWSER_POOL_MAX_NAVIGATIONS,
+        max_age: float = BROWSER_POOL_MAX_AGE_MINUTES * 60,
+        idle_pages: int = BROWSER_POOL_IDLE_PAGES,
+        health_timeout: float = 5,
+    ):
+        self.warm_ttl = warm_ttl
+        self.idle_ttl = idle_ttl
+        self.max_navigations = max_navigations
+        self.max_age = max_age
+        self.idle_pages = max(0, idle_pages)
+        self.health_timeout = health_timeout
+        self.metrics = {
+            "context_hits": 0,
+            "context_launches": 0,
+            "browser_launches": 0,
+            "recycled": 0,
+            "unhealthy": 0,
+            "page_hits": 0,
+            "page_launches": 0,
+        }
+        self._playwright = None
+        self._browsers: Dict[str, Any] = {}
+        self._contexts: Dict[tuple, _ContextEntry] = {}
+        # Contexts no longer handed out but still leased by running scrapes (by id), keeping their browser open
+        self._retired: Dict[int, _ContextEntry] = {}
+        self._lock = asyncio.Lock()
+
+    async def _get_browser(self, launch_kwargs: dict):
+        browser_key = json.dumps(launch_kwargs, sort_keys=True)
+        browser = self._browsers.get(browser_key)
+        if browser is not None and not browser.is_connected():
+            self._browsers.pop(browser_key, None)
+            self._drop_contexts(browser_key)
+            browser = None
+        if browser is None:
+            if self._playwright is None:
+                from playwright.async_api import async_playwright
+                self._playwright = await async_playwright().start()
+            browser = await self._playwright.chromium.launch(**launch_kwargs)
+            self._browsers[browser_key] = browser
+            self.metrics["browser_launches"] += 1
+        return browser_key, browser
+
+    def _drop_contexts(self, browser_key: str) -> None:
+        for key in [k for k, e in self._contexts.items() if e.browser_key == browser_key]:
+            self._contexts.pop(key, None)
+        for entry_id in [i for i, e in self._retired.items() if e.browser_key == browser_key]:
+            self._retired.pop(entry_id, None)
+
+    def _detach(self, entry: _ContextEntry) -> None:
+        """Stop handing out a context; while leased it stays tracked so its browser is kept"""
+        if self._contexts.get(entry.key) is entry:
+            self._contexts.pop(entry.key, None)
+        if entry.leases > 0:
+            self._retired[id(entry)] = entry
+
+    def _expired(self, entry: _ContextEntry) -> bool:
+        if self.max_navigations and entry.navigations >= self.max_navigations:
+            return True
+        return bool(self.max_age) and time.time() - entry.created_at >= self.max_age
+
+    async def _is_healthy(self, entry: _ContextEntry) -> bool:
+        """Cheap round trip to the browser to make sure a parked context still works"""
+        try:
+            await asyncio.wait_for(entry.context.cookies(), timeout=self.health_timeout)
+            return True
+        except Exception:
+            return False
+
+    async def _retire(self, entry: _ContextEntry) -> None:
+        """Stop handing out a context; it is closed as soon as nobody uses it"""
+        self._detach(entry)
+        if entry.leases == 0:
+            await self._close_context(entry)
+
+    async def acquire(
+        self,
+        state_file: str,
+        proxy_server: Optional[str],
+        launch_kwargs: dict,
+        storage_state: Any,
+        context_kwargs: dict,
+    ) -> BrowserLease:
+        try:
+            state_mtime = os.path.getmtime(state_file)
+        except OSError:
+            state_mtime = 0.0
+        key = (os.path.abspath(state_file), state_mtime, proxy_server or "")
+        async with self._lock:
+            await self._evict_idle()
+            browser_key, browser = await self._get_browser(launch_kwargs)
+            entry = self._contexts.get(key)
+            if entry is not None and entry.browser_key == browser_key:
+                if self._expired(entry):
+                    self.metrics["recycled"] += 1
+                    await self._retire(entry)
+                    entry = None
+                elif not await self._is_healthy(entry):
+                    self.metrics["unhealthy"] += 1
+                    await self._retire(entry)
+                    entry = None
+            if entry is None or entry.browser_key != browser_key:
+                context = await browser.new_context(storage_state=storage_state, **context_kwargs)
+                await context.add_init_script(ANTI_DETECTION_SCRIPT)
+                entry = _ContextEntry(key=key, browser_key=browser_key, context=context)
+                self._contexts[key] = entry
+                self.metrics["context_launches"] += 1
+            else:
+                self.metrics["context_hits"] += 1
+            entry.leases += 1
+            entry.last_used = time.time()
+            warm = bool(entry.warmed_at) and time.time() - entry.warmed_at < self.warm_ttl
+            return BrowserLease(context=entry.context, warm=warm, _entry=entry, _pool=self)
+
+    async def release(self, lease: BrowserLease, healthy: bool = True) -> None:
+        """Give a context back; unhealthy contexts (risk control, crashes) are closed once unused"""
+        async with self._lock:
+            entry = lease._entry
+            entry.leases = max(0, entry.leases - 1)
+            entry.last_used = time.time()
+            if not healthy:
+                entry.warmed_at = 0.0
+                self._detach(entry)
+            elif self._expired(entry) and self._contexts.get(entry.key) is entry:
+                self.metrics["recycled"] += 1
+                self._detach(entry)
+            if entry.leases == 0 and self._contexts.get(entry.key) is not entry:
+                self._retired.pop(id(entry), None)
+                await self._close_context(entry)
+
+    async def _checkout_page(self, entry: _ContextEntry):
+        while entry.idle_pages:
+            page = entry.idle_pages.pop()
+            if not page.is_closed():
+                self.metrics["page_hits"] += 1
+                return page
+        page = await entry.context.new_page()
+        self.metrics["page_launches"] += 1
+
+        def _count_navigation(frame) -> None:
+            if frame.parent_frame is None and frame.url != "about:blank":
+                entry.navigations += 1
+
+        page.on("framenavigated", _count_navigation)
+        return page
+
+    async def _checkin_page(self, entry: _ContextEntry, page) -> None:
+        if page.is_closed():
+            return
+        if len(entry.idle_pages) < self.idle_pages and self._contexts.get(entry.key) is entry:
+            try:
+                # Leave the previous site so its scripts and pending requests stop running
+                await page.goto("about:blank", timeout=5000)
+                entry.idle_pages.append(page)
+                return
+            except Exception:
+                pass
+        try:
+            await page.close()
+        except Exception as e:
+            print(f"LOG: Failed to close page: {e}")
+
+    async def _close_context(self, entry: _ContextEntry) -> None:
+        entry.idle_pages.clear()
+        try:
+            await entry.context.close()
+        except Exception as e:
+            print(f"LOG: Failed to close browser context: {e}")
+
+    async def _evict_idle(self) -> None:
+        now = time.time()
+        for key, entry in list(self._contexts.items()):
+            if entry.leases == 0 and now - entry.last_used > self.idle_ttl:
+                self._contexts.pop(key, None)
+                await self._close_context(entry)
+        used_browsers = {entry.browser_key for entry in self._contexts.values()}
+        used_browsers.update(entry.browser_key for entry in self._retired.values() if entry.leases > 0)
+        for browser_key in [k for k in self._browsers if k not in used_browsers]:
+            browser = self._browsers.pop(browser_key)
+            try:
+                await browser.close()
+            except Exception as e:
+                print(f"LOG: Failed to close browser: {e}")
+
+    def stats(self) -> dict:
+        stats = dict(self.metrics)
+        stats["open_browsers"] = len(self._browsers)
+        stats["open_contexts"] = len(self._contexts)
+        stats["idle_pages"] = sum(len(entry.idle_pages) for entry in self._contexts.values())
+        return stats
+
+    def summary(self) -> str:
+        m = self.metrics
+        return (
+            f"contexts {m['context_hits']} reused / {m['context_launches']} launched, "
+            f"browsers {m['browser_launches']} launched, {m['recycled']} recycled, {m['unhealthy']} unhealthy, "
+            f"pages {m['page_hits']} reused / {m['page_launches']} opened"
+        )
+
+    async def close(self) -> None:
+        async with self._lock:
+            for entry in list(self._contexts.values()) + list(self._retired.values()):
+                await self._close_context(entry)
+            self._contexts.clear()
+            self._retired.clear()
+            for browser in list(self._browsers.values()):
+                try:
+                    await browser.close()
+                except Exception as e:
+                    print(f"LOG: Failed to close browser: {e}")
+            self._browsers.clear()
+            if self._playwright is not None:
+                await self._playwright.stop()
+                self._playwright = None
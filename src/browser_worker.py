@@ -0,0 +1,197 @@
+"""
+Long-lived browser worker
+Runs scheduled task runs inside one process that keeps Playwright, browsers and
+per-account contexts warm, and takes commands from the web server over a local socket.
+
+The socket is not authenticated, so a request only names a task of the config file; the
+worker derives everything else (such as the log file under logs/) itself.
+
+Protocol: one JSON object per line.
+  requests  {"id": n, "op": "run", "task_id": .., "task_name": ..}
+            {"id": n, "op": "stop", "task_id": ..}
+            {"id": n, "op": "status"}          -> running task ids and browser pool stats
+  responses {"id": n, "ok": true/false, ...}
+  events    {"event": "started" | "finished", "task_id": .., ...}
+"""
+import argparse
+import asyncio
+import contextvars
+import json
+import os
+import signal
+import sys
+from datetime import datetime
+from typing import Dict, Optional
+
+from src import structured_log
+from src.ai_handler import image_fetcher
+from src.browser_pool import BrowserPool
+from src.config import CONFIG_FILE
+from src.scraper import scrape_xianyu, set_browser_pool
+from src.task_runner import load_task_config
+from src.utils import build_task_log_path
+
+
+DEFAULT_WORKER_HOST = "127.0.0.1"
+DEFAULT_WORKER_PORT = 8765
+
+# Log file of the run the current asyncio task belongs to
+_current_log: contextvars.ContextVar = contextvars.ContextVar("current_log", default=None)
+
+
+class _RoutedStream:
+    """stdout/stderr replacement that writes each run's output to that run's log file"""
+
+    def __init__(self, fallback):
+        self._fallback = fallback
+
+    def write(self, data):
+        target = _current_log.get() or self._fallback
+        written = target.write(data)
+        if "\n" in data:
+            target.flush()
+        return written
+
+    def flush(self):
+        target = _current_log.get() or self._fallback
+        target.flush()
+
+    def __getattr__(self, name):
+        return getattr(self._fallback, name)
+
+
+class BrowserWorker:
+    def __init__(self, config_file: str = CONFIG_FILE, pool: Optional[BrowserPool] = None):
+        self.config_file = config_file
+        self.pool = pool or BrowserPool()
+        self.runs: Dict[int, asyncio.Task] = {}
+        self._writers: set = set()
+
+    async def _send(self, writer: asyncio.StreamWriter, message: dict) -> None:
+        try:
+            writer.write((json.dumps(message, ensure_ascii=False) + "\n").encode("utf-8"))
+            await writer.drain()
+        except (ConnectionError, RuntimeError):
+            self._writers.discard(writer)
+
+    async def _broadcast(self, event: dict) -> None:
+        for writer in list(self._writers):
+            await self._send(writer, event)
+
+    async def _execute(self, task_id: int, task_config: dict, log_path: str) -> None:
+        log_file = open(log_path, "a", encoding="utf-8")
+        _current_log.set(log_file)
+        event = {"event": "finished", "task_id": task_id, "processed": 0}
+        try:
+            print(f"-> Task '{task_config['task_name']}' Joined the execution queue (browser worker)。")
+            event["processed"] = await scrape_xianyu(task_config=task_config)
+            print(f"Task '{task_config['task_name']}' Ended normally, this run processed a total of {event['processed']} new items。")
+        except asyncio.CancelledError:
+            event["cancelled"] = True
+            raise
+        except Exception as e:
+            event["error"] = f"{type(e).__name__}: {e}"
+            print(f"Task '{task_config['task_name']}' Terminate due to exception: {e}")
+        finally:
+            self.runs.pop(task_id, None)
+            log_file.close()
+            _current_log.set(None)
+            await self._broadcast(event)
+
+    async def start_run(self, task_id: int, task_name: str) -> dict:
+        if task_id in self.runs:
+            return {"ok": False, "error": "already running"}
+        try:
+            task_config = load_task_config(self.config_file, task_name)
+        except (OSError, json.JSONDecodeError) as e:
+            return {"ok": False, "error": f"cannot read {self.config_file}: {e}"}
+        if task_config is None:
+            return {"ok": False, "error": f"task '{task_name}' not found"}
+        if not task_config.get("enabled", False):
+            return {"ok": False, "error": f"task '{task_name}' is disabled"}
+
+        log_path = build_task_log_path(task_id, task_config["task_name"])
+        os.makedirs(os.path.dirname(log_path), exist_ok=True)
+        # Each run gets a fresh context copy so its log routing never leaks into other runs
+        self.runs[task_id] = asyncio.create_task(
+            self._execute(task_id, task_config, log_path), context=contextvars.copy_context()
+        )
+        await self._broadcast({"event": "started", "task_id": task_id})
+        return {"ok": True, "pid": os.getpid()}
+
+    async def stop_run(self, task_id: int, timeout: float = 20) -> dict:
+        run = self.runs.get(task_id)
+        if run is None:
+            return {"ok": False, "error": "not running"}
+        # Same semantics as SIGTERM for spider_v2: cancel the crawler coroutine and let it clean up
+        run.cancel()
+        done, _ = await asyncio.wait({run}, timeout=timeout)
+        return {"ok": True, "stopped": bool(done)}
+
+    async def _dispatch(self, request: dict) -> dict:
+        op = request.get("op")
+        if op == "run":
+            return await self.start_run(int(request["task_id"]), request["task_name"])
+        if op == "stop":
+            return await self.stop_run(int(request["task_id"]))
+        if op == "status":
+            return {"ok": True, "pid": os.getpid(), "running": sorted(self.runs), "pool": self.pool.stats()}
+        return {"ok": False, "error": f"unknown op {op!r}"}
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._writers.add(writer)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                    response = await self._dispatch(request)
+                except (json.JSONDecodeError, KeyError, TypeError, ValueError) as e:
+                    request, response = {}, {"ok": False, "error": f"bad request: {e}"}
+                response["id"] = request.get("id")
+                await self._send(writer, response)
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    async def shutdown(self) -> None:
+        for task_id in list(self.runs):
+            await self.stop_run(task_id)
+        await self.pool.close()
+        await image_fetcher.aclose()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Long-lived browser worker for scheduled task runs")
+    parser.add_argument("--host", default=os.getenv("BROWSER_WORKER_HOST", DEFAULT_WORKER_HOST))
+    parser.add_argument("--port", type=int, default=int(os.getenv("BROWSER_WORKER_PORT", DEFAULT_WORKER_PORT)))
+    parser.add_argument("--config", default=CONFIG_FILE)
+    args = parser.parse_args()
+
+    sys.stdout = _RoutedStream(sys.stdout)
+    sys.stderr = _RoutedStream(sys.stderr)
+    structured_log.install_stdout()
+
+    worker = BrowserWorker(config_file=args.config)
+    set_browser_pool(worker.pool)
+    server = await asyncio.start_server(worker.handle_connection, args.host, args.port)
+    print(f"[{datetime.now():%Y-%m-%d %H:%M:%S}] Browser worker listening on {args.host}:{args.port} (PID {os.getpid()})")
+
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        try:
+            loop.add_signal_handler(sig, stop_event.set)
+        except NotImplementedError:
+            pass
+
+    async with server:
+        await stop_event.wait()
+    print("Browser worker shutting down...")
+    await worker.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
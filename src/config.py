@@ -16,6 +16,21 @@ os.makedirs(IMAGE_SAVE_DIR, exist_ok=True)
 # Temporary image directory prefix for task isolation
 TASK_IMAGE_DIR_PREFIX = "task_images_"
 
+# Persistent per-task index of processed product links
+DEDUP_INDEX_DIR = os.getenv("DEDUP_INDEX_DIR", os.path.join("data", "dedup"))
+
+# Seller profile cache shared by all tasks
+SELLER_CACHE_DB = os.getenv("SELLER_CACHE_DB", os.path.join("data", "seller_cache.db"))
+
+# AI analysis result cache shared by all tasks
+AI_CACHE_DB = os.getenv("AI_CACHE_DB", os.path.join("data", "ai_cache.db"))
+
+# Request budgets per account and proxy shared by all tasks and processes
+RATE_GOVERNOR_DB = os.getenv("RATE_GOVERNOR_DB", os.path.join("data", "rate_governor.db"))
+
+# Success / latency / validation history of rotated accounts and proxies
+ROTATION_HEALTH_DB = os.getenv("ROTATION_HEALTH_DB", os.path.join("data", "rotation_health.db"))
+
 # --- API URL Patterns ---
 API_URL_PATTERN = "h5api.m.goofish.com/h5/mtop.taobao.idlemtopsearch.pc.search"
 DETAIL_API_URL_PATTERN = "h5api.m.goofish.com/h5/mtop.taobao.idle.pc.detail"
@@ -46,6 +61,46 @@ AI_DEBUG_MODE = os.getenv("AI_DEBUG_MODE", "false").lower() == "true"
 SKIP_AI_ANALYSIS = os.getenv("SKIP_AI_ANALYSIS", "false").lower() == "true"
 ENABLE_THINKING = os.getenv("ENABLE_THINKING", "false").lower() == "true"
 ENABLE_RESPONSE_FORMAT = os.getenv("ENABLE_RESPONSE_FORMAT", "true").lower() == "true"
+DEDUP_BLOOM_ENABLED = os.getenv("DEDUP_BLOOM_ENABLED", "false").lower() == "true"
+SELLER_CACHE_ENABLED = os.getenv("SELLER_CACHE_ENABLED", "true").lower() == "true"
+SELLER_HEAD_TTL_SECONDS = int(os.getenv("SELLER_HEAD_TTL_SECONDS", "21600"))
+SELLER_RATINGS_TTL_SECONDS = int(os.getenv("SELLER_RATINGS_TTL_SECONDS", "86400"))
+IMAGE_MAX_CONNECTIONS = int(os.getenv("IMAGE_MAX_CONNECTIONS", "16"))
+IMAGE_PER_HOST_CONCURRENCY = int(os.getenv("IMAGE_PER_HOST_CONCURRENCY", "4"))
+IMAGE_MAX_BYTES = int(os.getenv("IMAGE_MAX_BYTES", str(8 * 1024 * 1024)))
+IMAGE_ITEM_MAX_BYTES = int(os.getenv("IMAGE_ITEM_MAX_BYTES", str(24 * 1024 * 1024)))
+IMAGE_ITEM_TIMEOUT_SECONDS = float(os.getenv("IMAGE_ITEM_TIMEOUT_SECONDS", "30"))
+AI_IMAGE_PREPROCESS_ENABLED = os.getenv("AI_IMAGE_PREPROCESS_ENABLED", "true").lower() == "true"
+AI_IMAGE_MAX_EDGE = int(os.getenv("AI_IMAGE_MAX_EDGE", "1024"))
+AI_IMAGE_FORMAT = os.getenv("AI_IMAGE_FORMAT", "JPEG").upper()
+AI_IMAGE_QUALITY = int(os.getenv("AI_IMAGE_QUALITY", "80"))
+AI_MAX_IMAGES_PER_ITEM = int(os.getenv("AI_MAX_IMAGES_PER_ITEM", "0"))
+AI_CACHE_ENABLED = os.getenv("AI_CACHE_ENABLED", "true").lower() == "true"
+AI_CACHE_TTL_SECONDS = int(os.getenv("AI_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+AI_CACHE_MAX_ENTRIES = int(os.getenv("AI_CACHE_MAX_ENTRIES", "20000"))
+AI_BATCH_ENABLED = os.getenv("AI_BATCH_ENABLED", "false").lower() == "true"
+AI_BATCH_SIZE = int(os.getenv("AI_BATCH_SIZE", "4"))
+AI_BATCH_MAX_WAIT_SECONDS = float(os.getenv("AI_BATCH_MAX_WAIT_SECONDS", "60"))
+AI_BATCH_MAX_IMAGES_PER_ITEM = int(os.getenv("AI_BATCH_MAX_IMAGES_PER_ITEM", "1"))
+AI_BATCH_MAX_TOKENS = int(os.getenv("AI_BATCH_MAX_TOKENS", "4096"))
+BROWSER_POOL_WARM_TTL_SECONDS = float(os.getenv("BROWSER_POOL_WARM_TTL_SECONDS", "600"))
+BROWSER_POOL_IDLE_TTL_SECONDS = float(os.getenv("BROWSER_POOL_IDLE_TTL_SECONDS", "1800"))
+BROWSER_POOL_MAX_NAVIGATIONS = int(os.getenv("BROWSER_POOL_MAX_NAVIGATIONS", "300"))
+BROWSER_POOL_MAX_AGE_MINUTES = float(os.getenv("BROWSER_POOL_MAX_AGE_MINUTES", "60"))
+BROWSER_POOL_IDLE_PAGES = int(os.getenv("BROWSER_POOL_IDLE_PAGES", "2"))
+RESOURCE_BLOCKING_ENABLED = os.getenv("RESOURCE_BLOCKING_ENABLED", "true").lower() == "true"
+RESOURCE_BLOCK_TYPES = os.getenv("RESOURCE_BLOCK_TYPES", "image,media,font")
+RESOURCE_BLOCK_URL_PATTERNS = os.getenv("RESOURCE_BLOCK_URL_PATTERNS", "mmstat.com,arms-retcode,/alilog/,aplus_")
+RESOURCE_ALLOW_URL_PATTERNS = os.getenv("RESOURCE_ALLOW_URL_PATTERNS", "mtop.")
+RESOURCE_BLOCKING_PAGES = os.getenv("RESOURCE_BLOCKING_PAGES", "search,detail,profile")
+MTOP_DIRECT_FETCH = os.getenv("MTOP_DIRECT_FETCH", "false").lower() == "true"
+RATE_GOVERNOR_ENABLED = os.getenv("RATE_GOVERNOR_ENABLED", "true").lower() == "true"
+RATE_SEARCH_PER_MINUTE = float(os.getenv("RATE_SEARCH_PER_MINUTE", "4"))
+RATE_DETAIL_PER_MINUTE = float(os.getenv("RATE_DETAIL_PER_MINUTE", "6"))
+RATE_PROFILE_PER_MINUTE = float(os.getenv("RATE_PROFILE_PER_MINUTE", "6"))
+RATE_BURST = float(os.getenv("RATE_BURST", "2"))
+EARLY_STOP_KNOWN_ITEMS = int(os.getenv("EARLY_STOP_KNOWN_ITEMS", "10"))
+EARLY_STOP_KNOWN_PAGES = int(os.getenv("EARLY_STOP_KNOWN_PAGES", "1"))
 
 # --- Headers ---
 IMAGE_DOWNLOAD_HEADERS = {
@@ -0,0 +1,232 @@
+import bisect
+import hashlib
+import json
+import os
+import struct
+from array import array
+from typing import Iterable, Optional
+
+from src.infrastructure.persistence.jsonl_tailer import FileCheckpoint, iter_new_batches
+from src.utils import get_link_unique_key
+
+
+# Number of appended keys after which the log is merged into the sorted base file
+COMPACT_THRESHOLD = 4096
+# Header of the .bloom file: magic, number of base hashes and digest of the base file it was built from
+BLOOM_HEADER = struct.Struct("<4sQ8s")
+BLOOM_MAGIC = b"DBF1"
+
+
+def link_hash(unique_key: str) -> int:
+    """64-bit stable hash of a product link unique key"""
+    return int.from_bytes(hashlib.blake2b(unique_key.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def _atomic_write(path: str, data: bytes) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over 64-bit key hashes"""
+
+    def __init__(self, capacity: int, bits_per_key: int = 10, num_hashes: int = 7, bits: Optional[bytearray] = None):
+        self.num_bits = max(1024, capacity * bits_per_key)
+        self.num_hashes = num_hashes
+        self.bits = bits if bits is not None else bytearray((self.num_bits + 7) // 8)
+        self.num_bits = len(self.bits) * 8
+
+    def _positions(self, key_hash: int):
+        # Kirsch-Mitzenmacher double hashing derived from the two 32-bit halves
+        h1 = key_hash & 0xFFFFFFFF
+        h2 = (key_hash >> 32) | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, key_hash: int) -> None:
+        for pos in self._positions(key_hash):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, key_hash: int) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key_hash))
+
+
+class DedupIndex:
+    """
+    Persistent set of processed product links for one result JSONL file.
+
+    On disk it keeps a sorted array of 64-bit link hashes (<name>.keys), an append-only
+    log of hashes added since the last compaction (<name>.log), the checkpoint of the
+    JSONL file already folded into the index (<name>.ckpt.json) and, optionally, a
+    Bloom filter over the sorted array (<name>.bloom). Loading reads two flat binary
+    files and catches up only on JSONL lines written after the checkpoint. The Bloom
+    filter records which sorted array it covers and is rebuilt when that changed, e.g.
+    after compactions made while it was turned off.
+    """
+
+    def __init__(self, jsonl_path: str, index_dir: str, use_bloom: bool = False):
+        self.jsonl_path = jsonl_path
+        self.index_dir = index_dir
+        self.use_bloom = use_bloom
+        name = os.path.splitext(os.path.basename(jsonl_path))[0]
+        self.keys_path = os.path.join(index_dir, f"{name}.keys")
+        self.log_path = os.path.join(index_dir, f"{name}.log")
+        self.checkpoint_path = os.path.join(index_dir, f"{name}.ckpt.json")
+        self.bloom_path = os.path.join(index_dir, f"{name}.bloom")
+
+        self._base = array("Q")
+        self._recent = set()
+        self._bloom: Optional[BloomFilter] = None
+        self._log_entries = 0
+
+    @classmethod
+    def open(cls, jsonl_path: str, index_dir: str, use_bloom: bool = False) -> "DedupIndex":
+        index = cls(jsonl_path, index_dir, use_bloom)
+        index.load()
+        return index
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+
+    def _read_hashes(self, path: str) -> array:
+        values = array("Q")
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                data = f.read()
+            usable = len(data) - len(data) % values.itemsize
+            values.frombytes(data[:usable])
+        return values
+
+    def _load_checkpoint(self) -> FileCheckpoint:
+        try:
+            with open(self.checkpoint_path, "r", encoding="utf-8") as f:
+                return FileCheckpoint.from_dict(json.load(f))
+        except (FileNotFoundError, json.JSONDecodeError, TypeError):
+            return FileCheckpoint()
+
+    def _save_checkpoint(self, checkpoint: FileCheckpoint) -> None:
+        _atomic_write(self.checkpoint_path, json.dumps(checkpoint.to_dict()).encode("utf-8"))
+
+    def _clear(self) -> None:
+        self._base = array("Q")
+        self._recent = set()
+        self._bloom = None
+        self._log_entries = 0
+        for path in (self.keys_path, self.log_path, self.checkpoint_path, self.bloom_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def load(self) -> None:
+        os.makedirs(self.index_dir, exist_ok=True)
+        self._base = self._read_hashes(self.keys_path)
+        log_values = self._read_hashes(self.log_path)
+        self._recent = set(log_values)
+        self._log_entries = len(log_values)
+
+        if self.use_bloom and self._base:
+            self._bloom = self._read_bloom()
+            if self._bloom is None:
+                self._rebuild_bloom()
+
+        checkpoint = self._load_checkpoint()
+        if not os.path.exists(self.jsonl_path):
+            # The result file was deleted: previously seen items are processed again
+            if checkpoint.offset or self._base or self._recent:
+                self._clear()
+            return
+
+        for batch in iter_new_batches(self.jsonl_path, checkpoint):
+            if batch.reset:
+                self._clear()
+            self.add_many(
+                get_link_unique_key(link)
+                for link in ((r.get("Product information") or {}).get("Product link", "") for r in batch.records)
+                if link
+            )
+            if batch.checkpoint != checkpoint:
+                checkpoint = batch.checkpoint
+                self._save_checkpoint(checkpoint)
+
+        if self._log_entries >= COMPACT_THRESHOLD:
+            self.compact()
+
+    # ------------------------------------------------------------------
+    # Membership
+    # ------------------------------------------------------------------
+
+    def _contains_hash(self, key_hash: int) -> bool:
+        if key_hash in self._recent:
+            return True
+        if self._bloom is not None and key_hash not in self._bloom:
+            return False
+        i = bisect.bisect_left(self._base, key_hash)
+        return i < len(self._base) and self._base[i] == key_hash
+
+    def __contains__(self, unique_key: str) -> bool:
+        return self._contains_hash(link_hash(unique_key))
+
+    def __len__(self) -> int:
+        return len(self._base) + len(self._recent)
+
+    def add(self, unique_key: str) -> None:
+        """Persist a processed link key; a single append write keeps it atomic"""
+        self.add_many([unique_key])
+
+    def add_many(self, unique_keys: Iterable[str]) -> None:
+        new_hashes = array("Q")
+        for key in unique_keys:
+            key_hash = link_hash(key)
+            if not self._contains_hash(key_hash):
+                self._recent.add(key_hash)
+                new_hashes.append(key_hash)
+        if not new_hashes:
+            return
+        fd = os.open(self.log_path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        try:
+            os.write(fd, new_hashes.tobytes())
+        finally:
+            os.close(fd)
+        self._log_entries += len(new_hashes)
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+
+    def _bloom_header(self) -> bytes:
+        digest = hashlib.blake2b(self._base.tobytes(), digest_size=8).digest()
+        return BLOOM_HEADER.pack(BLOOM_MAGIC, len(self._base), digest)
+
+    def _read_bloom(self) -> Optional[BloomFilter]:
+        """The stored filter, or None when it is missing or was built from another sorted array"""
+        try:
+            with open(self.bloom_path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        if data[:BLOOM_HEADER.size] != self._bloom_header() or len(data) == BLOOM_HEADER.size:
+            return None
+        return BloomFilter(len(self._base), bits=bytearray(data[BLOOM_HEADER.size:]))
+
+    def _rebuild_bloom(self) -> None:
+        self._bloom = BloomFilter(len(self._base))
+        for key_hash in self._base:
+            self._bloom.add(key_hash)
+        _atomic_write(self.bloom_path, self._bloom_header() + bytes(self._bloom.bits))
+
+    def compact(self) -> None:
+        """Merge the append log into the sorted base file"""
+        merged = array("Q", sorted(set(self._base).union(self._recent)))
+        _atomic_write(self.keys_path, merged.tobytes())
+        # Keys appended by other processes after this point are recovered from the JSONL checkpoint
+        if os.path.exists(self.log_path):
+            os.remove(self.log_path)
+        self._base = merged
+        self._recent = set()
+        self._log_entries = 0
+        if self.use_bloom:
+            self._rebuild_bloom()
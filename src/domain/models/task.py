@@ -6,6 +6,15 @@ from pydantic import BaseModel, Field, validator
 from typing import Optional
 from enum import Enum
 
+from src.prefilter import Prefilter
+
+
+def _validate_prefilter(v: Optional[dict]) -> Optional[dict]:
+    """Reject prefilter rules the crawler could not use (PrefilterError is a ValueError)"""
+    if v:
+        Prefilter.from_config(v)
+    return v
+
 
 class TaskStatus(str, Enum):
     """Task status enum"""
@@ -34,6 +43,14 @@ class Task(BaseModel):
     region: Optional[str] = None
     is_running: bool = False
     is_public: bool = False
+    detail_concurrency: Optional[int] = None
+    analysis_concurrency: Optional[int] = None
+    prefilter: Optional[dict] = None
+    priority: int = 0
+    adaptive_schedule: bool = False
+    min_interval_minutes: Optional[int] = None
+    max_interval_minutes: Optional[int] = None
+    early_stop: Optional[bool] = None
 
     class Config:
         use_enum_values = True
@@ -70,6 +87,18 @@ class TaskCreate(BaseModel):
     new_publish_option: Optional[str] = None
     region: Optional[str] = None
     is_public: bool = False
+    detail_concurrency: Optional[int] = None
+    analysis_concurrency: Optional[int] = None
+    prefilter: Optional[dict] = None
+    priority: int = 0
+    adaptive_schedule: bool = False
+    min_interval_minutes: Optional[int] = None
+    max_interval_minutes: Optional[int] = None
+    early_stop: Optional[bool] = None
+
+    @validator('prefilter')
+    def validate_prefilter(cls, v):
+        return _validate_prefilter(v)
 
 
 class TaskUpdate(BaseModel):
@@ -91,6 +120,18 @@ class TaskUpdate(BaseModel):
     region: Optional[str] = None
     is_running: Optional[bool] = None
     is_public: Optional[bool] = None
+    detail_concurrency: Optional[int] = None
+    analysis_concurrency: Optional[int] = None
+    prefilter: Optional[dict] = None
+    priority: Optional[int] = None
+    adaptive_schedule: Optional[bool] = None
+    min_interval_minutes: Optional[int] = None
+    max_interval_minutes: Optional[int] = None
+    early_stop: Optional[bool] = None
+
+    @validator('prefilter')
+    def validate_prefilter(cls, v):
+        return _validate_prefilter(v)
 
 
 class TaskGenerateRequest(BaseModel):
@@ -0,0 +1,54 @@
+from dataclasses import dataclass
+from typing import Optional
+
+
+# new_publish_option value that sorts the search results newest first
+NEWEST_FIRST_OPTION = "up to date"
+
+
+@dataclass
+class EarlyStop:
+    """
+    Decides when further search pages cannot hold unseen items.
+
+    With newest-first results everything below a run of known items is older and known
+    too, so paging stops after known_items consecutive known items or known_pages pages
+    without a single new one. Items rejected by the pre-filter count as neither.
+    """
+    known_items: int = 10
+    known_pages: int = 1
+    consecutive_known: int = 0
+    fully_known_pages: int = 0
+    _page_new: int = 0
+    _page_known: int = 0
+
+    @classmethod
+    def for_task(cls, task_config: dict, new_publish_option: str, known_items: int, known_pages: int) -> Optional["EarlyStop"]:
+        """None when early stop does not apply: off for the task, or results not sorted newest first"""
+        enabled = task_config.get("early_stop")
+        if enabled is None:
+            enabled = new_publish_option == NEWEST_FIRST_OPTION
+        if not enabled or (known_items <= 0 and known_pages <= 0):
+            return None
+        return cls(known_items=known_items, known_pages=known_pages)
+
+    def observe(self, known: bool) -> None:
+        if known:
+            self.consecutive_known += 1
+            self._page_known += 1
+        else:
+            self.consecutive_known = 0
+            self._page_new += 1
+
+    def end_page(self) -> Optional[str]:
+        """Close the current page; returns why paging should stop, or None"""
+        if self._page_known and not self._page_new:
+            self.fully_known_pages += 1
+        else:
+            self.fully_known_pages = 0
+        self._page_new = self._page_known = 0
+        if self.known_items > 0 and self.consecutive_known >= self.known_items:
+            return f"{self.consecutive_known} known items in a row"
+        if self.known_pages > 0 and self.fully_known_pages >= self.known_pages:
+            return f"{self.fully_known_pages} page(s) without new items"
+        return None
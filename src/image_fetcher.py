@@ -0,0 +1,140 @@
+import asyncio
+import contextlib
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+import httpx
+
+
+@dataclass
+class FetchedImage:
+    """Image bytes kept in memory between download and AI analysis"""
+    url: str
+    data: bytes
+    content_type: str = "image/jpeg"
+
+
+class ImageBudgetExceeded(Exception):
+    pass
+
+
+class ImageFetcher:
+    """
+    Shared keep-alive HTTP client for product images.
+
+    Images of one item are fetched in parallel, bounded per host, and streamed into
+    memory. Each item has a wall-clock budget and a byte budget: images that do not
+    fit are dropped so the item is never slower than its slowest allowed image.
+    """
+
+    def __init__(
+        self,
+        headers: Optional[dict] = None,
+        max_connections: int = 16,
+        per_host_concurrency: int = 4,
+        max_image_bytes: int = 8 * 1024 * 1024,
+        max_item_bytes: int = 24 * 1024 * 1024,
+        item_timeout: float = 30.0,
+        retries: int = 2,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.headers = headers or {}
+        self.max_connections = max(1, max_connections)
+        self.per_host_concurrency = max(1, per_host_concurrency)
+        self.max_image_bytes = max_image_bytes
+        self.max_item_bytes = max_item_bytes
+        self.item_timeout = item_timeout
+        self.retries = max(1, retries)
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_loop = None
+        self._host_slots: Dict[str, asyncio.Semaphore] = {}
+
+    async def _get_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        client = self._client
+        if client is None or self._client_loop is not loop:
+            # Connections belong to the event loop that opened them
+            stale, client = client, httpx.AsyncClient(
+                headers=self.headers,
+                timeout=httpx.Timeout(20.0, connect=10.0),
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+                follow_redirects=True,
+                transport=self._transport,
+            )
+            self._client = client
+            self._client_loop = loop
+            self._host_slots = {}
+            if stale is not None:
+                # Release the old loop's connection pool (its sockets may already be unusable)
+                with contextlib.suppress(Exception):
+                    await stale.aclose()
+        return client
+
+    def _host_slot(self, url: str) -> asyncio.Semaphore:
+        host = urlparse(url).netloc
+        if host not in self._host_slots:
+            self._host_slots[host] = asyncio.Semaphore(self.per_host_concurrency)
+        return self._host_slots[host]
+
+    async def _fetch_one(self, url: str, item_bytes: List[int]) -> FetchedImage:
+        client = await self._get_client()
+        async with self._host_slot(url):
+            async with client.stream("GET", url) as response:
+                response.raise_for_status()
+                declared = int(response.headers.get("content-length") or 0)
+                if declared > self.max_image_bytes:
+                    raise ImageBudgetExceeded(f"image is {declared} bytes")
+                chunks = []
+                size = 0
+                async for chunk in response.aiter_bytes():
+                    size += len(chunk)
+                    item_bytes[0] += len(chunk)
+                    if size > self.max_image_bytes or item_bytes[0] > self.max_item_bytes:
+                        raise ImageBudgetExceeded(f"byte budget exhausted after {size} bytes")
+                    chunks.append(chunk)
+                content_type = response.headers.get("content-type", "").split(";")[0].strip()
+                if not content_type.startswith("image/"):
+                    content_type = "image/jpeg"
+                return FetchedImage(url=url, data=b"".join(chunks), content_type=content_type)
+
+    async def _fetch_with_retry(self, url: str, item_bytes: List[int], deadline: float) -> Optional[FetchedImage]:
+        for attempt in range(self.retries):
+            try:
+                return await self._fetch_one(url, item_bytes)
+            except ImageBudgetExceeded as e:
+                print(f"   [picture] Skipping {url}: {e}")
+                return None
+            except (httpx.HTTPError, OSError) as e:
+                remaining = deadline - time.monotonic()
+                if attempt + 1 >= self.retries or remaining < 1:
+                    print(f"   [picture] Download failed {url}: {type(e).__name__} - {e}")
+                    return None
+                await asyncio.sleep(min(1.0, remaining / 2))
+        return None
+
+    async def fetch_all(self, urls: List[str]) -> List[FetchedImage]:
+        """Fetch all urls of one item concurrently; the result keeps the input order"""
+        if not urls:
+            return []
+        item_bytes = [0]
+        deadline = time.monotonic() + self.item_timeout
+        tasks = [asyncio.create_task(self._fetch_with_retry(url, item_bytes, deadline)) for url in urls]
+        done, pending = await asyncio.wait(tasks, timeout=self.item_timeout)
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+            print(f"   [picture] {len(pending)} pictures exceeded the {self.item_timeout}s item budget and were skipped")
+        return [task.result() for task in tasks if task in done and not task.exception() and task.result()]
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._client_loop = None
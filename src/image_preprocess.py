@@ -0,0 +1,119 @@
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from src.image_fetcher import FetchedImage
+
+
+_FORMAT_MIME = {"JPEG": "image/jpeg", "WEBP": "image/webp", "PNG": "image/png"}
+
+
+@dataclass
+class PreprocessStats:
+    images_in: int = 0
+    images_out: int = 0
+    bytes_in: int = 0
+    bytes_out: int = 0
+    cache_hits: int = 0
+
+    def summary(self) -> str:
+        saved = self.bytes_in - self.bytes_out
+        ratio = (saved / self.bytes_in * 100) if self.bytes_in else 0.0
+        return (
+            f"{self.images_out}/{self.images_in} pictures, {self.bytes_in} -> {self.bytes_out} bytes "
+            f"(saved {saved} bytes, {ratio:.1f}%), cache hits {self.cache_hits}"
+        )
+
+
+class ImagePreprocessor:
+    """
+    Downscale and re-encode product images before they are sent to the AI model.
+
+    Results are cached in memory by content hash, so the same picture shared by
+    several listings or re-analysed on a later run is only decoded once.
+    """
+
+    def __init__(
+        self,
+        max_edge: int = 1024,
+        image_format: str = "JPEG",
+        quality: int = 80,
+        max_images: int = 0,
+        cache_size: int = 512,
+    ):
+        self.max_edge = max(0, int(max_edge))
+        self.image_format = image_format.upper() if image_format.upper() in _FORMAT_MIME else "JPEG"
+        self.quality = min(100, max(1, int(quality)))
+        self.max_images = max(0, int(max_images))
+        self.cache_size = max(0, int(cache_size))
+        self._cache: "OrderedDict[str, Tuple[bytes, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _cache_key(self, data: bytes) -> str:
+        digest = hashlib.sha256(data).hexdigest()
+        return f"{digest}:{self.max_edge}:{self.image_format}:{self.quality}"
+
+    def _cache_get(self, key: str) -> Optional[Tuple[bytes, str]]:
+        with self._lock:
+            value = self._cache.get(key)
+            if value is not None:
+                self._cache.move_to_end(key)
+            return value
+
+    def _cache_put(self, key: str, value: Tuple[bytes, str]) -> None:
+        if not self.cache_size:
+            return
+        with self._lock:
+            self._cache[key] = value
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _convert(self, data: bytes) -> Tuple[bytes, str]:
+        with Image.open(io.BytesIO(data)) as img:
+            img = ImageOps.exif_transpose(img)
+            if self.max_edge and max(img.size) > self.max_edge:
+                img.thumbnail((self.max_edge, self.max_edge), Image.LANCZOS)
+            if self.image_format == "JPEG" and img.mode not in ("RGB", "L"):
+                img = img.convert("RGBA")
+                background = Image.new("RGB", img.size, (255, 255, 255))
+                background.paste(img, mask=img.split()[-1])
+                img = background
+            out = io.BytesIO()
+            save_kwargs = {"optimize": True}
+            if self.image_format in ("JPEG", "WEBP"):
+                save_kwargs["quality"] = self.quality
+            img.save(out, format=self.image_format, **save_kwargs)
+        return out.getvalue(), _FORMAT_MIME[self.image_format]
+
+    def process_one(self, image: FetchedImage, stats: PreprocessStats) -> FetchedImage:
+        key = self._cache_key(image.data)
+        cached = self._cache_get(key)
+        if cached is not None:
+            stats.cache_hits += 1
+            data, content_type = cached
+        else:
+            try:
+                data, content_type = self._convert(image.data)
+            except (UnidentifiedImageError, OSError, ValueError) as e:
+                # Undecodable (e.g. HEIC without a plugin): send the original bytes
+                print(f"   [picture] Unable to re-encode {image.url}, sending original: {e}")
+                data, content_type = image.data, image.content_type
+            if len(data) >= len(image.data):
+                data, content_type = image.data, image.content_type
+            self._cache_put(key, (data, content_type))
+        return FetchedImage(url=image.url, data=data, content_type=content_type)
+
+    def process(self, images: List[FetchedImage]) -> Tuple[List[FetchedImage], PreprocessStats]:
+        """Limit, downscale and re-encode the pictures of one item; blocking, run it off the event loop"""
+        stats = PreprocessStats(images_in=len(images), bytes_in=sum(len(img.data) for img in images))
+        selected = images[:self.max_images] if self.max_images else images
+        result = [self.process_one(image, stats) for image in selected]
+        stats.images_out = len(result)
+        stats.bytes_out = sum(len(img.data) for img in result)
+        return result, stats
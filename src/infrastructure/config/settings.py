@@ -87,6 +87,29 @@ class ScraperSettings(_EnvSettings):
     login_is_edge: bool = _env_field(False, "LOGIN_IS_EDGE")
     running_in_docker: bool = _env_field(False, "RUNNING_IN_DOCKER")
     state_file: str = _env_field("xianyu_state.json", "STATE_FILE")
+    run_history_db: str = _env_field(os.path.join("data", "run_history.db"), "RUN_HISTORY_DB")
+
+
+class SchedulerSettings(_EnvSettings):
+    """Scheduled run queue and adaptive polling"""
+    max_concurrent_tasks: int = _env_field(3, "SCHEDULER_MAX_CONCURRENT_TASKS")
+    max_tasks_per_account: int = _env_field(1, "SCHEDULER_MAX_TASKS_PER_ACCOUNT")
+    jitter_seconds: int = _env_field(30, "SCHEDULER_JITTER_SECONDS")
+    start_spacing_seconds: float = _env_field(10, "SCHEDULER_START_SPACING_SECONDS")
+    max_queue_seconds: float = _env_field(1800, "SCHEDULER_MAX_QUEUE_SECONDS")
+    adaptive_min_interval_minutes: float = _env_field(10, "ADAPTIVE_MIN_INTERVAL_MINUTES")
+    adaptive_max_interval_minutes: float = _env_field(360, "ADAPTIVE_MAX_INTERVAL_MINUTES")
+    adaptive_target_new_items: float = _env_field(3, "ADAPTIVE_TARGET_NEW_ITEMS")
+
+
+class CacheSettings(_EnvSettings):
+    """Shared crawler cache locations"""
+    ai_cache_db: str = _env_field(os.path.join("data", "ai_cache.db"), "AI_CACHE_DB")
+    ai_cache_ttl_seconds: int = _env_field(7 * 24 * 3600, "AI_CACHE_TTL_SECONDS")
+    ai_cache_max_entries: int = _env_field(20000, "AI_CACHE_MAX_ENTRIES")
+    seller_cache_db: str = _env_field(os.path.join("data", "seller_cache.db"), "SELLER_CACHE_DB")
+    seller_head_ttl_seconds: int = _env_field(21600, "SELLER_HEAD_TTL_SECONDS")
+    seller_ratings_ttl_seconds: int = _env_field(86400, "SELLER_RATINGS_TTL_SECONDS")
 
 
 class AppSettings(_EnvSettings):
@@ -94,6 +117,20 @@ class AppSettings(_EnvSettings):
     server_port: int = _env_field(8000, "SERVER_PORT")
     web_username: str = _env_field("admin", "WEB_USERNAME")
     web_password: str = _env_field("admin123", "WEB_PASSWORD")
+    log_read_max_bytes: int = _env_field(256 * 1024, "LOG_READ_MAX_BYTES")
+    log_filter_max_scan_lines: int = _env_field(100000, "LOG_FILTER_MAX_SCAN_LINES")
+    log_stream_poll_interval: float = _env_field(0.5, "LOG_STREAM_POLL_INTERVAL")
+    log_stream_max_chunk_bytes: int = _env_field(64 * 1024, "LOG_STREAM_MAX_CHUNK_BYTES")
+    log_stream_max_pending: int = _env_field(32, "LOG_STREAM_MAX_PENDING")
+    log_rotate_max_mb: float = _env_field(10, "LOG_ROTATE_MAX_MB")
+    log_rotate_max_age_hours: float = _env_field(24, "LOG_ROTATE_MAX_AGE_HOURS")
+    log_rotate_check_seconds: float = _env_field(30, "LOG_ROTATE_CHECK_SECONDS")
+    log_archive_keep: int = _env_field(10, "LOG_ARCHIVE_KEEP")
+    log_archive_retention_days: float = _env_field(14, "LOG_ARCHIVE_RETENTION_DAYS")
+    log_archive_compression: str = _env_field("gzip", "LOG_ARCHIVE_COMPRESSION")
+    browser_worker_enabled: bool = _env_field(False, "BROWSER_WORKER_ENABLED")
+    browser_worker_host: str = _env_field("127.0.0.1", "BROWSER_WORKER_HOST")
+    browser_worker_port: int = _env_field(8765, "BROWSER_WORKER_PORT")
 
     # File path configuration
     config_file: str = "config.json"
@@ -119,7 +156,8 @@ def get_settings() -> AppSettings:
 
 def reload_settings() -> None:
     """Reload global configuration instance"""
-    global _settings_instance, settings, ai_settings, notification_settings, scraper_settings
+    global _settings_instance, settings, ai_settings, notification_settings, scraper_settings, cache_settings
+    global scheduler_settings
     from dotenv import load_dotenv
     from src.infrastructure.config.env_manager import env_manager
 
@@ -129,6 +167,8 @@ def reload_settings() -> None:
     ai_settings = AISettings()
     notification_settings = NotificationSettings()
     scraper_settings = ScraperSettings()
+    cache_settings = CacheSettings()
+    scheduler_settings = SchedulerSettings()
 
 
 # Export configuration instances for easy access
@@ -136,3 +176,5 @@ settings = get_settings()
 ai_settings = AISettings()
 notification_settings = NotificationSettings()
 scraper_settings = ScraperSettings()
+cache_settings = CacheSettings()
+scheduler_settings = SchedulerSettings()
@@ -2,19 +2,20 @@
 JSON-based product repository
 Handles products from JSONL files with public API support
 """
+import asyncio
 import os
 import json
-import glob
-from typing import List, Optional, Dict, Set
+from typing import List, Optional, Set
 from src.domain.models.product import ProductPublic, ProductFilter, PaginatedProducts
-from src.domain.models.task import Task
+from src.infrastructure.persistence.sqlite_product_index import SqliteProductIndex
 
 
 class JsonProductRepository:
-    """JSON-based product repository"""
+    """JSON-based product repository, queries go through the SQLite product index"""
 
-    def __init__(self, jsonl_dir: str = "jsonl"):
+    def __init__(self, jsonl_dir: str = "jsonl", index: Optional[SqliteProductIndex] = None):
         self.jsonl_dir = jsonl_dir
+        self.index = index or SqliteProductIndex(jsonl_dir=jsonl_dir)
 
     async def get_all_jsonl_files(self) -> List[str]:
         """Get all JSONL files"""
@@ -60,104 +61,27 @@ class JsonProductRepository:
 
         return all_products
 
-    def _parse_price(self, price_str: str) -> Optional[float]:
-        """Parse price string to float"""
-        if not price_str:
-            return None
-        try:
-            cleaned = price_str.replace('¥', '').replace(',', '').strip()
-            return float(cleaned)
-        except (ValueError, AttributeError):
-            return None
-
-    def _filter_products(self, products: List[dict], filters: ProductFilter) -> List[dict]:
-        """Apply filters to products"""
-        filtered = products
-
-        if filters.search:
-            search_lower = filters.search.lower()
-            filtered = [
-                p for p in filtered
-                if search_lower in p.get('Product information', {}).get('Product title', '').lower()
-                or search_lower in p.get('Task name', '').lower()
-            ]
-
-        if filters.min_price is not None or filters.max_price is not None:
-            filtered = [
-                p for p in filtered
-                if self._should_include_price(
-                    p.get('Product information', {}).get('Current selling price', ''),
-                    filters.min_price,
-                    filters.max_price
-                )
-            ]
-
-        if filters.task_name:
-            filtered = [
-                p for p in filtered
-                if p.get('Task name', '') == filters.task_name
-            ]
-
-        if filters.is_recommended is not None:
-            filtered = [
-                p for p in filtered
-                if p.get('ai_analysis', {}).get('is_recommended') == filters.is_recommended
-            ]
-
-        return filtered
-
-    def _should_include_price(self, price_str: str, min_price: Optional[float], max_price: Optional[float]) -> bool:
-        """Check if price falls within range"""
-        price = self._parse_price(price_str)
-        if price is None:
-            return True
-        if min_price is not None and price < min_price:
-            return False
-        if max_price is not None and price > max_price:
-            return False
-        return True
-
-    def _sort_products(self, products: List[dict], sort_by: str, sort_order: str) -> List[dict]:
-        """Sort products"""
-        reverse = sort_order == 'desc'
-
-        if sort_by == 'price':
-            def price_key(p):
-                price = self._parse_price(p.get('Product information', {}).get('Current selling price', ''))
-                return price if price is not None else 0.0
-            products.sort(key=price_key, reverse=reverse)
-        elif sort_by == 'publish_time':
-            def time_key(p):
-                return p.get('Product information', {}).get('Release time', '')
-            products.sort(key=time_key, reverse=reverse)
-        else:
-            def crawl_key(p):
-                return p.get('Crawl time', '')
-            products.sort(key=crawl_key, reverse=reverse)
-
-        return products
-
     async def search(self, filters: ProductFilter, public_task_names: Set[str]) -> PaginatedProducts:
         """Search products with filters"""
-        all_products = await self.load_all_products()
-
-        filtered_products = self._filter_products(all_products, filters)
-        sorted_products = self._sort_products(filtered_products, filters.sort_by, filters.sort_order)
-
-        total_items = len(sorted_products)
+        # SQLite work (and the first full index build) runs off the event loop
+        await asyncio.to_thread(self.index.sync)
+        records, total_items = await asyncio.to_thread(
+            self.index.query,
+            search=filters.search,
+            min_price=filters.min_price,
+            max_price=filters.max_price,
+            task_name=filters.task_name,
+            is_recommended=filters.is_recommended,
+            task_names=public_task_names,
+            sort_by=filters.sort_by,
+            sort_order=filters.sort_order,
+            page=filters.page,
+            limit=filters.limit,
+        )
         total_pages = (total_items + filters.limit - 1) // filters.limit
 
-        start = (filters.page - 1) * filters.limit
-        end = start + filters.limit
-        paginated_products = sorted_products[start:end]
-
-        public_products = [
-            ProductPublic.from_jsonl_record(p) for p in paginated_products
-            if p.get('Task name') in public_task_names
-        ]
-
         return PaginatedProducts(
-            items=public_products,
+            items=[ProductPublic.from_jsonl_record(p) for p in records],
             total_items=total_items,
             page=filters.page,
             limit=filters.limit,
@@ -166,10 +90,8 @@ class JsonProductRepository:
 
     async def get_by_id(self, product_id: str) -> Optional[ProductPublic]:
         """Get product by ID"""
-        all_products = await self.load_all_products()
-
-        for product in all_products:
-            if f"{product.get('Task name', '')}_{product.get('Product information', {}).get('commodityID', '')}" == product_id:
-                return ProductPublic.from_jsonl_record(product)
-
+        await asyncio.to_thread(self.index.sync)
+        record = await asyncio.to_thread(self.index.get_by_product_id, product_id)
+        if record:
+            return ProductPublic.from_jsonl_record(record)
         return None
@@ -0,0 +1,177 @@
+"""
+Incremental JSONL ingestion
+Reads only the lines appended since the last checkpoint and detects truncation / rotation
+"""
+import hashlib
+import json
+import os
+import threading
+from dataclasses import dataclass, field, asdict
+from typing import Dict, List, Optional
+
+
+# Number of leading bytes fingerprinted to detect a file that was truncated and regrown
+HEAD_FINGERPRINT_BYTES = 256
+
+# Upper bound of bytes parsed per read so catching up on a large file keeps memory bounded
+DEFAULT_MAX_READ_BYTES = 8 * 1024 * 1024
+
+
+@dataclass
+class FileCheckpoint:
+    """Position of a consumer inside a JSONL file"""
+    offset: int = 0
+    inode: int = 0
+    size: int = 0
+    head_len: int = 0
+    head_digest: str = ""
+
+    @classmethod
+    def from_dict(cls, data: Optional[dict]) -> "FileCheckpoint":
+        if not data:
+            return cls()
+        return cls(**{k: data[k] for k in cls.__dataclass_fields__ if k in data})
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+@dataclass
+class TailBatch:
+    """Result of one incremental read"""
+    records: List[dict] = field(default_factory=list)
+    checkpoint: FileCheckpoint = field(default_factory=FileCheckpoint)
+    reset: bool = False
+    exhausted: bool = True
+
+
+def _head_digest(f, length: int) -> str:
+    f.seek(0)
+    return hashlib.sha1(f.read(length)).hexdigest()
+
+
+def parse_jsonl_lines(lines: List[bytes]) -> List[dict]:
+    """Decode JSONL lines, skipping blank or malformed entries"""
+    records = []
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            continue
+        if isinstance(record, dict):
+            records.append(record)
+    return records
+
+
+def read_appended(
+    path: str,
+    checkpoint: Optional[FileCheckpoint] = None,
+    max_bytes: int = DEFAULT_MAX_READ_BYTES,
+) -> TailBatch:
+    """
+    Read complete lines appended to path after checkpoint.
+
+    A batch with reset=True means the file was truncated, replaced or rotated since the
+    checkpoint was taken: consumers must discard everything derived from the old content
+    before applying the batch. A trailing line without newline is left for the next read.
+    """
+    checkpoint = checkpoint or FileCheckpoint()
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return TailBatch(checkpoint=FileCheckpoint(), reset=checkpoint.offset > 0)
+
+    inode = getattr(stat, "st_ino", 0) or 0
+    size = stat.st_size
+    reset = False
+
+    with open(path, "rb") as f:
+        if checkpoint.offset > 0:
+            if (checkpoint.inode and inode and checkpoint.inode != inode) or size < checkpoint.offset:
+                reset = True
+            elif checkpoint.head_len and _head_digest(f, checkpoint.head_len) != checkpoint.head_digest:
+                reset = True
+        if reset:
+            checkpoint = FileCheckpoint()
+
+        if size == checkpoint.offset:
+            return TailBatch(checkpoint=checkpoint, reset=reset)
+
+        f.seek(checkpoint.offset)
+        data = f.read(min(size - checkpoint.offset, max(1, max_bytes)))
+        end = data.rfind(b"\n")
+        if end == -1:
+            if checkpoint.offset + len(data) < size:
+                # A single line is longer than max_bytes: read it whole rather than stall
+                f.seek(checkpoint.offset)
+                data = f.readline()
+                end = len(data) - 1 if data.endswith(b"\n") else -1
+            if end == -1:
+                return TailBatch(checkpoint=checkpoint, reset=reset)
+
+        consumed = data[:end + 1]
+        new_offset = checkpoint.offset + len(consumed)
+        head_len = min(new_offset, HEAD_FINGERPRINT_BYTES)
+        if head_len != checkpoint.head_len:
+            head_digest = _head_digest(f, head_len)
+        else:
+            head_digest = checkpoint.head_digest
+
+    new_checkpoint = FileCheckpoint(
+        offset=new_offset,
+        inode=inode,
+        size=size,
+        head_len=head_len,
+        head_digest=head_digest,
+    )
+    return TailBatch(
+        records=parse_jsonl_lines(consumed.splitlines()),
+        checkpoint=new_checkpoint,
+        reset=reset,
+        exhausted=new_offset >= size,
+    )
+
+
+def iter_new_batches(path: str, checkpoint: Optional[FileCheckpoint] = None, max_bytes: int = DEFAULT_MAX_READ_BYTES):
+    """Yield bounded batches until the checkpoint has caught up with the file"""
+    while True:
+        previous_offset = checkpoint.offset if checkpoint else 0
+        batch = read_appended(path, checkpoint, max_bytes)
+        yield batch
+        checkpoint = batch.checkpoint
+        if batch.exhausted or (not batch.reset and checkpoint.offset == previous_offset):
+            break
+
+
+class JsonlRecordCache:
+    """In-memory record list per JSONL file, refreshed by reading appended lines only"""
+
+    def __init__(self):
+        self._entries: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def get_records(self, path: str) -> List[dict]:
+        """Return all records of path, parsing only what was appended since the last call"""
+        key = os.path.abspath(path)
+        with self._lock:
+            checkpoint, records = self._entries.get(key, (FileCheckpoint(), []))
+            if not os.path.exists(path):
+                self._entries.pop(key, None)
+                return []
+            for batch in iter_new_batches(path, checkpoint):
+                if batch.reset:
+                    records = []
+                records.extend(batch.records)
+                checkpoint = batch.checkpoint
+            self._entries[key] = (checkpoint, records)
+            return list(records)
+
+    def invalidate(self, path: str) -> None:
+        with self._lock:
+            self._entries.pop(os.path.abspath(path), None)
+
+
+# Shared cache used by API routes in this process
+result_record_cache = JsonlRecordCache()
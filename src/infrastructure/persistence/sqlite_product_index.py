@@ -0,0 +1,308 @@
+"""
+SQLite-based product index
+Incrementally ingests JSONL result files so public marketplace queries run as indexed SQL
+"""
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Set, Tuple
+
+from src.infrastructure.persistence.jsonl_tailer import FileCheckpoint, iter_new_batches
+
+
+def parse_price(price_str) -> Optional[float]:
+    """Parse price string to float"""
+    if price_str is None or price_str == "":
+        return None
+    try:
+        cleaned = str(price_str).replace('¥', '').replace(',', '').strip()
+        return float(cleaned)
+    except (ValueError, AttributeError):
+        return None
+
+
+class SqliteProductIndex:
+    """Persistent product index built from jsonl/*.jsonl files"""
+
+    SORT_COLUMNS = {
+        "price": "COALESCE(price, 0.0)",
+        "publish_time": "publish_time",
+        "crawl_time": "crawl_time",
+    }
+
+    # FTS5 trigram tokenizer needs at least 3 characters to match a substring
+    FTS_MIN_QUERY_LENGTH = 3
+
+    _lock = threading.Lock()
+
+    def __init__(self, jsonl_dir: str = "jsonl", db_path: str = os.path.join("data", "product_index.db")):
+        self.jsonl_dir = jsonl_dir
+        self.db_path = db_path
+        self.fts_enabled = False
+        self._ensure_schema()
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _ensure_schema(self):
+        """Create tables and indexes if they do not exist"""
+        db_dir = os.path.dirname(self.db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS products (
+                    task_name TEXT NOT NULL,
+                    commodity_id TEXT NOT NULL,
+                    product_id TEXT NOT NULL,
+                    source_file TEXT NOT NULL,
+                    title TEXT NOT NULL DEFAULT '',
+                    price REAL,
+                    crawl_time TEXT NOT NULL DEFAULT '',
+                    publish_time TEXT NOT NULL DEFAULT '',
+                    is_recommended INTEGER,
+                    record TEXT NOT NULL,
+                    PRIMARY KEY (task_name, commodity_id)
+                );
+                CREATE INDEX IF NOT EXISTS idx_products_product_id ON products(product_id);
+                CREATE INDEX IF NOT EXISTS idx_products_source_file ON products(source_file);
+                CREATE INDEX IF NOT EXISTS idx_products_task_crawl ON products(task_name, crawl_time);
+                CREATE INDEX IF NOT EXISTS idx_products_crawl_time ON products(crawl_time);
+                CREATE INDEX IF NOT EXISTS idx_products_price ON products(price);
+                CREATE INDEX IF NOT EXISTS idx_products_recommended ON products(is_recommended, crawl_time);
+
+                CREATE TABLE IF NOT EXISTS ingested_files (
+                    filename TEXT PRIMARY KEY,
+                    offset INTEGER NOT NULL DEFAULT 0,
+                    size INTEGER NOT NULL DEFAULT 0
+                );
+                """
+            )
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(ingested_files)")}
+            for column, ddl in (
+                ("inode", "INTEGER NOT NULL DEFAULT 0"),
+                ("head_len", "INTEGER NOT NULL DEFAULT 0"),
+                ("head_digest", "TEXT NOT NULL DEFAULT ''"),
+            ):
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE ingested_files ADD COLUMN {column} {ddl}")
+            try:
+                conn.executescript(
+                    """
+                    CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(
+                        title, task_name,
+                        content='products', content_rowid='rowid', tokenize='trigram'
+                    );
+                    CREATE TRIGGER IF NOT EXISTS products_ai AFTER INSERT ON products BEGIN
+                        INSERT INTO products_fts(rowid, title, task_name) VALUES (new.rowid, new.title, new.task_name);
+                    END;
+                    CREATE TRIGGER IF NOT EXISTS products_ad AFTER DELETE ON products BEGIN
+                        INSERT INTO products_fts(products_fts, rowid, title, task_name)
+                        VALUES ('delete', old.rowid, old.title, old.task_name);
+                    END;
+                    CREATE TRIGGER IF NOT EXISTS products_au AFTER UPDATE ON products BEGIN
+                        INSERT INTO products_fts(products_fts, rowid, title, task_name)
+                        VALUES ('delete', old.rowid, old.title, old.task_name);
+                        INSERT INTO products_fts(rowid, title, task_name) VALUES (new.rowid, new.title, new.task_name);
+                    END;
+                    """
+                )
+                self.fts_enabled = True
+            except sqlite3.OperationalError as e:
+                # SQLite built without FTS5/trigram: fall back to LIKE scans on title
+                print(f"Product index full-text search unavailable, falling back to LIKE: {e}")
+                self.fts_enabled = False
+
+    # ------------------------------------------------------------------
+    # Ingestion
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _row_from_record(record: dict, filename: str) -> Optional[Tuple]:
+        product_info = record.get('Product information') or {}
+        commodity_id = product_info.get('commodityID')
+        if not commodity_id:
+            return None
+        task_name = record.get('Task name', '') or ''
+        ai_analysis = record.get('ai_analysis') or {}
+        is_recommended = ai_analysis.get('is_recommended') if isinstance(ai_analysis, dict) else None
+        return (
+            task_name,
+            str(commodity_id),
+            f"{task_name}_{commodity_id}",
+            filename,
+            product_info.get('Product title', '') or '',
+            parse_price(product_info.get('Current selling price', '')),
+            record.get('Crawl time', '') or '',
+            product_info.get('Release time', '') or '',
+            None if is_recommended is None else int(bool(is_recommended)),
+            json.dumps(record, ensure_ascii=False),
+        )
+
+    def _ingest_records(self, conn: sqlite3.Connection, filename: str, records: List[dict]) -> int:
+        rows = [row for row in (self._row_from_record(r, filename) for r in records) if row]
+        if rows:
+            conn.executemany(
+                """
+                INSERT INTO products (
+                    task_name, commodity_id, product_id, source_file, title,
+                    price, crawl_time, publish_time, is_recommended, record
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(task_name, commodity_id) DO UPDATE SET
+                    product_id = excluded.product_id,
+                    source_file = excluded.source_file,
+                    title = excluded.title,
+                    price = excluded.price,
+                    crawl_time = excluded.crawl_time,
+                    publish_time = excluded.publish_time,
+                    is_recommended = excluded.is_recommended,
+                    record = excluded.record
+                """,
+                rows,
+            )
+        return len(rows)
+
+    def _drop_file(self, conn: sqlite3.Connection, filename: str) -> None:
+        conn.execute("DELETE FROM products WHERE source_file = ?", (filename,))
+        conn.execute("DELETE FROM ingested_files WHERE filename = ?", (filename,))
+
+    def _sync_file(self, conn: sqlite3.Connection, filename: str, row: Optional[sqlite3.Row]) -> int:
+        filepath = os.path.join(self.jsonl_dir, filename)
+        checkpoint = FileCheckpoint.from_dict(dict(row)) if row else FileCheckpoint()
+
+        count = 0
+        for batch in iter_new_batches(filepath, checkpoint):
+            if batch.reset:
+                # File was truncated, replaced or rotated: rebuild it from the beginning
+                conn.execute("DELETE FROM products WHERE source_file = ?", (filename,))
+            count += self._ingest_records(conn, filename, batch.records)
+            if batch.checkpoint != checkpoint:
+                checkpoint = batch.checkpoint
+                conn.execute(
+                    """
+                    INSERT OR REPLACE INTO ingested_files (filename, offset, inode, size, head_len, head_digest)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    """,
+                    (filename, checkpoint.offset, checkpoint.inode, checkpoint.size,
+                     checkpoint.head_len, checkpoint.head_digest),
+                )
+            conn.commit()
+        return count
+
+    def sync(self) -> int:
+        """Ingest newly appended JSONL lines, return the number of new rows"""
+        if os.path.isdir(self.jsonl_dir):
+            files = {f for f in os.listdir(self.jsonl_dir) if f.endswith(".jsonl")}
+        else:
+            files = set()
+
+        ingested = 0
+        with self._lock, self._connect() as conn:
+            checkpoints: Dict[str, sqlite3.Row] = {
+                row["filename"]: row for row in conn.execute("SELECT * FROM ingested_files")
+            }
+            for filename in set(checkpoints) - files:
+                self._drop_file(conn, filename)
+            for filename in sorted(files):
+                try:
+                    ingested += self._sync_file(conn, filename, checkpoints.get(filename))
+                except OSError as e:
+                    print(f"Product index failed to ingest {filename}: {e}")
+        return ingested
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def _build_where(
+        self,
+        search: Optional[str] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        task_name: Optional[str] = None,
+        is_recommended: Optional[bool] = None,
+        task_names: Optional[Set[str]] = None,
+        source_file: Optional[str] = None,
+    ) -> Tuple[str, List]:
+        clauses, params = [], []
+
+        if search:
+            if self.fts_enabled and len(search) >= self.FTS_MIN_QUERY_LENGTH:
+                clauses.append("rowid IN (SELECT rowid FROM products_fts WHERE products_fts MATCH ?)")
+                params.append('"' + search.replace('"', '""') + '"')
+            else:
+                clauses.append("(title LIKE ? ESCAPE '\\' OR task_name LIKE ? ESCAPE '\\')")
+                pattern = "%" + search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+                params.extend([pattern, pattern])
+
+        if min_price is not None:
+            clauses.append("(price IS NULL OR price >= ?)")
+            params.append(min_price)
+        if max_price is not None:
+            clauses.append("(price IS NULL OR price <= ?)")
+            params.append(max_price)
+
+        if task_name:
+            clauses.append("task_name = ?")
+            params.append(task_name)
+
+        if is_recommended is not None:
+            clauses.append("is_recommended = ?")
+            params.append(int(is_recommended))
+
+        if task_names is not None:
+            if not task_names:
+                clauses.append("0")
+            else:
+                clauses.append(f"task_name IN ({', '.join('?' for _ in task_names)})")
+                params.extend(sorted(task_names))
+
+        if source_file is not None:
+            clauses.append("source_file = ?")
+            params.append(source_file)
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return where, params
+
+    def query(
+        self,
+        sort_by: str = "crawl_time",
+        sort_order: str = "desc",
+        page: int = 1,
+        limit: int = 20,
+        **filters,
+    ) -> Tuple[List[dict], int]:
+        """Filter, sort and paginate records, return (records, total_items)"""
+        where, params = self._build_where(**filters)
+        order_column = self.SORT_COLUMNS.get(sort_by, self.SORT_COLUMNS["crawl_time"])
+        direction = "DESC" if sort_order == "desc" else "ASC"
+        page = max(1, page)
+        limit = max(1, limit)
+
+        with self._connect() as conn:
+            total = conn.execute(f"SELECT COUNT(*) FROM products {where}", params).fetchone()[0]
+            rows = conn.execute(
+                f"SELECT record FROM products {where} ORDER BY {order_column} {direction}, rowid {direction} "
+                f"LIMIT ? OFFSET ?",
+                params + [limit, (page - 1) * limit],
+            ).fetchall()
+        return [json.loads(row["record"]) for row in rows], total
+
+    def get_by_product_id(self, product_id: str) -> Optional[dict]:
+        """Get a raw record by its public product id (task name + commodity id)"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT record FROM products WHERE product_id = ?", (product_id,)
+            ).fetchone()
+        return json.loads(row["record"]) if row else None
@@ -0,0 +1,91 @@
+import asyncio
+import os
+from typing import Awaitable, Callable, Coroutine, Dict, List, Optional, Set
+
+
+class RiskControlError(Exception):
+    pass
+
+
+def _int_setting(value, default: int) -> int:
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def get_pipeline_settings(task_config: dict) -> dict:
+    """Concurrency of the item pipeline: task config first, then the environment, never below 1"""
+    detail_concurrency = _int_setting(task_config.get("detail_concurrency"), _int_setting(os.getenv("DETAIL_CONCURRENCY"), 1))
+    analysis_concurrency = _int_setting(task_config.get("analysis_concurrency"), _int_setting(os.getenv("AI_CONCURRENCY"), 2))
+    account_concurrency = _int_setting(os.getenv("ACCOUNT_DETAIL_CONCURRENCY"), 1)
+    return {
+        "detail_concurrency": max(1, detail_concurrency),
+        "analysis_concurrency": max(1, analysis_concurrency),
+        "account_concurrency": max(1, account_concurrency),
+    }
+
+
+# Browser-stage slots shared by every task of this process that uses the same account
+_account_slots: Dict[str, asyncio.Semaphore] = {}
+
+
+def get_account_slots(state_file: str, limit: int) -> asyncio.Semaphore:
+    """The first run of an account fixes its limit; later runs share the same semaphore"""
+    key = os.path.abspath(state_file)
+    if key not in _account_slots:
+        _account_slots[key] = asyncio.Semaphore(limit)
+    return _account_slots[key]
+
+
+class ItemPipeline:
+    """
+    The per-item tasks of one crawl attempt.
+
+    At most max_pending items are in flight. A RiskControlError inside an item task does not
+    die with the task: it is kept and re-raised by the next wait_for_capacity/drain call, so it
+    ends the attempt and reaches the account/proxy rotation loop like one raised by the page.
+    """
+
+    def __init__(self, max_pending: int, flush: Optional[Callable[[], Awaitable[None]]] = None):
+        self.max_pending = max(1, max_pending)
+        # Awaited while draining: no more items will arrive for a partly filled AI batch
+        self.flush = flush
+        self.pending: Set[asyncio.Task] = set()
+        self.errors: List[BaseException] = []
+
+    def spawn(self, coro: Coroutine) -> asyncio.Task:
+        task = asyncio.create_task(self._run(coro))
+        self.pending.add(task)
+        task.add_done_callback(self.pending.discard)
+        return task
+
+    async def _run(self, coro: Coroutine) -> None:
+        try:
+            await coro
+        except RiskControlError as e:
+            self.errors.append(e)
+
+    def raise_error(self) -> None:
+        if self.errors:
+            raise self.errors[0]
+
+    async def wait_for_capacity(self) -> None:
+        while len(self.pending) >= self.max_pending:
+            await asyncio.wait(set(self.pending), return_when=asyncio.FIRST_COMPLETED)
+            self.raise_error()
+
+    async def drain(self, poll_interval: float = 5) -> None:
+        while self.pending:
+            await asyncio.wait(set(self.pending), timeout=poll_interval)
+            if self.flush:
+                await self.flush()
+        self.raise_error()
+
+    async def cancel(self) -> None:
+        for task in list(self.pending):
+            task.cancel()
+        if self.pending:
+            await asyncio.gather(*list(self.pending), return_exceptions=True)
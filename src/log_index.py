@@ -0,0 +1,166 @@
+import hashlib
+import json
+import os
+import threading
+from typing import List, Tuple
+
+
+class LogLineIndex:
+    """
+    Sparse line-offset index of an append-only log, persisted next to it as <log>.idx.
+
+    Every `stride`-th line start is recorded, so any page of lines counted from the end is one
+    seek to the nearest checkpoint plus a read of at most stride + limit lines. The index is
+    extended from where it stopped whenever the log grew, and rebuilt when the log was
+    truncated or replaced (detected by size and a hash of its first bytes). The sidecar is
+    rewritten only when a checkpoint is added: an older snapshot is still valid, scanning just
+    resumes from further back.
+    """
+
+    HEAD_BYTES = 256
+    PAGE_READ_SIZE = 64 * 1024
+
+    def __init__(self, log_path: str, stride: int = 1000, read_size: int = 1024 * 1024):
+        self.log_path = log_path
+        self.index_path = f"{log_path}.idx"
+        self.stride = max(1, stride)
+        self.read_size = read_size
+        self._saved_checkpoints = 0
+        self._lock = threading.RLock()
+        self.size = 0
+        self.complete_lines = 0
+        self.head_len = 0
+        self.head = ""
+        self.checkpoints: List[int] = [0]
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("stride") != self.stride:
+            return
+        self.size = int(data.get("size", 0))
+        self.complete_lines = int(data.get("complete_lines", 0))
+        self.head_len = int(data.get("head_len", 0))
+        self.head = data.get("head", "")
+        self.checkpoints = list(data.get("checkpoints") or [0])
+        self._saved_checkpoints = len(self.checkpoints)
+
+    def _save(self) -> None:
+        payload = {
+            "stride": self.stride,
+            "size": self.size,
+            "complete_lines": self.complete_lines,
+            "head_len": self.head_len,
+            "head": self.head,
+            "checkpoints": self.checkpoints,
+        }
+        tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(payload, f)
+        os.replace(tmp_path, self.index_path)
+        self._saved_checkpoints = len(self.checkpoints)
+
+    def _reset(self) -> None:
+        self.size = 0
+        self.complete_lines = 0
+        self.head_len = 0
+        self.head = ""
+        self.checkpoints = [0]
+        self._saved_checkpoints = 0
+
+    @staticmethod
+    def _hash_prefix(f, length: int) -> str:
+        f.seek(0)
+        return hashlib.sha1(f.read(length)).hexdigest()
+
+    def update(self) -> int:
+        """Bring the index up to the current end of the log; returns the log size"""
+        with self._lock:
+            return self._update()
+
+    def _update(self) -> int:
+        try:
+            f = open(self.log_path, "rb")
+        except FileNotFoundError:
+            self._reset()
+            return 0
+        with f:
+            f.seek(0, os.SEEK_END)
+            file_size = f.tell()
+            if file_size < self.size or (self.head_len and self._hash_prefix(f, self.head_len) != self.head):
+                # Truncated, cleared or replaced
+                self._reset()
+
+            # self.size is the end of the last complete line; a trailing partial line is scanned again next time
+            pos = self.size
+            f.seek(pos)
+            while pos < file_size:
+                chunk = f.read(min(self.read_size, file_size - pos))
+                if not chunk:
+                    break
+                newline = chunk.find(b"\n")
+                while newline >= 0:
+                    self.complete_lines += 1
+                    if self.complete_lines % self.stride == 0:
+                        self.checkpoints.append(pos + newline + 1)
+                    self.size = pos + newline + 1
+                    newline = chunk.find(b"\n", newline + 1)
+                pos += len(chunk)
+
+            if self.head_len < min(self.HEAD_BYTES, self.size):
+                self.head_len = min(self.HEAD_BYTES, self.size)
+                self.head = self._hash_prefix(f, self.head_len)
+            if len(self.checkpoints) != self._saved_checkpoints:
+                self._save()
+            return file_size
+
+    def total_lines(self) -> int:
+        """Lines in the log, counting a trailing line that has no newline yet"""
+        with self._lock:
+            file_size = self._update()
+            return self.complete_lines + (1 if file_size > self.size else 0)
+
+    def tail(self, offset_lines: int, limit_lines: int) -> Tuple[List[str], bool, int]:
+        """Lines [total - offset - limit, total - offset), counted from the end; (lines, has_more, file_size)"""
+        with self._lock:
+            return self._tail(offset_lines, limit_lines)
+
+    def _tail(self, offset_lines: int, limit_lines: int) -> Tuple[List[str], bool, int]:
+        file_size = self._update()
+        if file_size == 0 or limit_lines <= 0:
+            return [], False, file_size
+        has_partial = file_size > self.size
+        total = self.complete_lines + (1 if has_partial else 0)
+        end = max(0, total - max(0, offset_lines))
+        start = max(0, end - limit_lines)
+        if end <= start:
+            return [], False, file_size
+
+        checkpoint = start // self.stride
+        with open(self.log_path, "rb") as f:
+            f.seek(self.checkpoints[checkpoint])
+            lines = self._read_lines(f, end - checkpoint * self.stride, file_size)
+        selected = lines[start - checkpoint * self.stride:]
+        return [line.decode("utf-8", errors="replace") for line in selected], start > 0, file_size
+
+    def _read_lines(self, f, count: int, file_size: int) -> List[bytes]:
+        """Up to count lines from the current position, without reading past file_size"""
+        lines: List[bytes] = []
+        remainder = b""
+        pos = f.tell()
+        while len(lines) < count and pos < file_size:
+            chunk = f.read(min(self.PAGE_READ_SIZE, file_size - pos))
+            if not chunk:
+                break
+            pos += len(chunk)
+            parts = (remainder + chunk).split(b"\n")
+            remainder = parts.pop()
+            lines.extend(part.rstrip(b"\r") for part in parts)
+        if remainder and len(lines) < count:
+            lines.append(remainder.rstrip(b"\r"))
+        return lines[:count]
+
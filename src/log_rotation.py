@@ -0,0 +1,345 @@
+import gzip
+import io
+import json
+import os
+import threading
+import time
+from typing import BinaryIO, Callable, Dict, List, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+from src.log_index import LogLineIndex
+
+
+ARCHIVE_EXTENSIONS = {"gzip": ".gz", "zstd": ".zst"}
+
+# Rotation and reads of the same log are serialized within the process (the API server does both)
+_path_locks: Dict[str, threading.Lock] = {}
+_path_locks_guard = threading.Lock()
+
+
+def _lock_for(log_path: str) -> threading.Lock:
+    with _path_locks_guard:
+        return _path_locks.setdefault(os.path.abspath(log_path), threading.Lock())
+
+
+def _open_archive_reader(path: str) -> BinaryIO:
+    if path.endswith(".zst"):
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read .zst log archives")
+        return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True))
+    return gzip.open(path, "rb")
+
+
+def _open_archive_writer(path: str) -> BinaryIO:
+    if path.endswith(".zst"):
+        return zstandard.ZstdCompressor(level=10).stream_writer(open(path, "wb"), closefd=True)
+    return gzip.open(path, "wb", compresslevel=6)
+
+
+class LogSegments:
+    """
+    A task log as one continuous stream: compressed archived segments followed by the active file.
+
+    Positions are virtual byte offsets over the whole stream. The manifest (<log>.segments.json)
+    records where each archive starts and where the active file starts (base), so cursors handed
+    out before a rotation stay valid after it.
+    """
+
+    def __init__(self, log_path: str, line_index: Optional[LogLineIndex] = None):
+        self.log_path = log_path
+        self.manifest_path = f"{log_path}.segments.json"
+        self.line_index = line_index or LogLineIndex(log_path)
+        self.lock = _lock_for(log_path)
+
+    def load(self) -> dict:
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return {"base": 0, "segments": []}
+        manifest.setdefault("base", 0)
+        manifest.setdefault("segments", [])
+        return manifest
+
+    def save(self, manifest: dict) -> None:
+        tmp_path = f"{self.manifest_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, self.manifest_path)
+
+    def archive_path(self, segment: dict) -> str:
+        return os.path.join(os.path.dirname(self.log_path), segment["file"])
+
+    def _active_size(self) -> int:
+        try:
+            return os.path.getsize(self.log_path)
+        except OSError:
+            return 0
+
+    def size(self) -> int:
+        """Virtual size: everything ever written to this log (archived or active)"""
+        with self.lock:
+            return self.load()["base"] + self._active_size()
+
+    def read_chunk(self, pos: int, max_bytes: int) -> Tuple[bytes, int, int]:
+        """
+        At most max_bytes from virtual position pos, ending on a line break unless the chunk
+        reaches the end of its segment or is one over-long line. Returns (data, next_pos, size).
+        A position inside an archive that retention already removed skips to the oldest data kept.
+        """
+        with self.lock:
+            manifest = self.load()
+            base = manifest["base"]
+            total = base + self._active_size()
+            if pos >= total:
+                return b"", total, total
+
+            if pos >= base:
+                source_end = total
+                with open(self.log_path, "rb") as f:
+                    f.seek(pos - base)
+                    data = f.read(min(max_bytes, total - pos))
+            else:
+                segments = [s for s in manifest["segments"] if s["start"] + s["bytes"] > pos]
+                segment = segments[0] if segments else None
+                if segment is None:
+                    # Everything before the active file is gone: resume at its start
+                    pos, source_end = base, total
+                    with open(self.log_path, "rb") as f:
+                        data = f.read(min(max_bytes, total - base))
+                else:
+                    pos = max(pos, segment["start"])
+                    source_end = segment["start"] + segment["bytes"]
+                    with _open_archive_reader(self.archive_path(segment)) as f:
+                        _skip(f, pos - segment["start"])
+                        data = f.read(min(max_bytes, source_end - pos))
+
+        next_pos = pos + len(data)
+        if next_pos < source_end:
+            cut = data.rfind(b"\n")
+            if cut >= 0:
+                data = data[:cut + 1]
+                next_pos = pos + len(data)
+        return data, next_pos, total
+
+    def tail(self, offset_lines: int, limit_lines: int) -> Tuple[List[str], bool, int]:
+        """Lines counted from the end of the whole stream; (lines, has_more, virtual size)"""
+        with self.lock:
+            manifest = self.load()
+            total = manifest["base"] + self._active_size()
+            sources = [(self.line_index.total_lines(), None)]
+            sources += [(segment["lines"], segment) for segment in reversed(manifest["segments"])]
+
+            skip, need = max(0, offset_lines), max(0, limit_lines)
+            pages: List[List[str]] = []
+            has_more = False
+            for position, (count, segment) in enumerate(sources):
+                if need <= 0:
+                    break
+                if skip >= count:
+                    skip -= count
+                    continue
+                end = count - skip
+                start = max(0, end - need)
+                if segment is None:
+                    lines, _, _ = self.line_index.tail(skip, end - start)
+                else:
+                    lines = self._archive_lines(segment, start, end)
+                pages.append(lines)
+                need -= end - start
+                skip = 0
+                has_more = start > 0 or any(c for c, _ in sources[position + 1:])
+
+        selected = [line for page in reversed(pages) for line in page]
+        return selected, has_more, total
+
+    def tail_matching(
+        self,
+        offset_lines: int,
+        limit_lines: int,
+        predicate: Callable[[str], bool],
+        page_lines: int = 1000,
+        max_scan_lines: int = 100000,
+    ) -> Tuple[List[str], bool, int, int]:
+        """
+        Like tail(), keeping only the lines predicate accepts. Scans backwards in pages until
+        limit_lines matched or max_scan_lines were read. offset_lines and the returned next_offset
+        count raw lines from the end; returns (lines, has_more, next_offset, virtual size).
+        """
+        matched: List[str] = []
+        position = max(0, offset_lines)
+        scanned = 0
+        has_more = True
+        total = 0
+        while has_more and len(matched) < limit_lines and scanned < max_scan_lines:
+            page, has_more, total = self.tail(position, min(page_lines, max_scan_lines - scanned))
+            if not page:
+                has_more = False
+                break
+            for index in range(len(page) - 1, -1, -1):
+                position += 1
+                scanned += 1
+                if predicate(page[index]):
+                    matched.append(page[index])
+                    if len(matched) >= limit_lines:
+                        has_more = has_more or index > 0
+                        break
+        matched.reverse()
+        return matched, has_more, position, total
+
+    def _archive_lines(self, segment: dict, start: int, end: int) -> List[str]:
+        lines = []
+        with _open_archive_reader(self.archive_path(segment)) as f:
+            for number, line in enumerate(f):
+                if number >= end:
+                    break
+                if number >= start:
+                    lines.append(line.rstrip(b"\r\n").decode("utf-8", errors="replace"))
+        return lines
+
+    def clear(self) -> None:
+        """Drop the archives and the manifest (the caller truncates the active file)"""
+        with self.lock:
+            for segment in self.load()["segments"]:
+                try:
+                    os.remove(self.archive_path(segment))
+                except OSError:
+                    pass
+            try:
+                os.remove(self.manifest_path)
+            except OSError:
+                pass
+
+
+def _skip(f: BinaryIO, count: int, block: int = 1024 * 1024) -> None:
+    while count > 0:
+        data = f.read(min(block, count))
+        if not data:
+            break
+        count -= len(data)
+
+
+class LogRotator:
+    """
+    Size- and age-based rotation of task logs into compressed archives, with retention.
+
+    The running crawler keeps its log open in append mode, so the active file is copied into the
+    archive and then truncated in place (copy-truncate) rather than renamed.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 10 * 1024 * 1024,
+        max_age_seconds: float = 24 * 3600,
+        keep: int = 10,
+        retention_seconds: float = 14 * 24 * 3600,
+        compression: str = "gzip",
+    ):
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.keep = max(0, keep)
+        self.retention_seconds = retention_seconds
+        compression = (compression or "gzip").lower()
+        if compression == "zstd" and zstandard is None:
+            print("LOG: zstandard is not installed, log archives fall back to gzip")
+            compression = "gzip"
+        self.compression = compression if compression in ARCHIVE_EXTENSIONS else "gzip"
+
+    @classmethod
+    def from_settings(cls, app_settings) -> "LogRotator":
+        """From the web server's AppSettings (LOG_ROTATE_* / LOG_ARCHIVE_* in .env)"""
+        return cls(
+            max_bytes=int(app_settings.log_rotate_max_mb * 1024 * 1024),
+            max_age_seconds=app_settings.log_rotate_max_age_hours * 3600,
+            keep=app_settings.log_archive_keep,
+            retention_seconds=app_settings.log_archive_retention_days * 86400,
+            compression=app_settings.log_archive_compression,
+        )
+
+    def due(self, segments: LogSegments, starting: bool = False, now: Optional[float] = None) -> Optional[str]:
+        """Why the active log should be rotated now, or None"""
+        now = now or time.time()
+        try:
+            stat = os.stat(segments.log_path)
+        except OSError:
+            return None
+        if stat.st_size == 0:
+            return None
+        if self.max_bytes and stat.st_size >= self.max_bytes:
+            return "size"
+        if self.max_age_seconds:
+            archived = segments.load()["segments"]
+            started_at = archived[-1]["created"] if archived else None
+            if started_at is not None and now - started_at >= self.max_age_seconds:
+                return "age"
+            if starting and now - stat.st_mtime >= self.max_age_seconds:
+                # A new run of a task whose log has not been written for a long time starts a new segment
+                return "age"
+        return None
+
+    def rotate(self, segments: LogSegments, now: Optional[float] = None) -> Optional[dict]:
+        now = now or time.time()
+        with segments.lock:
+            manifest = segments.load()
+            sequence = max((s.get("seq", 0) for s in manifest["segments"]), default=0) + 1
+            name = f"{os.path.basename(segments.log_path)}.{sequence}{ARCHIVE_EXTENSIONS[self.compression]}"
+            archive_path = os.path.join(os.path.dirname(segments.log_path), name)
+
+            copied = lines = 0
+            last_byte = b"\n"
+            with open(segments.log_path, "r+b") as source, _open_archive_writer(archive_path) as target:
+                while True:
+                    block = source.read(1024 * 1024)
+                    if not block:
+                        break
+                    target.write(block)
+                    copied += len(block)
+                    lines += block.count(b"\n")
+                    last_byte = block[-1:]
+                # Lines written between the last read and this call are the only ones that can be lost
+                source.truncate(0)
+            if not copied:
+                os.remove(archive_path)
+                return None
+
+            segment = {
+                "seq": sequence,
+                "file": name,
+                "start": manifest["base"],
+                "bytes": copied,
+                "lines": lines + (0 if last_byte == b"\n" else 1),
+                "created": now,
+            }
+            manifest["segments"].append(segment)
+            manifest["base"] += copied
+            self._prune(segments, manifest, now)
+            segments.save(manifest)
+        return segment
+
+    def _prune(self, segments: LogSegments, manifest: dict, now: float) -> None:
+        kept = manifest["segments"]
+        if self.retention_seconds:
+            kept = [s for s in kept if now - s["created"] < self.retention_seconds]
+        if self.keep:
+            kept = kept[-self.keep:]
+        for segment in manifest["segments"]:
+            if segment not in kept:
+                try:
+                    os.remove(segments.archive_path(segment))
+                except OSError:
+                    pass
+        manifest["segments"] = kept
+
+    def maybe_rotate(self, log_path: str, starting: bool = False) -> Optional[dict]:
+        segments = LogSegments(log_path)
+        reason = self.due(segments, starting=starting)
+        if not reason:
+            return None
+        segment = self.rotate(segments)
+        if segment:
+            print(f"LOG: Rotated {log_path} ({reason}) into {segment['file']}: {segment['bytes']} bytes, {segment['lines']} lines")
+        return segment
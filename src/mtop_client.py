@@ -0,0 +1,150 @@
+"""
+Direct mtop API calls
+Issues goofish mtop requests from an existing browser context (sharing its cookies) and
+signs them the way the H5 front end does, so JSON can be fetched without rendering a page.
+"""
+import hashlib
+import json
+import time
+from typing import Optional
+from urllib.parse import parse_qs, urlencode, urlparse
+
+MTOP_BASE_URL = "https://h5api.m.goofish.com/h5"
+MTOP_APP_KEY = "34839810"
+MTOP_TOKEN_COOKIE = "_m_h5_tk"
+
+DETAIL_API = "mtop.taobao.idle.pc.detail"
+USER_HEAD_API = "mtop.idle.web.user.page.head"
+USER_ITEMS_API = "mtop.idle.web.xyh.item.list"
+USER_RATINGS_API = "mtop.idle.web.trade.rate.list"
+
+# ret codes after which the gateway has issued a fresh token cookie, so one retry is worthwhile
+_TOKEN_RETRY_CODES = ("FAIL_SYS_TOKEN_EMPTY", "FAIL_SYS_TOKEN_EXOIRED", "FAIL_SYS_TOKEN_EXPIRED", "FAIL_SYS_ILLEGAL_SIGN")
+
+
+class MtopError(Exception):
+    """A direct call did not return data; the caller should fall back to page navigation"""
+
+
+def mtop_sign(token: str, timestamp: str, app_key: str, data: str) -> str:
+    return hashlib.md5(f"{token}&{timestamp}&{app_key}&{data}".encode("utf-8")).hexdigest()
+
+
+def extract_item_id(link: str) -> Optional[str]:
+    values = parse_qs(urlparse(link).query).get("id")
+    return values[0] if values else None
+
+
+class MtopClient:
+    """
+    Calls mtop APIs through context.request, which shares the context's cookie jar.
+
+    After max_failures consecutive failed calls (or any validation challenge) the client
+    switches itself off for the rest of the attempt and every caller navigates again.
+    """
+
+    def __init__(self, context, app_key: str = MTOP_APP_KEY, timeout: float = 15000, max_failures: int = 3):
+        self.context = context
+        self.app_key = app_key
+        self.timeout = timeout
+        self.max_failures = max_failures
+        self.disabled = False
+        self.calls = 0
+        self.failures = 0
+        self._consecutive_failures = 0
+
+    @property
+    def available(self) -> bool:
+        return not self.disabled
+
+    async def _token(self) -> str:
+        for cookie in await self.context.cookies(MTOP_BASE_URL):
+            if cookie.get("name") == MTOP_TOKEN_COOKIE:
+                return cookie.get("value", "").split("_")[0]
+        return ""
+
+    async def _post(self, api: str, version: str, data: str) -> dict:
+        timestamp = str(int(time.time() * 1000))
+        params = {
+            "jsv": "2.7.2",
+            "appKey": self.app_key,
+            "t": timestamp,
+            "sign": mtop_sign(await self._token(), timestamp, self.app_key, data),
+            "v": version,
+            "type": "originaljson",
+            "accountSite": "xianyu",
+            "dataType": "json",
+            "timeout": "20000",
+            "api": api,
+            "sessionOption": "AutoLoginOnly",
+        }
+        response = await self.context.request.post(
+            f"{MTOP_BASE_URL}/{api}/{version}/?{urlencode(params)}",
+            form={"data": data},
+            headers={"Origin": "https://www.goofish.com", "Referer": "https://www.goofish.com/"},
+            timeout=self.timeout,
+        )
+        if not response.ok:
+            raise MtopError(f"{api} HTTP {response.status}")
+        try:
+            return await response.json()
+        except Exception as e:
+            raise MtopError(f"{api} returned no JSON: {e}")
+
+    def _fail(self, message: str, disable: bool = False) -> MtopError:
+        self.failures += 1
+        self._consecutive_failures += 1
+        if disable or self._consecutive_failures >= self.max_failures:
+            self.disabled = True
+        return MtopError(message)
+
+    async def call(self, api: str, payload: dict, version: str = "1.0") -> dict:
+        """Return the full mtop response of a successful call, raise MtopError otherwise"""
+        if self.disabled:
+            raise MtopError("direct mtop calls are disabled for this attempt")
+        self.calls += 1
+        data = json.dumps(payload, separators=(",", ":"), ensure_ascii=False)
+        try:
+            result = await self._post(api, version, data)
+            ret = " ".join(str(r) for r in result.get("ret", []))
+            if any(code in ret for code in _TOKEN_RETRY_CODES):
+                result = await self._post(api, version, data)
+                ret = " ".join(str(r) for r in result.get("ret", []))
+        except MtopError as e:
+            raise self._fail(str(e))
+        except Exception as e:
+            raise self._fail(f"{api} request failed: {e}")
+        if "FAIL_SYS_USER_VALIDATE" in ret:
+            # A challenge has to be solved in a real page; stop calling directly for this attempt
+            raise self._fail(f"{api} asks for validation", disable=True)
+        if not ret.startswith("SUCCESS"):
+            raise self._fail(f"{api} failed: {ret or 'empty ret'}")
+        self._consecutive_failures = 0
+        return result
+
+    async def fetch_detail(self, item_id: str) -> dict:
+        return await self.call(DETAIL_API, {"itemId": item_id})
+
+    async def fetch_user_head(self, user_id: str) -> dict:
+        return await self.call(USER_HEAD_API, {"self": False, "userId": user_id})
+
+    async def fetch_user_items(self, user_id: str, page_number: int, page_size: int = 20) -> dict:
+        return await self.call(USER_ITEMS_API, {
+            "needGroupInfo": page_number == 1,
+            "pageNumber": page_number,
+            "userId": user_id,
+            "pageSize": page_size,
+        })
+
+    async def fetch_user_ratings(self, user_id: str, page_number: int, page_size: int = 20) -> dict:
+        return await self.call(USER_RATINGS_API, {
+            "cardType": 3,
+            "pageNumber": page_number,
+            "pageSize": page_size,
+            "rateType": 0,
+            "ratedUid": user_id,
+        })
+
+    def summary(self) -> str:
+        state = "off after failures" if self.disabled else "on"
+        return f"{self.calls} direct calls, {self.failures} failed, direct mode {state}"
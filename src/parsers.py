@@ -49,7 +49,7 @@ async def _parse_search_results_json(json_data: dict, source: str) -> list:
                 "Product title": title,
                 "Current selling price": price,
                 "Product original price": original_price,
-                "“"Want" number of people": wants_count,
+                '“"Want" number of people': wants_count,
                 "Product tag": tags,
                 "Shipping area": area,
                 "Seller nickname": seller,
@@ -0,0 +1,136 @@
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import List, Optional, Pattern
+
+
+def _parse_price(value) -> Optional[float]:
+    if value is None:
+        return None
+    match = re.search(r"\d+(?:\.\d+)?", str(value).replace(",", ""))
+    return float(match.group()) if match else None
+
+
+class PrefilterError(ValueError):
+    """A prefilter rule that cannot be used, e.g. an invalid regular expression"""
+
+
+def _as_list(value, split_commas: bool = True) -> List[str]:
+    """A list, or a string that is comma-separated (keywords, regions) or a single value (regex)"""
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.split(",") if split_commas else [value]
+    return [str(v).strip() for v in value if str(v).strip()]
+
+
+def _compile_patterns(name: str, value) -> List[Pattern]:
+    patterns = []
+    for pattern in _as_list(value, split_commas=False):
+        try:
+            patterns.append(re.compile(pattern, re.IGNORECASE))
+        except re.error as e:
+            raise PrefilterError(f"Invalid prefilter {name} pattern {pattern!r}: {e}") from e
+    return patterns
+
+
+def _as_float(value) -> Optional[float]:
+    if value in (None, ""):
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass
+class PrefilterDecision:
+    passed: bool
+    reason: str = "pass"
+
+
+@dataclass
+class Prefilter:
+    """
+    Rule-based check on the search result fields of an item, run before its detail page is opened.
+
+    Keyword rules match the title case-insensitively, regex rules use re.search on the
+    title, region rules match substrings of the shipping area. Every decision is counted
+    by reason in stats.
+    """
+    include_keywords: List[str] = field(default_factory=list)
+    exclude_keywords: List[str] = field(default_factory=list)
+    include_regex: List[Pattern] = field(default_factory=list)
+    exclude_regex: List[Pattern] = field(default_factory=list)
+    min_price: Optional[float] = None
+    max_price: Optional[float] = None
+    allowed_regions: List[str] = field(default_factory=list)
+    blocked_regions: List[str] = field(default_factory=list)
+    stats: Counter = field(default_factory=Counter)
+
+    @classmethod
+    def from_config(cls, config: Optional[dict]) -> Optional["Prefilter"]:
+        """
+        Build from a task's "prefilter" settings; None when no rule is configured.
+        A string regex setting is one pattern (commas are part of it), raises PrefilterError if invalid.
+        """
+        if not config:
+            return None
+        rules = cls(
+            include_keywords=[k.lower() for k in _as_list(config.get("include_keywords"))],
+            exclude_keywords=[k.lower() for k in _as_list(config.get("exclude_keywords"))],
+            include_regex=_compile_patterns("include_regex", config.get("include_regex")),
+            exclude_regex=_compile_patterns("exclude_regex", config.get("exclude_regex")),
+            min_price=_as_float(config.get("min_price")),
+            max_price=_as_float(config.get("max_price")),
+            allowed_regions=_as_list(config.get("allowed_regions")),
+            blocked_regions=_as_list(config.get("blocked_regions")),
+        )
+        return rules if rules.has_rules() else None
+
+    def has_rules(self) -> bool:
+        return any([
+            self.include_keywords, self.exclude_keywords, self.include_regex, self.exclude_regex,
+            self.min_price is not None, self.max_price is not None, self.allowed_regions, self.blocked_regions,
+        ])
+
+    def _check(self, item: dict) -> PrefilterDecision:
+        title = str(item.get("Product title") or "")
+        lowered = title.lower()
+        for keyword in self.exclude_keywords:
+            if keyword in lowered:
+                return PrefilterDecision(False, f"exclude_keyword:{keyword}")
+        for pattern in self.exclude_regex:
+            if pattern.search(title):
+                return PrefilterDecision(False, f"exclude_regex:{pattern.pattern}")
+        if self.include_keywords and not any(k in lowered for k in self.include_keywords):
+            return PrefilterDecision(False, "missing_include_keyword")
+        if self.include_regex and not any(p.search(title) for p in self.include_regex):
+            return PrefilterDecision(False, "missing_include_regex")
+
+        if self.min_price is not None or self.max_price is not None:
+            price = _parse_price(item.get("Current selling price"))
+            if price is not None:
+                if self.min_price is not None and price < self.min_price:
+                    return PrefilterDecision(False, "price_below_min")
+                if self.max_price is not None and price > self.max_price:
+                    return PrefilterDecision(False, "price_above_max")
+
+        area = str(item.get("Shipping area") or "")
+        for region in self.blocked_regions:
+            if region in area:
+                return PrefilterDecision(False, f"blocked_region:{region}")
+        if self.allowed_regions and not any(region in area for region in self.allowed_regions):
+            return PrefilterDecision(False, "region_not_allowed")
+        return PrefilterDecision(True)
+
+    def evaluate(self, item: dict) -> PrefilterDecision:
+        decision = self._check(item)
+        self.stats[decision.reason] += 1
+        return decision
+
+    def summary(self) -> str:
+        passed = self.stats.get("pass", 0)
+        rejected = sum(self.stats.values()) - passed
+        reasons = ", ".join(f"{reason}={count}" for reason, count in self.stats.most_common() if reason != "pass")
+        return f"{passed} passed, {rejected} rejected" + (f" ({reasons})" if reasons else "")
@@ -0,0 +1,126 @@
+import asyncio
+import os
+import random
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+
+# Request types with their own budget
+REQUEST_KINDS = ("search", "detail", "profile")
+
+
+class RateUsage:
+    """Requests granted and seconds waited per kind, counted for one run"""
+
+    def __init__(self):
+        self.granted: Dict[str, int] = {}
+        self.waited: Dict[str, float] = {}
+
+    def add(self, kind: str, waited: float) -> None:
+        self.granted[kind] = self.granted.get(kind, 0) + 1
+        self.waited[kind] = self.waited.get(kind, 0.0) + waited
+
+    def summary(self) -> str:
+        parts = [
+            f"{kind} {count} granted / {self.waited[kind]:.0f}s waited"
+            for kind, count in self.granted.items()
+        ]
+        return ", ".join(parts) or "no requests"
+
+
+class RateGovernor:
+    """
+    Token buckets per (request kind, account state file, proxy), shared by all tasks and processes.
+
+    Buckets live in a SQLite file; every refill-and-take runs in an IMMEDIATE transaction,
+    so spider processes and the browser worker that use the same account draw from the
+    same budget. rates maps a request kind to tokens per minute (0 means unlimited),
+    burst is how many requests may go out back to back after a quiet period.
+    """
+
+    def __init__(self, db_path: str, rates: Dict[str, float], burst: float = 2, jitter: float = 0.25):
+        self.db_path = db_path
+        self.rates = {kind: max(0.0, float(rate)) for kind, rate in rates.items()}
+        self.burst = max(1.0, float(burst))
+        self.jitter = max(0.0, float(jitter))
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            db_dir = os.path.dirname(self.db_path)
+            if db_dir:
+                os.makedirs(db_dir, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS rate_buckets (
+                    bucket TEXT PRIMARY KEY,
+                    tokens REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+                """
+            )
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def bucket_key(kind: str, account: str, proxy: Optional[str]) -> str:
+        return f"{kind}|{os.path.abspath(account) if account else ''}|{proxy or ''}"
+
+    def try_take(self, kind: str, account: str, proxy: Optional[str] = None, now: Optional[float] = None) -> float:
+        """Take one token if available; return 0, or the seconds until the next token"""
+        rate = self.rates.get(kind, 0.0)
+        if rate <= 0:
+            return 0.0
+        per_second = rate / 60.0
+        now = time.time() if now is None else now
+        key = self.bucket_key(kind, account, proxy)
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute("SELECT tokens, updated_at FROM rate_buckets WHERE bucket = ?", (key,)).fetchone()
+                tokens = self.burst if row is None else min(self.burst, row[0] + max(0.0, now - row[1]) * per_second)
+                wait = 0.0
+                if tokens >= 1:
+                    tokens -= 1
+                else:
+                    wait = (1 - tokens) / per_second
+                conn.execute(
+                    "INSERT INTO rate_buckets (bucket, tokens, updated_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT(bucket) DO UPDATE SET tokens = excluded.tokens, updated_at = excluded.updated_at",
+                    (key, tokens, now),
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return wait
+
+    async def acquire(
+        self, kind: str, account: str, proxy: Optional[str] = None, usage: Optional[RateUsage] = None
+    ) -> float:
+        """Wait until the bucket grants a request; returns the seconds spent waiting"""
+        waited = 0.0
+        while True:
+            # The bucket transaction can wait on other processes' locks: keep it off the event loop
+            wait = await asyncio.to_thread(self.try_take, kind, account, proxy)
+            if wait <= 0:
+                break
+            # Spread processes that wake up for the same token a little apart
+            delay = wait * (1 + random.uniform(0, self.jitter))
+            await asyncio.sleep(delay)
+            waited += delay
+        if usage is not None:
+            usage.add(kind, waited)
+        return waited
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,115 @@
+"""
+Resource blocking for crawler pages
+The scraper only reads the mtop JSON responses, so images, fonts, media and analytics
+beacons loaded by the goofish.com front end can be aborted before they hit the network.
+"""
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+
+@dataclass
+class PageTraffic:
+    """Request / byte counters of one page visit; counts also roll up into the parent"""
+    kind: str
+    requests: int = 0
+    blocked: int = 0
+    bytes: int = 0
+    parent: Optional["PageTraffic"] = None
+
+    def record_request(self) -> None:
+        self.requests += 1
+        if self.parent:
+            self.parent.record_request()
+
+    def record_blocked(self) -> None:
+        self.blocked += 1
+        if self.parent:
+            self.parent.record_blocked()
+
+    def record_bytes(self, size: int) -> None:
+        self.bytes += size
+        if self.parent:
+            self.parent.record_bytes(size)
+
+    def summary(self) -> str:
+        return f"{self.requests} requests, {self.blocked} blocked, {self.bytes / 1024:.0f} KB received"
+
+
+def _split(value: Optional[Iterable[str] | str]) -> Tuple[str, ...]:
+    if not value:
+        return ()
+    if isinstance(value, str):
+        value = value.split(",")
+    return tuple(entry.strip() for entry in value if entry and entry.strip())
+
+
+class ResourceBlocker:
+    """
+    Decides per request whether it may leave the browser.
+
+    A request is blocked when its resource type is in blocked_types or its URL contains one
+    of deny_patterns, unless the URL contains one of allow_patterns (the mtop API always
+    passes). Blocking only applies to page kinds listed in pages ("search", "detail",
+    "profile"), which is the escape hatch for pages where blocking triggers risk control;
+    other pages are still counted.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        blocked_types: Optional[Iterable[str] | str] = ("image", "media", "font"),
+        deny_patterns: Optional[Iterable[str] | str] = (),
+        allow_patterns: Optional[Iterable[str] | str] = ("mtop.",),
+        pages: Optional[Iterable[str] | str] = ("search", "detail", "profile"),
+    ):
+        self.enabled = enabled
+        self.blocked_types = frozenset(t.lower() for t in _split(blocked_types))
+        self.deny_patterns = _split(deny_patterns)
+        self.allow_patterns = _split(allow_patterns)
+        self.pages = frozenset(p.lower() for p in _split(pages))
+        # page -> traffic of the visit currently using it (pooled pages are reused across visits)
+        self._visits: Dict[Any, PageTraffic] = {}
+
+    def should_block(self, resource_type: str, url: str) -> bool:
+        if any(pattern in url for pattern in self.allow_patterns):
+            return False
+        if resource_type in self.blocked_types:
+            return True
+        return any(pattern in url for pattern in self.deny_patterns)
+
+    async def attach(self, page, kind: str, parent: Optional[PageTraffic] = None) -> PageTraffic:
+        """Start a visit of the given kind on page and return its counters"""
+        traffic = PageTraffic(kind=kind, parent=parent)
+        first_visit = page not in self._visits
+        self._visits[page] = traffic
+        if first_visit:
+            if self.enabled and self.pages:
+                # Routing turns off the page's HTTP cache, so it is only installed when something can be blocked
+                await page.route("**/*", lambda route: self._handle(page, route))
+            page.on("request", lambda request: self._on_request(page, request))
+            page.on("response", lambda response: self._on_response(page, response))
+            page.on("close", lambda _: self._visits.pop(page, None))
+        return traffic
+
+    async def _handle(self, page, route) -> None:
+        traffic = self._visits.get(page)
+        request = route.request
+        if traffic is not None and traffic.kind in self.pages and self.should_block(request.resource_type, request.url):
+            traffic.record_blocked()
+            await route.abort("blockedbyclient")
+        else:
+            await route.continue_()
+
+    def _on_request(self, page, request) -> None:
+        traffic = self._visits.get(page)
+        if traffic is not None:
+            traffic.record_request()
+
+    def _on_response(self, page, response) -> None:
+        traffic = self._visits.get(page)
+        if traffic is None:
+            return
+        try:
+            traffic.record_bytes(int(response.headers.get("content-length") or 0))
+        except (TypeError, ValueError):
+            pass
@@ -1,8 +1,50 @@
+import json
 import os
 import random
+import sqlite3
+import statistics
+import threading
 import time
-from dataclasses import dataclass
-from typing import Dict, List, Optional
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Deque, Dict, List, Optional
+
+
+# Weight of the newest outcome in the success / risk moving averages
+EWMA_ALPHA = 0.3
+LATENCY_SAMPLES = 50
+# Weight floor so a recovering item is still tried now and then
+MIN_WEIGHT = 0.05
+# Failure reasons that mean the site asked for a human verification
+VALIDATION_MARKERS = ("FAIL_SYS_USER_VALIDATE", "baxia-dialog", "J_MIDDLEWARE_FRAME_WIDGET")
+
+
+@dataclass
+class ItemHealth:
+    success_ewma: float = 1.0
+    risk_ewma: float = 0.0
+    validation_hits: int = 0
+    failure_streak: int = 0
+    cooldown_until: float = 0.0
+    latencies: Deque[float] = field(default_factory=lambda: deque(maxlen=LATENCY_SAMPLES))
+
+    def latency_percentile(self, percentile: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, int(round(percentile / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def to_dict(self) -> dict:
+        return {
+            "success_ewma": round(self.success_ewma, 4),
+            "risk_ewma": round(self.risk_ewma, 4),
+            "validation_hits": self.validation_hits,
+            "failure_streak": self.failure_streak,
+            "cooldown_until": self.cooldown_until,
+            "latency_p50": self.latency_percentile(50),
+            "latency_p90": self.latency_percentile(90),
+        }
 
 
 @dataclass
@@ -11,36 +53,241 @@ class RotationItem:
     last_error: Optional[str] = None
 
 
+class RotationHealthStore:
+    """
+    Health of accounts and proxies persisted in SQLite, so it survives runs and is shared by processes.
+
+    Scores, failure streaks and cooldowns are stored, so a cooldown keeps growing over the runs of
+    a scheduled task. Every outcome is applied to the stored row inside one transaction, so
+    concurrent processes do not overwrite each other's updates.
+    """
+
+    COLUMNS = "success_ewma, risk_ewma, validation_hits, failure_streak, cooldown_until, latencies"
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            db_dir = os.path.dirname(self.db_path)
+            if db_dir:
+                os.makedirs(db_dir, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS rotation_health (
+                    pool TEXT NOT NULL,
+                    item TEXT NOT NULL,
+                    success_ewma REAL NOT NULL,
+                    risk_ewma REAL NOT NULL,
+                    validation_hits INTEGER NOT NULL,
+                    failure_streak INTEGER NOT NULL,
+                    cooldown_until REAL NOT NULL,
+                    latencies TEXT NOT NULL,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (pool, item)
+                )
+                """
+            )
+            scores_only = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'rotation_scores'"
+            ).fetchone()
+            if scores_only:
+                # A version that kept cooldowns per run stored the scores alone
+                conn.execute("BEGIN IMMEDIATE")
+                conn.execute(
+                    "INSERT OR IGNORE INTO rotation_health "
+                    "SELECT pool, item, success_ewma, risk_ewma, validation_hits, 0, 0, latencies, updated_at "
+                    "FROM rotation_scores"
+                )
+                conn.execute("DROP TABLE rotation_scores")
+                conn.execute("COMMIT")
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def _from_row(success, risk, hits, streak, cooldown, latencies) -> ItemHealth:
+        return ItemHealth(
+            success_ewma=success,
+            risk_ewma=risk,
+            validation_hits=hits,
+            failure_streak=streak,
+            cooldown_until=cooldown,
+            latencies=deque(json.loads(latencies), maxlen=LATENCY_SAMPLES),
+        )
+
+    def load(self, pool: str) -> Dict[str, ItemHealth]:
+        with self._lock:
+            rows = self._connect().execute(
+                f"SELECT item, {self.COLUMNS} FROM rotation_health WHERE pool = ?",
+                (pool,),
+            ).fetchall()
+        return {item: self._from_row(*values) for item, *values in rows}
+
+    def update(self, pool: str, item: str, apply: Callable[[ItemHealth], None]) -> ItemHealth:
+        """Apply one outcome to the stored health (read-modify-write in one transaction); returns it"""
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    f"SELECT {self.COLUMNS} FROM rotation_health WHERE pool = ? AND item = ?",
+                    (pool, item),
+                ).fetchone()
+                health = self._from_row(*row) if row else ItemHealth()
+                apply(health)
+                conn.execute(
+                    f"INSERT OR REPLACE INTO rotation_health (pool, item, {self.COLUMNS}, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        pool,
+                        item,
+                        health.success_ewma,
+                        health.risk_ewma,
+                        health.validation_hits,
+                        health.failure_streak,
+                        health.cooldown_until,
+                        json.dumps(list(health.latencies)),
+                        time.time(),
+                    ),
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return health
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
 class RotationPool:
-    def __init__(self, items: List[str], blacklist_ttl: int = 300, name: str = ""):
+    """
+    Accounts or proxies to rotate through, picked by health.
+
+    Every item keeps a success EWMA, a risk EWMA fed by validation challenges and recent
+    latencies. pick_random weights items by success, relative speed and risk. A failure
+    cools the item down for blacklist_ttl seconds, doubled for every further failure in a
+    row (up to max_cooldown). When every item is cooling down, the one whose cooldown ends
+    first is used rather than none. With a store the health (cooldowns included) is loaded
+    at start and every outcome is applied to the stored one.
+    """
+
+    def __init__(
+        self,
+        items: List[str],
+        blacklist_ttl: int = 300,
+        name: str = "",
+        store: Optional[RotationHealthStore] = None,
+        max_cooldown: int = 6 * 3600,
+    ):
         self.items = [RotationItem(value=item) for item in items if item]
         self.blacklist_ttl = max(0, int(blacklist_ttl))
+        self.max_cooldown = max(self.blacklist_ttl, int(max_cooldown))
         self.name = name or "rotation"
-        self._blacklist: Dict[str, float] = {}
+        self.store = store
+        self.health: Dict[str, ItemHealth] = {}
+        # Latencies observed since the item's last saved outcome
+        self._new_latencies: Dict[str, List[float]] = {}
+        if store:
+            try:
+                self.health = store.load(self.name)
+            except sqlite3.Error as e:
+                print(f"LOG: Failed to load {self.name} health, starting fresh: {e}")
 
-    def _cleanup_blacklist(self) -> None:
-        now = time.time()
-        expired = [key for key, ts in self._blacklist.items() if ts <= now]
-        for key in expired:
-            self._blacklist.pop(key, None)
+    def _health(self, item: RotationItem) -> ItemHealth:
+        return self.health.setdefault(item.value, ItemHealth())
+
+    def _record(self, item: RotationItem, apply: Callable[[ItemHealth], None]) -> None:
+        """Apply an outcome to the scores: to the stored row when there is a store, else in memory"""
+        health = self._health(item)
+        latencies = self._new_latencies.pop(item.value, [])
+        if self.store:
+            def _apply_stored(stored: ItemHealth) -> None:
+                stored.latencies.extend(latencies)
+                apply(stored)
+
+            try:
+                stored = self.store.update(self.name, item.value, _apply_stored)
+            except sqlite3.Error as e:
+                print(f"LOG: Failed to save {self.name} health: {e}")
+            else:
+                # Take over what other processes recorded too
+                self.health[item.value] = stored
+                return
+        apply(health)
 
     def available_items(self) -> List[RotationItem]:
-        self._cleanup_blacklist()
-        return [item for item in self.items if item.value not in self._blacklist]
+        now = time.time()
+        return [item for item in self.items if self._health(item).cooldown_until <= now]
+
+    def weight(self, item: RotationItem, reference_latency: Optional[float] = None) -> float:
+        health = self._health(item)
+        speed = 1.0
+        median = health.latency_percentile(50)
+        if reference_latency and median:
+            speed = min(4.0, max(0.25, reference_latency / median))
+        return max(MIN_WEIGHT, health.success_ewma * speed * (1 - 0.8 * health.risk_ewma))
 
     def pick_random(self) -> Optional[RotationItem]:
         candidates = self.available_items()
         if not candidates:
-            return None
-        return random.choice(candidates)
+            if not self.items:
+                return None
+            # Everything is cooling down: the item that recovers first beats not running at all
+            return min(self.items, key=lambda item: self._health(item).cooldown_until)
+        medians = [m for m in (self._health(item).latency_percentile(50) for item in candidates) if m]
+        reference = statistics.median(medians) if medians else None
+        weights = [self.weight(item, reference) for item in candidates]
+        return random.choices(candidates, weights=weights, k=1)[0]
+
+    def observe_latency(self, item: Optional[RotationItem], seconds: float) -> None:
+        """Record the duration of one request made through the item (saved with the next outcome)"""
+        if item:
+            seconds = round(seconds, 3)
+            self._health(item).latencies.append(seconds)
+            if self.store:
+                self._new_latencies.setdefault(item.value, []).append(seconds)
+
+    def mark_good(self, item: Optional[RotationItem]) -> None:
+        if not item:
+            return
+        item.last_error = None
+
+        def _succeeded(scores: ItemHealth) -> None:
+            scores.failure_streak = 0
+            scores.cooldown_until = 0.0
+            scores.success_ewma += EWMA_ALPHA * (1 - scores.success_ewma)
+            scores.risk_ewma -= EWMA_ALPHA * scores.risk_ewma
+
+        self._record(item, _succeeded)
 
     def mark_bad(self, item: Optional[RotationItem], reason: str = "") -> None:
         if not item:
             return
         item.last_error = reason
-        if self.blacklist_ttl <= 0:
-            return
-        self._blacklist[item.value] = time.time() + self.blacklist_ttl
+        validation = any(marker in (reason or "") for marker in VALIDATION_MARKERS)
+
+        def _failed(scores: ItemHealth) -> None:
+            scores.failure_streak += 1
+            if self.blacklist_ttl > 0:
+                cooldown = min(self.max_cooldown, self.blacklist_ttl * 2 ** (scores.failure_streak - 1))
+                scores.cooldown_until = time.time() + cooldown
+            scores.success_ewma -= EWMA_ALPHA * scores.success_ewma
+            scores.risk_ewma += EWMA_ALPHA * ((1.0 if validation else 0.0) - scores.risk_ewma)
+            if validation:
+                scores.validation_hits += 1
+
+        self._record(item, _failed)
+
+    def snapshot(self) -> Dict[str, dict]:
+        return {item.value: self._health(item).to_dict() for item in self.items}
 
 
 def parse_proxy_pool(value: Optional[str]) -> List[str]:
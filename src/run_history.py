@@ -0,0 +1,150 @@
+import json
+import math
+import os
+import sqlite3
+import threading
+from typing import Dict, List, Optional, Tuple
+
+
+class RunHistory:
+    """
+    Outcome of every crawl run per task (start, end, new items), shared by all processes.
+
+    Used to estimate how fast genuinely new listings arrive for a keyword: each run covers
+    the time since the previous run started, so new_items / window is one rate sample.
+    Runs may also carry their per-stage timing summary (see src/stage_timer.py).
+    """
+
+    def __init__(self, db_path: str, ewma_alpha: float = 0.4, window_runs: int = 10):
+        self.db_path = db_path
+        self.ewma_alpha = ewma_alpha
+        self.window_runs = max(2, window_runs)
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            db_dir = os.path.dirname(self.db_path)
+            if db_dir:
+                os.makedirs(db_dir, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS task_runs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    task_name TEXT NOT NULL,
+                    started_at REAL NOT NULL,
+                    finished_at REAL NOT NULL,
+                    new_items INTEGER NOT NULL,
+                    succeeded INTEGER NOT NULL,
+                    stats TEXT
+                );
+                CREATE INDEX IF NOT EXISTS idx_task_runs_task ON task_runs (task_name, started_at);
+                """
+            )
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(task_runs)")}
+            if "stats" not in columns:
+                # Databases created before stage timing was recorded
+                conn.execute("ALTER TABLE task_runs ADD COLUMN stats TEXT")
+            self._conn = conn
+        return self._conn
+
+    def record(
+        self,
+        task_name: str,
+        started_at: float,
+        finished_at: float,
+        new_items: int,
+        succeeded: bool = True,
+        stats: Optional[dict] = None,
+    ) -> None:
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT INTO task_runs (task_name, started_at, finished_at, new_items, succeeded, stats) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    task_name,
+                    started_at,
+                    finished_at,
+                    int(new_items),
+                    int(bool(succeeded)),
+                    json.dumps(stats, ensure_ascii=False) if stats is not None else None,
+                ),
+            )
+            conn.commit()
+
+    @staticmethod
+    def _run_summary(row) -> dict:
+        task_name, started_at, finished_at, new_items, succeeded, stats = row
+        summary = json.loads(stats) if stats else {}
+        summary.update({
+            "task_name": task_name,
+            "started_at": started_at,
+            "finished_at": finished_at,
+            "new_items": new_items,
+            "succeeded": bool(succeeded),
+        })
+        return summary
+
+    def run_summaries(self, task_name: Optional[str] = None, limit: int = 20) -> List[Dict]:
+        """Latest runs with their stage timing, newest first"""
+        query = "SELECT task_name, started_at, finished_at, new_items, succeeded, stats FROM task_runs"
+        params: list = []
+        if task_name:
+            query += " WHERE task_name = ?"
+            params.append(task_name)
+        query += " ORDER BY started_at DESC LIMIT ?"
+        params.append(max(1, limit))
+        with self._lock:
+            rows = self._connect().execute(query, params).fetchall()
+        return [self._run_summary(row) for row in rows]
+
+    def latest_summaries(self) -> List[Dict]:
+        """The most recent run of every task"""
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT task_name, started_at, finished_at, new_items, succeeded, stats FROM task_runs "
+                "WHERE id IN (SELECT MAX(id) FROM task_runs GROUP BY task_name) ORDER BY task_name"
+            ).fetchall()
+        return [self._run_summary(row) for row in rows]
+
+    def recent(self, task_name: str, limit: Optional[int] = None) -> List[Tuple[float, int]]:
+        """(started_at, new_items) of the latest successful runs, oldest first"""
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT started_at, new_items FROM task_runs WHERE task_name = ? AND succeeded = 1 "
+                "ORDER BY started_at DESC LIMIT ?",
+                (task_name, limit or self.window_runs),
+            ).fetchall()
+        return list(reversed(rows))
+
+    def arrival_rate(self, task_name: str) -> Optional[float]:
+        """New items per hour (EWMA over recent runs), None until two successful runs exist"""
+        runs = self.recent(task_name)
+        rate = None
+        for (previous_start, _), (started_at, new_items) in zip(runs, runs[1:]):
+            window_hours = (started_at - previous_start) / 3600
+            if window_hours <= 0:
+                continue
+            sample = new_items / window_hours
+            rate = sample if rate is None else rate + self.ewma_alpha * (sample - rate)
+        return rate
+
+    def suggest_interval(self, task_name: str, min_minutes: float, max_minutes: float, target_items: float) -> float:
+        """Polling interval (minutes) that would find about target_items new items per run"""
+        min_minutes, max_minutes = max(1.0, min_minutes), max(min_minutes, max_minutes)
+        rate = self.arrival_rate(task_name)
+        if rate is None:
+            # No history yet: start in the middle of the range (geometric, the range is usually wide)
+            return math.sqrt(min_minutes * max_minutes)
+        if rate <= 0:
+            return max_minutes
+        return min(max_minutes, max(min_minutes, target_items / rate * 60))
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -1,30 +1,59 @@
 import asyncio
+import contextlib
 import json
 import os
 import random
+import sqlite3
+import time
 from datetime import datetime
-from typing import Optional
+from typing import Awaitable, Callable, Optional
 from urllib.parse import urlencode
 
 from playwright.async_api import (
     Response,
     TimeoutError as PlaywrightTimeoutError,
-    async_playwright,
 )
 
+from src.ai_batch import AIBatchAnalyzer
 from src.ai_handler import (
-    download_all_images,
+    fetch_product_images,
     get_ai_analysis,
     send_ntfy_notification,
     cleanup_task_images,
 )
 from src.config import (
+    AI_BATCH_ENABLED,
+    AI_BATCH_MAX_IMAGES_PER_ITEM,
+    AI_BATCH_MAX_TOKENS,
+    AI_BATCH_MAX_WAIT_SECONDS,
+    AI_BATCH_SIZE,
     AI_DEBUG_MODE,
     API_URL_PATTERN,
+    DEDUP_BLOOM_ENABLED,
+    DEDUP_INDEX_DIR,
     DETAIL_API_URL_PATTERN,
+    EARLY_STOP_KNOWN_ITEMS,
+    EARLY_STOP_KNOWN_PAGES,
     LOGIN_IS_EDGE,
+    MTOP_DIRECT_FETCH,
+    RATE_BURST,
+    RATE_DETAIL_PER_MINUTE,
+    RATE_GOVERNOR_DB,
+    RATE_GOVERNOR_ENABLED,
+    RATE_PROFILE_PER_MINUTE,
+    RATE_SEARCH_PER_MINUTE,
+    RESOURCE_ALLOW_URL_PATTERNS,
+    ROTATION_HEALTH_DB,
+    RESOURCE_BLOCK_TYPES,
+    RESOURCE_BLOCK_URL_PATTERNS,
+    RESOURCE_BLOCKING_ENABLED,
+    RESOURCE_BLOCKING_PAGES,
     RUN_HEADLESS,
     RUNNING_IN_DOCKER,
+    SELLER_CACHE_DB,
+    SELLER_CACHE_ENABLED,
+    SELLER_HEAD_TTL_SECONDS,
+    SELLER_RATINGS_TTL_SECONDS,
     STATE_FILE,
 )
 from src.parsers import (
@@ -42,11 +71,20 @@ from src.utils import (
     save_to_jsonl,
     log_time,
 )
-from src.rotation import RotationPool, load_state_files, parse_proxy_pool, RotationItem
-
-
-class RiskControlError(Exception):
-    pass
+from src.rotation import RotationHealthStore, RotationPool, load_state_files, parse_proxy_pool, RotationItem
+from src.browser_pool import BrowserLease, BrowserPool
+from src.dedup_index import DedupIndex
+from src.early_stop import EarlyStop
+from src.item_pipeline import ItemPipeline, RiskControlError, get_account_slots, get_pipeline_settings
+from src.infrastructure.config.settings import scraper_settings
+from src.mtop_client import MtopClient, MtopError, extract_item_id
+from src.prefilter import Prefilter, PrefilterError
+from src.rate_governor import RateGovernor, RateUsage
+from src.resource_blocker import PageTraffic, ResourceBlocker
+from src.run_history import RunHistory
+from src.seller_cache import SECTIONS as SELLER_CACHE_SECTIONS, SellerProfileCache
+from src.stage_timer import StageTimer
+from src import structured_log
 
 
 def _as_bool(value, default: bool = False) -> bool:
@@ -96,6 +134,65 @@ def _get_rotation_settings(task_config: dict) -> dict:
     }
 
 
+# Aborts images, fonts, media and analytics on crawler pages; only the mtop JSON is needed
+resource_blocker = ResourceBlocker(
+    enabled=RESOURCE_BLOCKING_ENABLED,
+    blocked_types=RESOURCE_BLOCK_TYPES,
+    deny_patterns=RESOURCE_BLOCK_URL_PATTERNS,
+    allow_patterns=RESOURCE_ALLOW_URL_PATTERNS,
+    pages=RESOURCE_BLOCKING_PAGES,
+)
+
+
+# Long-lived pool installed by the browser worker; None means one browser per scrape attempt
+_browser_pool: Optional[BrowserPool] = None
+
+
+def set_browser_pool(pool: Optional[BrowserPool]) -> None:
+    global _browser_pool
+    _browser_pool = pool
+
+
+def _build_browser_settings(state_file: str, proxy_server: Optional[str], snapshot_data) -> tuple:
+    """Return (launch kwargs, storage state, context kwargs) for one account / proxy"""
+    # Anti-detection startup parameters
+    launch_args = [
+        '--disable-blink-features=AutomationControlled',
+        '--disable-dev-shm-usage',
+        '--no-sandbox',
+        '--disable-setuid-sandbox',
+        '--disable-web-security',
+        '--disable-features=IsolateOrigins,site-per-process'
+    ]
+
+    launch_kwargs = {"headless": RUN_HEADLESS, "args": launch_args}
+    if proxy_server:
+        launch_kwargs["proxy"] = {"server": proxy_server}
+
+    if LOGIN_IS_EDGE:
+        launch_kwargs["channel"] = "msedge"
+    else:
+        if not RUNNING_IN_DOCKER:
+            launch_kwargs["channel"] = "chrome"
+
+    context_kwargs = _default_context_options()
+    storage_state_arg = state_file
+
+    if isinstance(snapshot_data, dict):
+        # Enhanced snapshot exported by the new version of the extension, including environment andHeader
+        if any(key in snapshot_data for key in ("env", "headers", "page", "storage")):
+            print(f"Enhanced browser snapshot detected, environment parameters applied: {state_file}")
+            storage_state_arg = {"cookies": snapshot_data.get("cookies", [])}
+            context_kwargs.update(_build_context_overrides(snapshot_data))
+            extra_headers = _build_extra_headers(snapshot_data.get("headers"))
+            if extra_headers:
+                context_kwargs["extra_http_headers"] = extra_headers
+        else:
+            storage_state_arg = snapshot_data
+
+    return launch_kwargs, storage_state_arg, _clean_kwargs(context_kwargs)
+
+
 def _default_context_options() -> dict:
     return {
         "user_agent": "Mozilla/5.0 (Linux; Android 6.0; Nexus 5 Build/MRA58N) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Mobile Safari/537.36",
@@ -184,13 +281,89 @@ def _build_extra_headers(raw_headers: Optional[dict]) -> dict:
     return headers
 
 
-async def scrape_user_profile(context, user_id: str) -> dict:
-    """
-    【New version】Access the personal homepage of the specified user，Collect its summary information, complete product list and complete review list in order。
-    """
-    print(f"   -> Start collecting usersID: {user_id} complete information...")
-    profile_data = {}
-    page = await context.new_page()
+_seller_cache: Optional[SellerProfileCache] = None
+
+
+def _get_seller_cache() -> Optional[SellerProfileCache]:
+    global _seller_cache
+    if not SELLER_CACHE_ENABLED:
+        return None
+    if _seller_cache is None:
+        _seller_cache = SellerProfileCache(
+            SELLER_CACHE_DB,
+            head_ttl=SELLER_HEAD_TTL_SECONDS,
+            ratings_ttl=SELLER_RATINGS_TTL_SECONDS,
+        )
+    return _seller_cache
+
+
+_rotation_store: Optional[RotationHealthStore] = None
+
+
+def _get_rotation_store() -> RotationHealthStore:
+    global _rotation_store
+    if _rotation_store is None:
+        _rotation_store = RotationHealthStore(ROTATION_HEALTH_DB)
+    return _rotation_store
+
+
+def _record_run(task_name: str, started_at: float, new_items: int, succeeded: bool, stats: Optional[dict] = None) -> None:
+    """Append this run (and its stage timing) to the shared run history used for adaptive polling"""
+    history = RunHistory(scraper_settings.run_history_db)
+    try:
+        history.record(task_name, started_at, time.time(), new_items, succeeded, stats=stats)
+    except sqlite3.Error as e:
+        print(f"LOG: Failed to record the run history: {e}")
+    finally:
+        history.close()
+
+
+_rate_governor: Optional[RateGovernor] = None
+
+
+def _get_rate_governor() -> Optional[RateGovernor]:
+    global _rate_governor
+    if not RATE_GOVERNOR_ENABLED:
+        return None
+    if _rate_governor is None:
+        _rate_governor = RateGovernor(
+            RATE_GOVERNOR_DB,
+            rates={
+                "search": RATE_SEARCH_PER_MINUTE,
+                "detail": RATE_DETAIL_PER_MINUTE,
+                "profile": RATE_PROFILE_PER_MINUTE,
+            },
+            burst=RATE_BURST,
+        )
+    return _rate_governor
+
+
+async def _lookup_cached_sections(cache: SellerProfileCache, user_id: str) -> tuple:
+    """Return (fresh cached sections, sections this process has to crawl); SQLite calls run off the loop"""
+    cached, to_crawl = {}, []
+    for section in SELLER_CACHE_SECTIONS:
+        data = await asyncio.to_thread(cache.get, user_id, section)
+        if data is None and not await asyncio.to_thread(cache.try_claim, user_id, section):
+            # Another task is crawling this seller right now: wait for its result
+            structured_log.log_event(f"      [Seller cache] {section} of user {user_id} is being collected elsewhere, waiting...", "debug")
+            deadline = asyncio.get_event_loop().time() + cache.lease_seconds
+            while data is None and asyncio.get_event_loop().time() < deadline:
+                await asyncio.sleep(2)
+                data = await asyncio.to_thread(cache.get, user_id, section, False)
+                if data is None and await asyncio.to_thread(cache.try_claim, user_id, section):
+                    break
+        if data is not None:
+            cached[section] = data
+        else:
+            to_crawl.append(section)
+    return cached, to_crawl
+
+
+async def _crawl_profile_page(lease: BrowserLease, user_id: str, sections: list, traffic: Optional[PageTraffic]) -> dict:
+    """Open the seller's personal page and collect the requested sections from the APIs it calls."""
+    crawled = {}
+    page = await lease.new_page()
+    await resource_blocker.attach(page, "profile", parent=traffic)
 
     # Prepare for various asynchronous tasksFutureand data container
     head_api_future = asyncio.get_event_loop().create_future()
@@ -203,7 +376,7 @@ async def scrape_user_profile(context, user_id: str) -> dict:
         if "mtop.idle.web.user.page.head" in response.url and not head_api_future.done():
             try:
                 head_api_future.set_result(await response.json())
-                print(f"      [APIcapture] User header information... success")
+                structured_log.log_event(f"      [APIcapture] User header information... success", "debug")
             except Exception as e:
                 if not head_api_future.done(): head_api_future.set_exception(e)
 
@@ -212,7 +385,7 @@ async def scrape_user_profile(context, user_id: str) -> dict:
             try:
                 data = await response.json()
                 all_items.extend(data.get('data', {}).get('cardList', []))
-                print(f"      [APIcapture] Product list... Currently captured {len(all_items)} pieces")
+                structured_log.log_event(f"      [APIcapture] Product list... Currently captured {len(all_items)} pieces", "debug")
                 if not data.get('data', {}).get('nextPage', True):
                     stop_item_scrolling.set()
             except Exception as e:
@@ -223,7 +396,7 @@ async def scrape_user_profile(context, user_id: str) -> dict:
             try:
                 data = await response.json()
                 all_ratings.extend(data.get('data', {}).get('cardList', []))
-                print(f"      [APIcapture] Review list... Currently captured {len(all_ratings)} strip")
+                structured_log.log_event(f"      [APIcapture] Review list... Currently captured {len(all_ratings)} strip", "debug")
                 if not data.get('data', {}).get('nextPage', True):
                     stop_rating_scrolling.set()
             except Exception as e:
@@ -234,49 +407,138 @@ async def scrape_user_profile(context, user_id: str) -> dict:
     try:
         # --- Task1: Navigate and collect header information ---
         await page.goto(f"https://www.goofish.com/personal?userId={user_id}", wait_until="domcontentloaded", timeout=20000)
-        head_data = await asyncio.wait_for(head_api_future, timeout=15)
-        profile_data = await parse_user_head_data(head_data)
-
-        # --- Task2: Scroll to load all products (Default page) ---
-        print("      [Collection phase] Start collecting the user's product list...")
-        await random_sleep(2, 4) # Waiting for the first page of productsAPIFinish
-        while not stop_item_scrolling.is_set():
-            await page.evaluate('window.scrollTo(0, document.body.scrollHeight)')
-            try:
-                await asyncio.wait_for(stop_item_scrolling.wait(), timeout=8)
-            except asyncio.TimeoutError:
-                print("      [scroll timeout] The product list may have finished loading。")
-                break
-        profile_data["Product list posted by seller"] = await _parse_user_items_data(all_items)
-
-        # --- Task3: Click and collect all reviews ---
-        print("      [Collection phase] Start collecting the user's evaluation list...")
-        rating_tab_locator = page.locator("//div[text()='Credit and evaluation']/ancestor::li")
-        if await rating_tab_locator.count() > 0:
-            await rating_tab_locator.click()
-            await random_sleep(3, 5) # Waiting for first page reviewsAPIFinish
-
-            while not stop_rating_scrolling.is_set():
+        if "head" in sections:
+            head_data = await asyncio.wait_for(head_api_future, timeout=15)
+            head_section = await parse_user_head_data(head_data)
+
+            # --- Task2: Scroll to load all products (Default page) ---
+            structured_log.log_event("      [Collection phase] Start collecting the user's product list...", "debug")
+            await random_sleep(2, 4) # Waiting for the first page of productsAPIFinish
+            while not stop_item_scrolling.is_set():
                 await page.evaluate('window.scrollTo(0, document.body.scrollHeight)')
                 try:
-                    await asyncio.wait_for(stop_rating_scrolling.wait(), timeout=8)
+                    await asyncio.wait_for(stop_item_scrolling.wait(), timeout=8)
                 except asyncio.TimeoutError:
-                    print("      [scroll timeout] The review list may have finished loading。")
+                    structured_log.log_event("      [scroll timeout] The product list may have finished loading。", "debug")
                     break
+            head_section["Product list posted by seller"] = await _parse_user_items_data(all_items)
+            crawled["head"] = head_section
 
-            profile_data['List of reviews received by the seller'] = await parse_ratings_data(all_ratings)
-            reputation_stats = await calculate_reputation_from_ratings(all_ratings)
-            profile_data.update(reputation_stats)
-        else:
-            print("      [warn] Review tab not found, review collection skipped。")
+        # --- Task3: Click and collect all reviews ---
+        if "ratings" in sections:
+            structured_log.log_event("      [Collection phase] Start collecting the user's evaluation list...", "debug")
+            rating_tab_locator = page.locator("//div[text()='Credit and evaluation']/ancestor::li")
+            if await rating_tab_locator.count() > 0:
+                await rating_tab_locator.click()
+                await random_sleep(3, 5) # Waiting for first page reviewsAPIFinish
+
+                while not stop_rating_scrolling.is_set():
+                    await page.evaluate('window.scrollTo(0, document.body.scrollHeight)')
+                    try:
+                        await asyncio.wait_for(stop_rating_scrolling.wait(), timeout=8)
+                    except asyncio.TimeoutError:
+                        structured_log.log_event("      [scroll timeout] The review list may have finished loading。", "debug")
+                        break
+
+                ratings_section = {'List of reviews received by the seller': await parse_ratings_data(all_ratings)}
+                ratings_section.update(await calculate_reputation_from_ratings(all_ratings))
+                crawled["ratings"] = ratings_section
+            else:
+                structured_log.log_event("      [warn] Review tab not found, review collection skipped。", "warning")
 
     except Exception as e:
-        print(f"   [mistake] Collect users {user_id} An error occurred during the message: {e}")
+        structured_log.log_event(f"   [mistake] Collect users {user_id} An error occurred during the message: {e}", "warning")
     finally:
         page.remove_listener("response", handle_response)
-        await page.close()
+        await lease.release_page(page)
+    return crawled
+
+
+async def _fetch_profile_direct(mtop: MtopClient, user_id: str, sections: list, max_pages: int = 50) -> dict:
+    """Collect the requested sections through direct mtop calls; sections that fail are left out."""
+    crawled = {}
+    try:
+        if "head" in sections:
+            head_section = await parse_user_head_data(await mtop.fetch_user_head(user_id))
+            all_items = []
+            for page_number in range(1, max_pages + 1):
+                data = (await mtop.fetch_user_items(user_id, page_number)).get('data', {})
+                all_items.extend(data.get('cardList', []))
+                if not data.get('nextPage'):
+                    break
+                await random_sleep(0.3, 0.8)
+            structured_log.log_event(f"      [Direct fetch] Product list... captured {len(all_items)} pieces", "debug")
+            head_section["Product list posted by seller"] = await _parse_user_items_data(all_items)
+            crawled["head"] = head_section
+
+        if "ratings" in sections:
+            all_ratings = []
+            for page_number in range(1, max_pages + 1):
+                data = (await mtop.fetch_user_ratings(user_id, page_number)).get('data', {})
+                all_ratings.extend(data.get('cardList', []))
+                if not data.get('nextPage'):
+                    break
+                await random_sleep(0.3, 0.8)
+            structured_log.log_event(f"      [Direct fetch] Review list... captured {len(all_ratings)} strip", "debug")
+            ratings_section = {'List of reviews received by the seller': await parse_ratings_data(all_ratings)}
+            ratings_section.update(await calculate_reputation_from_ratings(all_ratings))
+            crawled["ratings"] = ratings_section
+    except MtopError as e:
+        print(f"      [Direct fetch] {e}, falling back to the personal page。")
+    return crawled
+
+
+async def scrape_user_profile(
+    lease: BrowserLease,
+    user_id: str,
+    traffic: Optional[PageTraffic] = None,
+    mtop: Optional[MtopClient] = None,
+    pace: Optional[Callable[[str], Awaitable[None]]] = None,
+) -> dict:
+    """
+    【New version】Access the personal homepage of the specified user，Collect its summary information, complete product list and complete review list in order。
+    Sections still fresh in the seller profile cache are reused instead of being crawled again.
+    With an mtop client the sections are requested directly first; whatever fails is crawled from the page.
+    pace is awaited before the seller is actually requested.
+    """
+    cache = _get_seller_cache()
+    cached, to_crawl = {}, list(SELLER_CACHE_SECTIONS)
+    if cache:
+        try:
+            cached, to_crawl = await _lookup_cached_sections(cache, user_id)
+        except sqlite3.Error as e:
+            structured_log.log_event(f"   [warn] Seller cache unavailable, collecting directly: {e}", "warning")
+            cache = None
+    if not to_crawl:
+        print(f"   -> user {user_id} Information taken from the seller cache。")
+        return {key: value for section in SELLER_CACHE_SECTIONS for key, value in cached[section].items()}
+
+    print(f"   -> Start collecting usersID: {user_id} complete information...")
+    crawled = {}
+    try:
+        if pace:
+            await pace("profile")
+        if mtop and mtop.available:
+            crawled.update(await _fetch_profile_direct(mtop, user_id, to_crawl))
+        page_sections = [section for section in to_crawl if section not in crawled]
+        if page_sections:
+            crawled.update(await _crawl_profile_page(lease, user_id, page_sections, traffic))
+    finally:
+        if cache:
+            # Only complete sections are cached; a failed crawl just gives the lease back
+            try:
+                for section in to_crawl:
+                    if section in crawled:
+                        await asyncio.to_thread(cache.put, user_id, section, crawled[section])
+                    else:
+                        await asyncio.to_thread(cache.release, user_id, section)
+            except sqlite3.Error as e:
+                structured_log.log_event(f"   [warn] Failed to update the seller cache: {e}", "warning")
         print(f"   -> user {user_id} Information collection completed。")
 
+    profile_data = {}
+    for section in SELLER_CACHE_SECTIONS:
+        profile_data.update(cached.get(section) or crawled.get(section) or {})
     return profile_data
 
 
@@ -291,32 +553,41 @@ async def scrape_xianyu(task_config: dict, debug_limit: int = 0):
     min_price = task_config.get('min_price')
     max_price = task_config.get('max_price')
     ai_prompt_text = task_config.get('ai_prompt_text', '')
+    try:
+        prefilter = Prefilter.from_config(task_config.get('prefilter'))
+    except PrefilterError as e:
+        print(f"LOG: {e}, pre-filter disabled")
+        prefilter = None
+    ai_batcher = None
+    if AI_BATCH_ENABLED and ai_prompt_text:
+        ai_batcher = AIBatchAnalyzer(
+            ai_prompt_text,
+            batch_size=AI_BATCH_SIZE,
+            max_wait=AI_BATCH_MAX_WAIT_SECONDS,
+            max_images_per_item=AI_BATCH_MAX_IMAGES_PER_ITEM,
+            max_tokens=AI_BATCH_MAX_TOKENS,
+        )
     free_shipping = task_config.get('free_shipping', False)
     raw_new_publish = task_config.get('new_publish_option') or ''
     new_publish_option = raw_new_publish.strip()
     if new_publish_option == '__none__':
         new_publish_option = ''
     region_filter = (task_config.get('region') or '').strip()
+    pages_skipped = 0
+    timer = StageTimer(task_config.get('task_name', keyword))
+    structured_log.set_task(task_config.get('task_name', keyword))
 
-    processed_links = set()
     output_filename = os.path.join("jsonl", f"{keyword.replace(' ', '_')}_full_data.jsonl")
     if os.path.exists(output_filename):
         print(f"LOG: Found file already exists {output_filename}，Loading history for deduplication...")
-        try:
-            with open(output_filename, 'r', encoding='utf-8') as f:
-                for line in f:
-                    try:
-                        record = json.loads(line)
-                        link = record.get('Product information', {}).get('Product link', '')
-                        if link:
-                            processed_links.add(get_link_unique_key(link))
-                    except json.JSONDecodeError:
-                        print(f"   [warn] There is a line in the file that cannot be parsed asJSON，skipped。")
-            print(f"LOG: Loading completed, recorded {len(processed_links)} items processed。")
-        except IOError as e:
-            print(f"   [warn] An error occurred while reading the history file: {e}")
     else:
         print(f"LOG: output file {output_filename} does not exist, a new file will be created。")
+    try:
+        processed_links = DedupIndex.open(output_filename, DEDUP_INDEX_DIR, use_bloom=DEDUP_BLOOM_ENABLED)
+        print(f"LOG: Loading completed, recorded {len(processed_links)} items processed。")
+    except (IOError, OSError) as e:
+        print(f"   [warn] Failed to load the deduplication index, falling back to an in-memory set: {e}")
+        processed_links = set()
 
     rotation_settings = _get_rotation_settings(task_config)
     forced_account = task_config.get("account_state_file") or None
@@ -330,8 +601,11 @@ async def scrape_xianyu(task_config: dict, debug_limit: int = 0):
     if not forced_account and not os.path.exists(STATE_FILE) and account_items:
         rotation_settings["account_enabled"] = True
 
-    account_pool = RotationPool(account_items, rotation_settings["account_blacklist_ttl"], "account")
-    proxy_pool = RotationPool(parse_proxy_pool(rotation_settings["proxy_pool"]), rotation_settings["proxy_blacklist_ttl"], "proxy")
+    rotation_store = _get_rotation_store()
+    account_pool = RotationPool(account_items, rotation_settings["account_blacklist_ttl"], "account", store=rotation_store)
+    proxy_pool = RotationPool(
+        parse_proxy_pool(rotation_settings["proxy_pool"]), rotation_settings["proxy_blacklist_ttl"], "proxy", store=rotation_store
+    )
 
     selected_account: Optional[RotationItem] = None
     selected_proxy: Optional[RotationItem] = None
@@ -359,96 +633,275 @@ async def scrape_xianyu(task_config: dict, debug_limit: int = 0):
         return picked or selected_proxy
 
     async def _run_scrape_attempt(state_file: str, proxy_server: Optional[str]) -> int:
+        nonlocal pages_skipped
         processed_item_count = 0
+        dispatched_item_count = 0
         stop_scraping = False
 
-        if not os.path.exists(state_file):
-            raise FileNotFoundError(f"Login status file does not exist: {state_file}")
+        # Browser-bound stages (detail page + seller profile) run under the task/account slots and keep
+        # the anti-risk pacing; images, AI, notification and saving overlap with the next browser visit.
+        pipeline_settings = get_pipeline_settings(task_config)
+        detail_slots = asyncio.Semaphore(pipeline_settings["detail_concurrency"])
+        account_slots = get_account_slots(state_file, pipeline_settings["account_concurrency"])
+        analysis_concurrency = pipeline_settings["analysis_concurrency"]
+        if ai_batcher:
+            # A batch only fills up if that many items can wait in the analysis stage at once
+            analysis_concurrency = max(analysis_concurrency, ai_batcher.batch_size)
+        analysis_slots = asyncio.Semaphore(analysis_concurrency)
+        pipeline = ItemPipeline(
+            pipeline_settings["detail_concurrency"] + analysis_concurrency,
+            flush=ai_batcher.flush if ai_batcher else None,
+        )
+        in_flight_keys: set = set()
+
+        async def _navigate_detail(lease: BrowserLease, item_data: dict) -> Optional[dict]:
+            """Open the product detail page and return the detail API response it triggers."""
+            detail_page = await lease.new_page()
+            await resource_blocker.attach(detail_page, "detail", parent=run_traffic)
+            try:
+                async with detail_page.expect_response(lambda r: DETAIL_API_URL_PATTERN in r.url, timeout=25000) as detail_info:
+                    await detail_page.goto(item_data["Product link"], wait_until="domcontentloaded", timeout=25000)
+
+                detail_response = await detail_info.value
+                if not detail_response.ok:
+                    structured_log.log_event(f"   mistake: Get product detailsAPIResponse failed, status code: {detail_response.status}", "warning")
+                    if AI_DEBUG_MODE:
+                        print(f"--- [DETAIL DEBUG] FAILED RESPONSE from {item_data['Product link']} ---")
+                        try:
+                            print(await detail_response.text())
+                        except Exception as e:
+                            print(f"Unable to read response content: {e}")
+                        print("----------------------------------------------------")
+                    return None
 
-        snapshot_data = None
-        try:
-            with open(state_file, "r", encoding="utf-8") as f:
-                snapshot_data = json.load(f)
-        except Exception as e:
-            print(f"Warning: Failed to read login status file，will be used directly by path: {e}")
+                return await detail_response.json()
+            finally:
+                await lease.release_page(detail_page)
 
-        async with async_playwright() as p:
-            # Anti-detection startup parameters
-            launch_args = [
-                '--disable-blink-features=AutomationControlled',
-                '--disable-dev-shm-usage',
-                '--no-sandbox',
-                '--disable-setuid-sandbox',
-                '--disable-web-security',
-                '--disable-features=IsolateOrigins,site-per-process'
-            ]
-
-            launch_kwargs = {"headless": RUN_HEADLESS, "args": launch_args}
-            if proxy_server:
-                launch_kwargs["proxy"] = {"server": proxy_server}
-
-            if LOGIN_IS_EDGE:
-                launch_kwargs["channel"] = "msedge"
-            else:
-                if not RUNNING_IN_DOCKER:
-                    launch_kwargs["channel"] = "chrome"
-
-            browser = await p.chromium.launch(**launch_kwargs)
-
-            context_kwargs = _default_context_options()
-            storage_state_arg = state_file
-
-            if isinstance(snapshot_data, dict):
-                # Enhanced snapshot exported by the new version of the extension, including environment andHeader
-                if any(key in snapshot_data for key in ("env", "headers", "page", "storage")):
-                    print(f"Enhanced browser snapshot detected, environment parameters applied: {state_file}")
-                    storage_state_arg = {"cookies": snapshot_data.get("cookies", [])}
-                    context_kwargs.update(_build_context_overrides(snapshot_data))
-                    extra_headers = _build_extra_headers(snapshot_data.get("headers"))
-                    if extra_headers:
-                        context_kwargs["extra_http_headers"] = extra_headers
+        async def _fetch_item_record(lease: BrowserLease, item_data: dict) -> Optional[dict]:
+            """Browser stage: product detail and seller profile, returns the base record."""
+            try:
+                detail_json = None
+                item_id = extract_item_id(item_data.get("Product link", "")) or str(item_data.get("commodityID") or "")
+                with timer.stage("detail_fetch"):
+                    if mtop_client and mtop_client.available and item_id.isdigit():
+                        try:
+                            detail_json = await mtop_client.fetch_detail(item_id)
+                        except MtopError as e:
+                            print(f"   [Direct fetch] {e}, falling back to the product details page。")
+                    if detail_json is None:
+                        detail_json = await _navigate_detail(lease, item_data)
+                if detail_json is None:
+                    return None
+
+                ret_string = str(await safe_get(detail_json, 'ret', default=[]))
+                if "FAIL_SYS_USER_VALIDATE" in ret_string:
+                    print("\n==================== CRITICAL BLOCK DETECTED ====================")
+                    print("Xianyu anti-crawler verification detected (FAIL_SYS_USER_VALIDATE)，The program will terminate。")
+                    long_sleep_duration = random.randint(3, 60)
+                    print(f"To avoid account risks, a long hibernation will be performed ({long_sleep_duration} Second) then exit...")
+                    await asyncio.sleep(long_sleep_duration)
+                    print("Long hibernation has ended and will now exit safely。")
+                    print("===================================================================")
+                    raise RiskControlError("FAIL_SYS_USER_VALIDATE")
+
+                # Parse product details data and update item_data
+                item_do = await safe_get(detail_json, 'data', 'itemDO', default={})
+                seller_do = await safe_get(detail_json, 'data', 'sellerDO', default={})
+
+                reg_days_raw = await safe_get(seller_do, 'userRegDay', default=0)
+                registration_duration_text = format_registration_days(reg_days_raw)
+
+                # 1. Extract seller’s Zhima credit information
+                zhima_credit_text = await safe_get(seller_do, 'zhimaLevelInfo', 'levelName')
+
+                # 2. Extract the complete image list of this product
+                image_infos = await safe_get(item_do, 'imageInfos', default=[])
+                if image_infos:
+                    # Use list comprehension to get all valid imagesURL
+                    all_image_urls = [img.get('url') for img in image_infos if img.get('url')]
+                    if all_image_urls:
+                        # Use a new field to store the image list, replacing the old single link
+                        item_data['Product picture list'] = all_image_urls
+                        # (Optional) Still keeping the link to the main image, just in case
+                        item_data['Product main image link'] = all_image_urls[0]
+
+                item_data['“"Want" number of people'] = await safe_get(item_do, 'wantCnt', default=item_data.get('“"Want" number of people', 'NaN'))
+                item_data['Views'] = await safe_get(item_do, 'browseCnt', default='-')
+                # ...[Here you can add more product information parsed from the details page]...
+
+                # Call the core function to collect seller information
+                user_profile_data = {}
+                user_id = await safe_get(seller_do, 'sellerId')
+                if user_id:
+                    with timer.stage("profile_scrape"):
+                        user_profile_data = await scrape_user_profile(
+                            lease, str(user_id), traffic=run_traffic, mtop=mtop_client, pace=_pace
+                        )
                 else:
-                    storage_state_arg = snapshot_data
+                    structured_log.log_event("   [warn] Unable to obtain detailsAPIObtain the seller fromID。", "warning")
+                user_profile_data['Seller Sesame Credit'] = zhima_credit_text
+                user_profile_data['Seller registration time'] = registration_duration_text
+
+                # Build base records
+                return {
+                    "Crawl time": datetime.now().isoformat(),
+                    "Search keywords": keyword,
+                    "Task name": task_config.get('task_name', 'Untitled Task'),
+                    "Product information": item_data,
+                    "Seller information": user_profile_data
+                }
+            except PlaywrightTimeoutError:
+                print(f"   mistake: Visit the product details page or waitAPIResponse timeout。")
+            except RiskControlError:
+                raise
+            except Exception as e:
+                print(f"   mistake: An unknown error occurred while processing product listings: {e}")
+            return None
 
-            context_kwargs = _clean_kwargs(context_kwargs)
-            context = await browser.new_context(storage_state=storage_state_arg, **context_kwargs)
+        async def _analyze_and_save(final_record: dict, unique_key: str) -> None:
+            """Post-browser stage: images, AI analysis, notification and JSONL write."""
+            nonlocal processed_item_count
+            item_data = final_record["Product information"]
 
-            # Enhanced anti-detection script (emulates real mobile devices）
-            await context.add_init_script("""
-                // Removewebdriverlogo
-                Object.defineProperty(navigator, 'webdriver', {get: () => undefined});
+            # --- START: Real-time AI Analysis & Notification ---
+            from src.config import SKIP_AI_ANALYSIS
 
-                // Simulates real mobile devicesnavigatorproperty
-                Object.defineProperty(navigator, 'plugins', {get: () => [1, 2, 3, 4, 5]});
-                Object.defineProperty(navigator, 'languages', {get: () => ['zh-CN', 'zh', 'en-US', 'en']});
+            # Check if skippedAIAnalyze and send notifications directly
+            if SKIP_AI_ANALYSIS:
+                log_time("environment variables SKIP_AI_ANALYSIS Already set, skipAIAnalyze and send notifications directly...")
 
-                // Add tochromeobject
-                window.chrome = {runtime: {}, loadTimes: function() {}, csi: function() {}};
+                # Send notifications directly to mark all products as recommended
+                log_time("Product skippedAIAnalyze and prepare notifications...")
+                with timer.stage("notification"):
+                    await send_ntfy_notification(item_data, "Product skippedAIAnalysis, direct notification")
+            else:
+                log_time(f"start product #{item_data['commodityID']} perform real-timeAIanalyze...")
+                # 1. Download images straight into memory
+                ai_analysis_result = None
+                if ai_prompt_text:
+                    image_urls = item_data.get('Product picture list', [])
+                    with timer.stage("image_download"):
+                        images = await fetch_product_images(item_data['commodityID'], image_urls)
+
+                    # 2. Get AI analysis
+                    try:
+                        # Note: Here we pass the entire record toAI，Give it the fullest context
+                        with timer.stage("ai_analysis"):
+                            if ai_batcher:
+                                ai_analysis_result = await ai_batcher.analyze(final_record, images)
+                            else:
+                                ai_analysis_result = await get_ai_analysis(final_record, prompt_text=ai_prompt_text, images=images)
+                        if ai_analysis_result:
+                            final_record['ai_analysis'] = ai_analysis_result
+                            log_time(f"AIAnalysis completed. Recommended status: {ai_analysis_result.get('is_recommended')}")
+                        else:
+                            final_record['ai_analysis'] = {'error': 'AI analysis returned None after retries.'}
+                    except Exception as e:
+                        print(f"   -> AIA serious error occurred during analysis: {e}")
+                        final_record['ai_analysis'] = {'error': str(e)}
+                else:
+                    print("   -> Task not configuredAI prompt，skip analysis。")
+
+                # 3. Send notification if recommended
+                if ai_analysis_result and ai_analysis_result.get('is_recommended'):
+                    log_time("Product quiltAIRecommended, ready to send notification...")
+                    with timer.stage("notification"):
+                        await send_ntfy_notification(item_data, ai_analysis_result.get("reason", "none"))
+            # --- END: Real-time AI Analysis & Notification ---
+
+            # 4. Save containsAIFull record of results
+            with timer.stage("jsonl_write"):
+                await save_to_jsonl(final_record, keyword)
+
+            processed_links.add(unique_key)
+            processed_item_count += 1
+            log_time(f"The product processing process is completed. Cumulative processing {processed_item_count} new items。")
+
+        async def _process_item(lease: BrowserLease, item_data: dict, unique_key: str) -> None:
+            # Stages timed inside count towards this item (each item runs in its own task)
+            with timer.item(unique_key):
+                try:
+                    async with detail_slots, account_slots:
+                        await _pace("detail")
+                        fetch_started = time.monotonic()
+                        try:
+                            final_record = await _fetch_item_record(lease, item_data)
+                            if final_record:
+                                # Latency feeds the account / proxy health used by rotation
+                                fetch_seconds = time.monotonic() - fetch_started
+                                account_pool.observe_latency(selected_account, fetch_seconds)
+                                proxy_pool.observe_latency(selected_proxy, fetch_seconds)
+                        finally:
+                            # --- Revise: Increase the short cleaning time after closing the page ---
+                            await random_sleep(2, 4) # It turned out to be (1, 2.5)
+                        if final_record and not governor:
+                            # --- Revise: Adds major delay between browser visits of the same account ---
+                            # (with the rate governor the shared detail budget spaces the visits instead)
+                            log_time("[Climb backward] Perform a major random delay to simulate user browsing intervals...")
+                            await random_sleep(5, 10)
+
+                    if final_record:
+                        async with analysis_slots:
+                            await _analyze_and_save(final_record, unique_key)
+                except asyncio.CancelledError:
+                    raise
+                except RiskControlError:
+                    # Kept by the pipeline and re-raised into the attempt
+                    raise
+                except Exception as e:
+                    print(f"   mistake: An unknown error occurred while processing product listings: {e}")
+                finally:
+                    in_flight_keys.discard(unique_key)
 
-                // Analog touch support
-                Object.defineProperty(navigator, 'maxTouchPoints', {get: () => 5});
+        if not os.path.exists(state_file):
+            raise FileNotFoundError(f"Login status file does not exist: {state_file}")
 
-                // coverpermissionsQuery (avoid exposing automation）
-                const originalQuery = window.navigator.permissions.query;
-                window.navigator.permissions.query = (parameters) => (
-                    parameters.name === 'notifications' ?
-                        Promise.resolve({state: Notification.permission}) :
-                        originalQuery(parameters)
-                );
-            """)
+        snapshot_data = None
+        try:
+            with open(state_file, "r", encoding="utf-8") as f:
+                snapshot_data = json.load(f)
+        except Exception as e:
+            print(f"Warning: Failed to read login status file，will be used directly by path: {e}")
 
-            page = await context.new_page()
+        launch_kwargs, storage_state_arg, context_kwargs = _build_browser_settings(state_file, proxy_server, snapshot_data)
+        pool = _browser_pool or BrowserPool()
+        with timer.stage("browser_launch"):
+            lease = await pool.acquire(state_file, proxy_server, launch_kwargs, storage_state_arg, context_kwargs)
+        context_healthy = True
+        run_traffic = PageTraffic(kind="run")
+        governor = _get_rate_governor()
+        # Counted per attempt: the governor itself is shared by every run of the process
+        rate_usage = RateUsage()
+
+        async def _pace(kind: str) -> None:
+            """Wait for the shared budget of this account and proxy before a request of the given kind."""
+            if not governor:
+                return
+            waited = await governor.acquire(kind, state_file, proxy_server, usage=rate_usage)
+            timer.record("rate_wait", waited)
+            if waited >= 1:
+                log_time(f"[Rate governor] Waited {waited:.1f}s for the {kind} budget of this account。")
+        mtop_client = MtopClient(lease.context) if MTOP_DIRECT_FETCH else None
+        try:
+            page = await lease.new_page()
+            await resource_blocker.attach(page, "search", parent=run_traffic)
 
             try:
-                # step 0 - Simulate real users: first visit the homepage（Important anti-detection measures）
-                log_time("step 0 - Simulate real users visiting the homepage...")
-                await page.goto("https://www.goofish.com/", wait_until="domcontentloaded", timeout=30000)
-                log_time("[Climb backward] Stay on the homepage and simulate browsing...")
-                await random_sleep(1, 2)
-
-                # Simulate random scrolling (touch scrolling for mobile devices）
-                await page.evaluate("window.scrollBy(0, Math.random() * 500 + 200)")
-                await random_sleep(1, 2)
+                if lease.warm:
+                    log_time("step 0 - Reusing a warm browser context, skip the homepage visit...")
+                else:
+                    # step 0 - Simulate real users: first visit the homepage（Important anti-detection measures）
+                    log_time("step 0 - Simulate real users visiting the homepage...")
+                    with timer.stage("warmup"):
+                        await page.goto("https://www.goofish.com/", wait_until="domcontentloaded", timeout=30000)
+                        log_time("[Climb backward] Stay on the homepage and simulate browsing...")
+                        await random_sleep(1, 2)
+
+                        # Simulate random scrolling (touch scrolling for mobile devices）
+                        await page.evaluate("window.scrollBy(0, Math.random() * 500 + 200)")
+                        await random_sleep(1, 2)
+                    lease.mark_warmed()
 
                 log_time("step 1 - Navigate to the search results page...")
                 # use 'q' Parameters build correct searchURL，and proceedURLcoding
@@ -457,13 +910,15 @@ async def scrape_xianyu(task_config: dict, debug_limit: int = 0):
                 log_time(f"TargetURL: {search_url}")
 
                 # use expect_response Capture initial search while navigatingAPIdata
-                async with page.expect_response(lambda r: API_URL_PATTERN in r.url, timeout=30000) as response_info:
-                    await page.goto(search_url, wait_until="domcontentloaded", timeout=60000)
+                await _pace("search")
+                with timer.stage("search"):
+                    async with page.expect_response(lambda r: API_URL_PATTERN in r.url, timeout=30000) as response_info:
+                        await page.goto(search_url, wait_until="domcontentloaded", timeout=60000)
 
-                initial_response = await response_info.value
+                    initial_response = await response_info.value
 
-                # Wait for the page to load the key filter elements to confirm that you have successfully entered the search results page
-                await page.wait_for_selector('text=new release', timeout=15000)
+                    # Wait for the page to load the key filter elements to confirm that you have successfully entered the search results page
+                    await page.wait_for_selector('text=new release', timeout=15000)
 
                 # Simulate real user behavior: initial stay and browsing after page loading
                 log_time("[Climb backward] Simulate user viewing page...")
@@ -514,6 +969,7 @@ async def scrape_xianyu(task_config: dict, debug_limit: int = 0):
 
                 final_response = None
                 log_time("step 2 - Apply filters...")
+                filters_started = time.monotonic()
                 if new_publish_option:
                     try:
                         await page.click('text=new release')
@@ -606,7 +1062,7 @@ async def scrape_xianyu(task_config: dict, debug_limit: int = 0):
                                 except PlaywrightTimeoutError:
                                     log_time("Regional filtering submission timed out, continue execution。")
                             else:
-                                print("LOG: Area not found pop-up window "ViewXX"Baby" button，Skip submission。")
+                                print('LOG: Area not found pop-up window "ViewXX"Baby" button，Skip submission。')
                         else:
                             print("LOG: Region filter trigger not found。")
                     except PlaywrightTimeoutError:
@@ -634,9 +1090,11 @@ async def scrape_xianyu(task_config: dict, debug_limit: int = 0):
                     else:
                         print("LOG: warn - Price input container not found。")
 
+                timer.record("filters", time.monotonic() - filters_started)
                 log_time("All screening has been completed and product list processing has begun....")
 
                 current_response = final_response if final_response and final_response.ok else initial_response
+                early_stop = EarlyStop.for_task(task_config, new_publish_option, EARLY_STOP_KNOWN_ITEMS, EARLY_STOP_KNOWN_PAGES)
                 for page_num in range(1, max_pages + 1):
                     if stop_scraping:
                         break
@@ -648,12 +1106,14 @@ async def scrape_xianyu(task_config: dict, debug_limit: int = 0):
                         if not await next_btn.count():
                             log_time("Reached last page, no available ones found‘Next’ button，Stop turning pages。")
                             break
+                        await _pace("search")
                         try:
-                            async with page.expect_response(lambda r: API_URL_PATTERN in r.url, timeout=20000) as response_info:
-                                await next_btn.click()
-                                # --- Revise: Increase the waiting time after turning pages ---
-                                await random_sleep(2, 5) # It turned out to be (1.5, 3.5)
-                            current_response = await response_info.value
+                            with timer.stage("pagination"):
+                                async with page.expect_response(lambda r: API_URL_PATTERN in r.url, timeout=20000) as response_info:
+                                    await next_btn.click()
+                                    # --- Revise: Increase the waiting time after turning pages ---
+                                    await random_sleep(2, 5) # It turned out to be (1.5, 3.5)
+                                current_response = await response_info.value
                         except PlaywrightTimeoutError:
                             log_time(f"Turn page to page {page_num} Page timeout, stop turning pages。")
                             break
@@ -668,182 +1128,55 @@ async def scrape_xianyu(task_config: dict, debug_limit: int = 0):
 
                     total_items_on_page = len(basic_items)
                     for i, item_data in enumerate(basic_items, 1):
-                        if debug_limit > 0 and processed_item_count >= debug_limit:
+                        if debug_limit > 0 and dispatched_item_count >= debug_limit:
                             log_time(f"Debugging limit reached ({debug_limit})，Stop getting new items。")
                             stop_scraping = True
                             break
 
                         unique_key = get_link_unique_key(item_data["Product link"])
-                        if unique_key in processed_links:
-                            log_time(f"[In-page progress {i}/{total_items_on_page}] commodity '{item_data['Product title'][:20]}...' Already exists, skip。")
+                        if unique_key in processed_links or unique_key in in_flight_keys:
+                            log_time(f"[In-page progress {i}/{total_items_on_page}] commodity '{item_data['Product title'][:20]}...' Already exists, skip。", level="debug")
+                            if early_stop:
+                                early_stop.observe(known=True)
                             continue
 
+                        if prefilter:
+                            decision = prefilter.evaluate(item_data)
+                            if not decision.passed:
+                                log_time(f"[In-page progress {i}/{total_items_on_page}] [Pre-filter] '{item_data['Product title'][:20]}...' rejected ({decision.reason})，skip。", level="debug")
+                                continue
+
+                        if early_stop:
+                            early_stop.observe(known=False)
                         log_time(f"[In-page progress {i}/{total_items_on_page}] Discover new products and get details: {item_data['Product title'][:30]}...")
                         # --- Revise: The waiting time before accessing the details page. The simulated user looks at the list page for a while. ---
                         await random_sleep(2, 4) # It turned out to be (2, 4)
 
-                        detail_page = await context.new_page()
-                        try:
-                            async with detail_page.expect_response(lambda r: DETAIL_API_URL_PATTERN in r.url, timeout=25000) as detail_info:
-                                await detail_page.goto(item_data["Product link"], wait_until="domcontentloaded", timeout=25000)
-
-                            detail_response = await detail_info.value
-                            if detail_response.ok:
-                                detail_json = await detail_response.json()
-
-                                ret_string = str(await safe_get(detail_json, 'ret', default=[]))
-                                if "FAIL_SYS_USER_VALIDATE" in ret_string:
-                                    print("\n==================== CRITICAL BLOCK DETECTED ====================")
-                                    print("Xianyu anti-crawler verification detected (FAIL_SYS_USER_VALIDATE)，The program will terminate。")
-                                    long_sleep_duration = random.randint(3, 60)
-                                    print(f"To avoid account risks, a long hibernation will be performed ({long_sleep_duration} Second) then exit...")
-                                    await asyncio.sleep(long_sleep_duration)
-                                    print("Long hibernation has ended and will now exit safely。")
-                                    print("===================================================================")
-                                    raise RiskControlError("FAIL_SYS_USER_VALIDATE")
-
-                                # Parse product details data and update item_data
-                                item_do = await safe_get(detail_json, 'data', 'itemDO', default={})
-                                seller_do = await safe_get(detail_json, 'data', 'sellerDO', default={})
-
-                                reg_days_raw = await safe_get(seller_do, 'userRegDay', default=0)
-                                registration_duration_text = format_registration_days(reg_days_raw)
-
-                                # --- START: Add code block ---
-
-                                # 1. Extract seller’s Zhima credit information
-                                zhima_credit_text = await safe_get(seller_do, 'zhimaLevelInfo', 'levelName')
-
-                                # 2. Extract the complete image list of this product
-                                image_infos = await safe_get(item_do, 'imageInfos', default=[])
-                                if image_infos:
-                                    # Use list comprehension to get all valid imagesURL
-                                    all_image_urls = [img.get('url') for img in image_infos if img.get('url')]
-                                    if all_image_urls:
-                                        # Use a new field to store the image list, replacing the old single link
-                                        item_data['Product picture list'] = all_image_urls
-                                        # (Optional) Still keeping the link to the main image, just in case
-                                        item_data['Product main image link'] = all_image_urls[0]
-
-                                # --- END: Add code block ---
-                                item_data['“"Want" number of people'] = await safe_get(item_do, 'wantCnt', default=item_data.get('“"Want" number of people', 'NaN'))
-                                item_data['Views'] = await safe_get(item_do, 'browseCnt', default='-')
-                                # ...[Here you can add more product information parsed from the details page]...
-
-                                # Call the core function to collect seller information
-                                user_profile_data = {}
-                                user_id = await safe_get(seller_do, 'sellerId')
-                                if user_id:
-                                    # New, efficient calling method:
-                                    user_profile_data = await scrape_user_profile(context, str(user_id))
-                                else:
-                                    print("   [warn] Unable to obtain detailsAPIObtain the seller fromID。")
-                                user_profile_data['Seller Sesame Credit'] = zhima_credit_text
-                                user_profile_data['Seller registration time'] = registration_duration_text
-
-                                # Build base records
-                                final_record = {
-                                    "Crawl time": datetime.now().isoformat(),
-                                    "Search keywords": keyword,
-                                    "Task name": task_config.get('task_name', 'Untitled Task'),
-                                    "Product information": item_data,
-                                    "Seller information": user_profile_data
-                                }
-
-                                # --- START: Real-time AI Analysis & Notification ---
-                                from src.config import SKIP_AI_ANALYSIS
-
-                                # Check if skippedAIAnalyze and send notifications directly
-                                if SKIP_AI_ANALYSIS:
-                                    log_time("environment variables SKIP_AI_ANALYSIS Already set, skipAIAnalyze and send notifications directly...")
-                                    # Download pictures
-                                    image_urls = item_data.get('Product picture list', [])
-                                    downloaded_image_paths = await download_all_images(item_data['commodityID'], image_urls, task_config.get('task_name', 'default'))
-
-                                    # Delete downloaded image files to save space
-                                    for img_path in downloaded_image_paths:
-                                        try:
-                                            if os.path.exists(img_path):
-                                                os.remove(img_path)
-                                                print(f"   [picture] Temporary image files deleted: {img_path}")
-                                        except Exception as e:
-                                            print(f"   [picture] Error deleting picture file: {e}")
-
-                                    # Send notifications directly to mark all products as recommended
-                                    log_time("Product skippedAIAnalyze and prepare notifications...")
-                                    await send_ntfy_notification(item_data, "Product skippedAIAnalysis, direct notification")
-                                else:
-                                    log_time(f"start product #{item_data['commodityID']} perform real-timeAIanalyze...")
-                                    # 1. Download images
-                                    image_urls = item_data.get('Product picture list', [])
-                                    downloaded_image_paths = await download_all_images(item_data['commodityID'], image_urls, task_config.get('task_name', 'default'))
-
-                                    # 2. Get AI analysis
-                                    ai_analysis_result = None
-                                    if ai_prompt_text:
-                                        try:
-                                            # Note: Here we pass the entire record toAI，Give it the fullest context
-                                            ai_analysis_result = await get_ai_analysis(final_record, downloaded_image_paths, prompt_text=ai_prompt_text)
-                                            if ai_analysis_result:
-                                                final_record['ai_analysis'] = ai_analysis_result
-                                                log_time(f"AIAnalysis completed. Recommended status: {ai_analysis_result.get('is_recommended')}")
-                                            else:
-                                                final_record['ai_analysis'] = {'error': 'AI analysis returned None after retries.'}
-                                        except Exception as e:
-                                            print(f"   -> AIA serious error occurred during analysis: {e}")
-                                            final_record['ai_analysis'] = {'error': str(e)}
-                                    else:
-                                        print("   -> Task not configuredAI prompt，skip analysis。")
-
-                                    # Delete downloaded image files to save space
-                                    for img_path in downloaded_image_paths:
-                                        try:
-                                            if os.path.exists(img_path):
-                                                os.remove(img_path)
-                                                print(f"   [picture] Temporary image files deleted: {img_path}")
-                                        except Exception as e:
-                                            print(f"   [picture] Error deleting picture file: {e}")
-
-                                    # 3. Send notification if recommended
-                                    if ai_analysis_result and ai_analysis_result.get('is_recommended'):
-                                        log_time("Product quiltAIRecommended, ready to send notification...")
-                                        await send_ntfy_notification(item_data, ai_analysis_result.get("reason", "none"))
-                                # --- END: Real-time AI Analysis & Notification ---
-
-                                # 4. Save containsAIFull record of results
-                                await save_to_jsonl(final_record, keyword)
-
-                                processed_links.add(unique_key)
-                                processed_item_count += 1
-                                log_time(f"The product processing process is completed. Cumulative processing {processed_item_count} new items。")
-
-                                # --- Revise: Adds major delay after single item processing ---
-                                log_time("[Climb backward] Perform a major random delay to simulate user browsing intervals...")
-                                await random_sleep(5, 10)
-                            else:
-                                print(f"   mistake: Get product detailsAPIResponse failed, status code: {detail_response.status}")
-                                if AI_DEBUG_MODE:
-                                    print(f"--- [DETAIL DEBUG] FAILED RESPONSE from {item_data['Product link']} ---")
-                                    try:
-                                        print(await detail_response.text())
-                                    except Exception as e:
-                                        print(f"Unable to read response content: {e}")
-                                    print("----------------------------------------------------")
-
-                        except PlaywrightTimeoutError:
-                            print(f"   mistake: Visit the product details page or waitAPIResponse timeout。")
-                        except Exception as e:
-                            print(f"   mistake: An unknown error occurred while processing product listings: {e}")
-                        finally:
-                            await detail_page.close()
-                            # --- Revise: Increase the short cleaning time after closing the page ---
-                            await random_sleep(2, 4) # It turned out to be (1, 2.5)
-
+                        await pipeline.wait_for_capacity()
+                        in_flight_keys.add(unique_key)
+                        pipeline.spawn(_process_item(lease, item_data, unique_key))
+                        dispatched_item_count += 1
+
+                    pipeline.raise_error()
+                    stop_reason = early_stop.end_page() if early_stop else None
+                    if stop_reason and not stop_scraping and page_num < max_pages:
+                        # Newest-first results: the remaining pages only hold items seen before
+                        pages_skipped += max_pages - page_num
+                        log_time(f"[Early stop] {stop_reason}, skipping the remaining {max_pages - page_num} page(s)。")
+                        stop_scraping = True
                     # --- New: After processing all the products on a page, before turning the page，Add a longer "break"”time ---
-                    if not stop_scraping and page_num < max_pages:
+                    # (with the rate governor the shared search budget paces page turns instead)
+                    if not stop_scraping and page_num < max_pages and not governor:
                         print(f"--- No. {page_num} Page processing completed, ready to turn pages。Perform a long break between pages... ---")
                         await random_sleep(10, 15)
 
+                if pipeline.pending:
+                    log_time(f"Waiting for {len(pipeline.pending)} items still in the analysis pipeline...")
+                await pipeline.drain()
+
+            except RiskControlError:
+                context_healthy = False
+                raise
             except PlaywrightTimeoutError as e:
                 print(f"\nOperation timeout error: The page element or network response did not appear within the specified time。\n{e}")
                 raise
@@ -851,21 +1184,40 @@ async def scrape_xianyu(task_config: dict, debug_limit: int = 0):
                 log_time("A cancellation signal has been received and the current crawler task is being terminated....")
                 raise
             except Exception as e:
+                context_healthy = False
                 if type(e).__name__ == "TargetClosedError":
                     log_time("The browser has been closed, ignore subsequent exceptions（Maybe the task was stopped）。")
                     return processed_item_count
                 print(f"\nAn unknown error occurred during crawling: {e}")
                 raise
             finally:
-                log_time("After the task is completed, the browser will5Automatically shut down after seconds...")
-                await asyncio.sleep(5)
-                if debug_limit:
-                    input("Press the Enter key to close the browser...")
-                await browser.close()
+                await pipeline.cancel()
+                if pool is _browser_pool:
+                    # The warm context stays open for the next run, the search page is parked for reuse
+                    with contextlib.suppress(Exception):
+                        await lease.release_page(page)
+                else:
+                    log_time("After the task is completed, the browser will5Automatically shut down after seconds...")
+                    await asyncio.sleep(5)
+                    if debug_limit:
+                        input("Press the Enter key to close the browser...")
+        finally:
+            await pool.release(lease, healthy=context_healthy)
+            print(f"LOG: Page traffic: {run_traffic.summary()}")
+            if mtop_client:
+                print(f"LOG: mtop API: {mtop_client.summary()}")
+            if governor:
+                print(f"LOG: Rate governor (this run): {rate_usage.summary()}")
+            if pool is _browser_pool:
+                print(f"LOG: Browser pool: {pool.summary()}")
+            else:
+                await pool.close()
 
         return processed_item_count
 
     processed_item_count = 0
+    run_started_at = time.time()
+    run_succeeded = False
     attempt_limit = max(rotation_settings["account_retry_limit"], rotation_settings["proxy_retry_limit"], 1)
     last_error = ""
 
@@ -875,10 +1227,8 @@ async def scrape_xianyu(task_config: dict, debug_limit: int = 0):
             selected_proxy = _select_proxy()
         else:
             if rotation_settings["account_enabled"] and rotation_settings["account_mode"] == "on_failure":
-                account_pool.mark_bad(selected_account, last_error)
                 selected_account = _select_account(force_new=True)
             if rotation_settings["proxy_enabled"] and rotation_settings["proxy_mode"] == "on_failure":
-                proxy_pool.mark_bad(selected_proxy, last_error)
                 selected_proxy = _select_proxy(force_new=True)
 
         if rotation_settings["account_enabled"] and not selected_account:
@@ -900,6 +1250,9 @@ async def scrape_xianyu(task_config: dict, debug_limit: int = 0):
 
         try:
             processed_item_count += await _run_scrape_attempt(state_path, proxy_server)
+            account_pool.mark_good(selected_account)
+            proxy_pool.mark_good(selected_proxy)
+            run_succeeded = True
             break
         except RiskControlError as e:
             last_error = str(e)
@@ -911,6 +1264,27 @@ async def scrape_xianyu(task_config: dict, debug_limit: int = 0):
             print(f"This attempt failed: {last_error}")
             if attempt < attempt_limit:
                 print("Will try to rotate account/IP Try again later...")
+        # Failures cool the account / proxy down (longer on repeated failures) and lower its weight
+        account_pool.mark_bad(selected_account, last_error)
+        proxy_pool.mark_bad(selected_proxy, last_error)
+
+    if prefilter:
+        print(f"LOG: Pre-filter decisions: {prefilter.summary()}")
+    if pages_skipped:
+        print(f"LOG: Early stop saved {pages_skipped} search page(s) ({pages_skipped} search API requests and page turns)")
+    stage_summary = timer.summary(pages_skipped=pages_skipped)
+    stage_report = ", ".join(
+        f"{name} {stats['total_seconds']:.1f}s/{stats['count']}" for name, stats in stage_summary["stages"].items()
+    )
+    structured_log.log_event(
+        f"LOG: Stage timings (total/count) over {stage_summary['wall_seconds']:.1f}s: {stage_report or 'none'}",
+        stage="run",
+        duration=stage_summary["wall_seconds"],
+        outcome="ok" if run_succeeded else "failed",
+        new_items=processed_item_count,
+    )
+    if not debug_limit:
+        _record_run(task_config.get('task_name', keyword), run_started_at, processed_item_count, run_succeeded, stage_summary)
 
     # Clean up task picture directory
     cleanup_task_images(task_config.get('task_name', 'default'))
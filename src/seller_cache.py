@@ -0,0 +1,143 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+
+# Sections of a seller profile that are cached and expire independently:
+# "head" is the profile summary plus the seller's item list, "ratings" the review list and reputation stats
+SECTIONS = ("head", "ratings")
+
+
+class SellerProfileCache:
+    """
+    Persistent seller profile cache keyed by sellerId, shared by all tasks and processes.
+
+    Each section carries its own fetch time and TTL. Before crawling a stale section a
+    process takes a short lease on it, so concurrent tasks that meet the same seller wait
+    for the first crawl instead of repeating it.
+    """
+
+    def __init__(self, db_path: str, head_ttl: int = 6 * 3600, ratings_ttl: int = 24 * 3600, lease_seconds: int = 120):
+        self.db_path = db_path
+        self.ttls = {"head": max(0, int(head_ttl)), "ratings": max(0, int(ratings_ttl))}
+        self.lease_seconds = max(1, int(lease_seconds))
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            db_dir = os.path.dirname(self.db_path)
+            if db_dir:
+                os.makedirs(db_dir, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS seller_sections (
+                    seller_id TEXT NOT NULL,
+                    section TEXT NOT NULL,
+                    data TEXT,
+                    fetched_at REAL NOT NULL DEFAULT 0,
+                    lease_until REAL NOT NULL DEFAULT 0,
+                    PRIMARY KEY (seller_id, section)
+                );
+                CREATE TABLE IF NOT EXISTS seller_cache_stats (
+                    section TEXT PRIMARY KEY,
+                    hits INTEGER NOT NULL DEFAULT 0,
+                    misses INTEGER NOT NULL DEFAULT 0
+                );
+                """
+            )
+            self._conn = conn
+        return self._conn
+
+    def _record(self, conn: sqlite3.Connection, section: str, hit: bool) -> None:
+        column = "hits" if hit else "misses"
+        conn.execute(
+            f"INSERT INTO seller_cache_stats (section, {column}) VALUES (?, 1) "
+            f"ON CONFLICT(section) DO UPDATE SET {column} = {column} + 1",
+            (section,),
+        )
+
+    def get(self, seller_id: str, section: str, count: bool = True) -> Optional[dict]:
+        """Return the cached section if it is still within its TTL"""
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT data, fetched_at FROM seller_sections WHERE seller_id = ? AND section = ?",
+                (seller_id, section),
+            ).fetchone()
+            fresh = bool(row and row[0] is not None and time.time() - row[1] < self.ttls[section])
+            if count:
+                self._record(conn, section, fresh)
+            conn.commit()
+        return json.loads(row[0]) if fresh else None
+
+    def try_claim(self, seller_id: str, section: str) -> bool:
+        """Take the crawl lease of a section; False while another crawler holds it"""
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR IGNORE INTO seller_sections (seller_id, section) VALUES (?, ?)",
+                (seller_id, section),
+            )
+            cursor = conn.execute(
+                "UPDATE seller_sections SET lease_until = ? "
+                "WHERE seller_id = ? AND section = ? AND lease_until <= ?",
+                (now + self.lease_seconds, seller_id, section, now),
+            )
+            conn.commit()
+            return cursor.rowcount == 1
+
+    def release(self, seller_id: str, section: str) -> None:
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "UPDATE seller_sections SET lease_until = 0 WHERE seller_id = ? AND section = ?",
+                (seller_id, section),
+            )
+            conn.commit()
+
+    def put(self, seller_id: str, section: str, data: dict) -> None:
+        """Store a freshly crawled section and release its lease"""
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT INTO seller_sections (seller_id, section, data, fetched_at, lease_until) "
+                "VALUES (?, ?, ?, ?, 0) "
+                "ON CONFLICT(seller_id, section) DO UPDATE SET "
+                "data = excluded.data, fetched_at = excluded.fetched_at, lease_until = 0",
+                (seller_id, section, json.dumps(data, ensure_ascii=False), time.time()),
+            )
+            conn.commit()
+
+    def stats(self) -> dict:
+        """Hit/miss counters per section plus the number of cached sellers"""
+        with self._lock:
+            conn = self._connect()
+            counters = {
+                section: {"hits": hits, "misses": misses}
+                for section, hits, misses in conn.execute("SELECT section, hits, misses FROM seller_cache_stats")
+            }
+            sellers = conn.execute(
+                "SELECT COUNT(DISTINCT seller_id) FROM seller_sections WHERE data IS NOT NULL"
+            ).fetchone()[0]
+        result = {"sellers": sellers}
+        for section in SECTIONS:
+            entry = counters.get(section, {"hits": 0, "misses": 0})
+            total = entry["hits"] + entry["misses"]
+            entry["hit_rate"] = round(entry["hits"] / total, 4) if total else 0.0
+            entry["ttl_seconds"] = self.ttls[section]
+            result[section] = entry
+        return result
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
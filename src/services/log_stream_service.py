@@ -0,0 +1,208 @@
+"""
+Log streaming service
+One watcher per task log pushes new lines to the WebSocket clients subscribed to that task
+"""
+import asyncio
+from typing import Awaitable, Callable, Dict, Optional, Set
+
+from src.log_rotation import LogSegments
+
+
+SendFunc = Callable[[dict], Awaitable[None]]
+
+
+class LogSubscription:
+    """One socket's subscription to one task log, with a bounded queue of pending messages"""
+
+    def __init__(self, task_id: int, send: SendFunc, max_pending: int):
+        self.task_id = task_id
+        self.send = send
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_pending)
+        self.sender: Optional[asyncio.Task] = None
+        # Set once the client fell behind: it reloads over HTTP and subscribes again
+        self.stale = False
+
+    def push(self, message: dict, new_pos: int) -> None:
+        """Queue a message; a client that fell behind gets its backlog replaced by a resync notice"""
+        if self.stale:
+            return
+        try:
+            self.queue.put_nowait(message)
+            return
+        except asyncio.QueueFull:
+            pass
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.stale = True
+        self.queue.put_nowait({"type": "log_resync", "data": {"task_id": self.task_id, "new_pos": new_pos}})
+
+    async def run_sender(self) -> None:
+        try:
+            while True:
+                message = await self.queue.get()
+                await self.send(message)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # The socket is gone; the WebSocket route drops the subscription on disconnect
+            pass
+
+
+class LogWatcher:
+    """
+    Polls one log for growth and fans the new bytes out to its subscribers.
+
+    Positions are offsets over the whole log including rotated segments, so a rotation
+    is not mistaken for the log being cleared.
+    """
+
+    def __init__(self, task_id: int, path: str, poll_interval: float, max_chunk_bytes: int):
+        self.task_id = task_id
+        self.path = path
+        self.poll_interval = poll_interval
+        self.max_chunk_bytes = max_chunk_bytes
+        # Set by start(): loading the line index and sizing the log (under the rotation lock) block
+        self.segments: Optional[LogSegments] = None
+        self.position = 0
+        self.subscribers: Set[LogSubscription] = set()
+        self.task: Optional[asyncio.Task] = None
+        # Held while reading so a new subscriber's catch-up cannot interleave with a delta
+        self.lock = asyncio.Lock()
+
+    async def start(self) -> None:
+        """Begin at the current end of the log; called with self.lock held"""
+        self.segments = await asyncio.to_thread(LogSegments, self.path)
+        self.position = await self._size()
+        self.task = asyncio.create_task(self.run())
+
+    async def _size(self) -> int:
+        try:
+            return await asyncio.to_thread(self.segments.size)
+        except OSError:
+            return 0
+
+    def _publish(self, message: dict) -> None:
+        for subscription in list(self.subscribers):
+            subscription.push(message, self.position)
+
+    async def read_range(self, start: int, end: int) -> tuple:
+        """Bytes [start, end) up to the chunk cap, cut after the last complete line when possible"""
+        data, new_pos, _ = await asyncio.to_thread(
+            self.segments.read_chunk, start, min(end - start, self.max_chunk_bytes)
+        )
+        return data.decode("utf-8", errors="replace"), new_pos
+
+    async def poll_once(self) -> None:
+        size = await self._size()
+        if size < self.position:
+            # Cleared or truncated: clients start over from the beginning
+            self.position = 0
+            self._publish({"type": "log_reset", "data": {"task_id": self.task_id, "new_pos": 0}})
+        while size > self.position:
+            content, new_pos = await self.read_range(self.position, size)
+            if new_pos == self.position:
+                break
+            self.position = new_pos
+            self._publish({
+                "type": "log_delta",
+                "data": {"task_id": self.task_id, "content": content, "new_pos": new_pos},
+            })
+
+    async def run(self) -> None:
+        while True:
+            try:
+                async with self.lock:
+                    await self.poll_once()
+            except OSError as e:
+                print(f"Log stream: failed to read {self.path}: {e}")
+            await asyncio.sleep(self.poll_interval)
+
+
+class LogStreamHub:
+    """Per-task log subscriptions shared by all WebSocket connections"""
+
+    def __init__(self, poll_interval: float = 0.5, max_chunk_bytes: int = 64 * 1024, max_pending: int = 32):
+        self.poll_interval = poll_interval
+        self.max_chunk_bytes = max_chunk_bytes
+        self.max_pending = max(1, max_pending)
+        self.watchers: Dict[int, LogWatcher] = {}
+
+    async def subscribe(self, task_id: int, path: str, send: SendFunc, from_pos: Optional[int] = None) -> LogSubscription:
+        watcher = self.watchers.get(task_id)
+        if watcher is None or watcher.path != path:
+            if watcher is not None:
+                # The task's log moved (e.g. renamed task): its current readers reload from the new one
+                self._retire(watcher)
+            watcher = LogWatcher(task_id, path, self.poll_interval, self.max_chunk_bytes)
+            self.watchers[task_id] = watcher
+
+        subscription = LogSubscription(task_id, send, self.max_pending)
+        try:
+            async with watcher.lock:
+                if watcher.task is None:
+                    await watcher.start()
+                await self._catch_up(watcher, subscription, from_pos)
+                watcher.subscribers.add(subscription)
+        except BaseException:
+            # e.g. an unreadable log: do not leave a watcher running for nobody
+            if not watcher.subscribers and self.watchers.get(task_id) is watcher:
+                self._stop(watcher)
+                self.watchers.pop(task_id, None)
+            raise
+        subscription.sender = asyncio.create_task(subscription.run_sender())
+        return subscription
+
+    async def _catch_up(self, watcher: LogWatcher, subscription: LogSubscription, from_pos: Optional[int]) -> None:
+        """Send what the client missed before the watcher's position, if it fits in the queue"""
+        target = watcher.position
+        if from_pos is None or from_pos == target:
+            return
+        if from_pos > target or target - from_pos > self.max_chunk_bytes * self.max_pending:
+            subscription.push({"type": "log_resync", "data": {"task_id": watcher.task_id, "new_pos": target}}, target)
+            return
+        position = from_pos
+        while position < target:
+            content, new_pos = await watcher.read_range(position, target)
+            if new_pos == position:
+                break
+            position = new_pos
+            subscription.push({
+                "type": "log_delta",
+                "data": {"task_id": watcher.task_id, "content": content, "new_pos": new_pos},
+            }, target)
+
+    def unsubscribe(self, subscription: LogSubscription) -> None:
+        if subscription.sender is not None:
+            subscription.sender.cancel()
+        watcher = self.watchers.get(subscription.task_id)
+        if watcher is None or subscription not in watcher.subscribers:
+            # Already dropped with a retired watcher
+            return
+        watcher.subscribers.discard(subscription)
+        if not watcher.subscribers:
+            # Nobody is watching this log any more
+            self._stop(watcher)
+            self.watchers.pop(subscription.task_id, None)
+
+    def _retire(self, watcher: LogWatcher) -> None:
+        """Stop watching, but let the subscribers' senders deliver a resync notice first"""
+        if watcher.task is not None:
+            watcher.task.cancel()
+        for subscription in watcher.subscribers:
+            subscription.push({"type": "log_resync", "data": {"task_id": watcher.task_id, "new_pos": 0}}, 0)
+            subscription.stale = True
+        watcher.subscribers.clear()
+
+    def _stop(self, watcher: LogWatcher) -> None:
+        if watcher.task is not None:
+            watcher.task.cancel()
+        for subscription in watcher.subscribers:
+            if subscription.sender is not None:
+                subscription.sender.cancel()
+        watcher.subscribers.clear()
+
+    def stats(self) -> dict:
+        return {
+            "watched_logs": len(self.watchers),
+            "subscriptions": sum(len(watcher.subscribers) for watcher in self.watchers.values()),
+        }
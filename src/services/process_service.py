@@ -3,20 +3,82 @@ Process management service
 Responsible for managing the starting and stopping of the crawler process
 """
 import asyncio
+import contextlib
 import sys
 import os
 import signal
 from datetime import datetime
-from typing import Dict
+from typing import Dict, Optional
+from src.infrastructure.config.settings import settings
+from src.log_rotation import LogRotator
+from src.services.worker_client import WorkerClient, WorkerRun
 from src.utils import build_task_log_path
 
 
 class ProcessService:
     """Process management service"""
 
-    def __init__(self):
+    def __init__(self, worker_client: Optional[WorkerClient] = None, log_rotator: Optional[LogRotator] = None):
         self.processes: Dict[int, asyncio.subprocess.Process] = {}
         self.log_paths: Dict[int, str] = {}
+        self.log_rotator = log_rotator or LogRotator.from_settings(settings)
+        self._log_rotation_tasks: Dict[int, asyncio.Task] = {}
+        if worker_client is None and settings.browser_worker_enabled:
+            worker_client = WorkerClient(host=settings.browser_worker_host, port=settings.browser_worker_port)
+        self.worker = worker_client
+        if self.worker:
+            self.worker.on_event = self._on_worker_event
+
+    def _on_worker_event(self, event: dict) -> None:
+        """Progress reported by the browser worker"""
+        if event.get("event") == "disconnected":
+            # The worker went away: its runs are gone with it
+            for process in self.processes.values():
+                if isinstance(process, WorkerRun):
+                    process.finish(-1)
+            return
+        task_id = event.get("task_id")
+        process = self.processes.get(task_id)
+        if event.get("event") == "finished" and isinstance(process, WorkerRun):
+            process.finish(1 if event.get("error") else 0)
+            print(f"Task ID {task_id} finished in browser worker: processed {event.get('processed', 0)} items")
+
+    async def _start_in_worker(self, task_id: int, task_name: str, log_file_path: str) -> bool:
+        # Register the handle first: a short run can report "finished" before the reply is read
+        run = WorkerRun(0)
+        self.processes[task_id] = run
+        try:
+            response = await self.worker.request("run", task_id=task_id, task_name=task_name)
+        except BaseException:
+            self.processes.pop(task_id, None)
+            raise
+        if not response.get("ok"):
+            self.processes.pop(task_id, None)
+            print(f"Start task '{task_name}' in browser worker failed: {response.get('error')}")
+            return False
+        run.pid = response.get("pid", 0)
+        self.log_paths[task_id] = log_file_path
+        print(f"Start task '{task_name}' in browser worker (PID: {response.get('pid')})")
+        return True
+
+    async def _rotate_log(self, log_file_path: str, starting: bool = False) -> None:
+        try:
+            await asyncio.to_thread(self.log_rotator.maybe_rotate, log_file_path, starting)
+        except (OSError, RuntimeError) as e:
+            print(f"Log rotation of {log_file_path} failed: {e}")
+
+    async def _rotate_while_running(self, task_id: int, log_file_path: str) -> None:
+        """Size checks while the crawler writes; the crawler keeps appending to the same file"""
+        while self.is_running(task_id):
+            await asyncio.sleep(settings.log_rotate_check_seconds)
+            if self.is_running(task_id):
+                await self._rotate_log(log_file_path)
+
+    def _watch_log_size(self, task_id: int, log_file_path: str) -> None:
+        previous = self._log_rotation_tasks.pop(task_id, None)
+        if previous:
+            previous.cancel()
+        self._log_rotation_tasks[task_id] = asyncio.create_task(self._rotate_while_running(task_id, log_file_path))
 
     def is_running(self, task_id: int) -> bool:
         """Check if the task is running"""
@@ -29,9 +91,21 @@ class ProcessService:
             print(f"Task '{task_name}' (ID: {task_id}) Already running")
             return False
 
+        os.makedirs("logs", exist_ok=True)
+        log_file_path = build_task_log_path(task_id, task_name)
+        # A log that grew too large or was last written long ago is archived before the new run
+        await self._rotate_log(log_file_path, starting=True)
+
+        if self.worker:
+            try:
+                started = await self._start_in_worker(task_id, task_name, log_file_path)
+                if started:
+                    self._watch_log_size(task_id, log_file_path)
+                return started
+            except (OSError, ConnectionError, asyncio.TimeoutError) as e:
+                print(f"Browser worker unavailable, starting a separate process instead: {e}")
+
         try:
-            os.makedirs("logs", exist_ok=True)
-            log_file_path = build_task_log_path(task_id, task_name)
             log_file_handle = open(log_file_path, 'a', encoding='utf-8')
 
             preexec_fn = os.setsid if sys.platform != "win32" else None
@@ -49,6 +123,7 @@ class ProcessService:
 
             self.processes[task_id] = process
             self.log_paths[task_id] = log_file_path
+            self._watch_log_size(task_id, log_file_path)
             print(f"Start task '{task_name}' (PID: {process.pid})")
             return True
 
@@ -72,6 +147,9 @@ class ProcessService:
         """Stop task process"""
         process = self.processes.pop(task_id, None)
         log_path = self.log_paths.pop(task_id, None)
+        rotation_task = self._log_rotation_tasks.pop(task_id, None)
+        if rotation_task:
+            rotation_task.cancel()
         if not process:
             print(f"Task ID {task_id} There are no running processes")
             return False
@@ -79,6 +157,9 @@ class ProcessService:
             print(f"task process {process.pid} (ID: {task_id}) Exited, skip stopping")
             return False
 
+        if isinstance(process, WorkerRun):
+            return await self._stop_in_worker(task_id, process, log_path)
+
         try:
             if sys.platform != "win32":
                 os.killpg(os.getpgid(process.pid), signal.SIGTERM)
@@ -107,8 +188,24 @@ class ProcessService:
             print(f"Stop task process (ID: {task_id}) error: {e}")
             return False
 
+    async def _stop_in_worker(self, task_id: int, run: WorkerRun, log_path: str | None) -> bool:
+        try:
+            response = await self.worker.request("stop", timeout=30, task_id=task_id)
+        except (OSError, ConnectionError, asyncio.TimeoutError) as e:
+            print(f"Stop task (ID: {task_id}) in browser worker error: {e}")
+            return False
+        if not response.get("ok"):
+            print(f"Task ID {task_id} is not running in the browser worker: {response.get('error')}")
+            return False
+        run.finish(-int(signal.SIGTERM))
+        self._append_stop_marker(log_path)
+        print(f"Task (ID: {task_id}) stopped in browser worker")
+        return True
+
     async def stop_all(self):
         """Stop all task processes"""
         task_ids = list(self.processes.keys())
         for task_id in task_ids:
             await self.stop_task(task_id)
+        if self.worker:
+            await self.worker.close()
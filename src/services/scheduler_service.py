@@ -2,19 +2,85 @@
 Dispatch service
 Responsible for managing the scheduling of scheduled tasks
 """
+import asyncio
+import itertools
+import sqlite3
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
-from typing import List
+from apscheduler.triggers.interval import IntervalTrigger
 from src.domain.models.task import Task
+from src.infrastructure.config.settings import scheduler_settings, scraper_settings
+from src.run_history import RunHistory
 from src.services.process_service import ProcessService
 
 
+@dataclass(order=True)
+class QueuedRun:
+    """A cron firing waiting for a free slot; ordered by priority (higher first), then arrival"""
+    sort_key: tuple = field(init=False, repr=False)
+    priority: int = field(compare=False)
+    seq: int = field(compare=False)
+    task_id: int = field(compare=False)
+    task_name: str = field(compare=False)
+    # None for tasks without a fixed login state: the account is picked at run time, no per-account cap
+    account: Optional[str] = field(compare=False)
+    enqueued_at: float = field(compare=False, default_factory=time.time)
+
+    def __post_init__(self):
+        self.sort_key = (-self.priority, self.seq)
+
+
 class SchedulerService:
-    """Dispatch service"""
+    """
+    Dispatch service
 
-    def __init__(self, process_service: ProcessService):
+    Cron firings do not start crawlers directly: they are queued and started while the
+    number of running tasks stays under max_concurrent and under max_per_account for the
+    task's login state (tasks without one pick or rotate accounts at run time and are only
+    held to max_concurrent). Higher priority runs go first. A firing for a task that is still
+    running or already queued is coalesced into it; runs that waited longer than
+    max_queue_seconds are dropped. Triggers are jittered and starts are spaced apart so
+    tasks sharing a cron minute do not launch their browsers at the same moment.
+
+    Tasks with adaptive_schedule ignore their cron and poll on an interval derived from
+    the arrival rate of new items in their run history, kept within the task's (or the
+    default) min/max bounds and re-evaluated at every firing.
+    """
+
+    def __init__(
+        self,
+        process_service: ProcessService,
+        max_concurrent: Optional[int] = None,
+        max_per_account: Optional[int] = None,
+        jitter_seconds: Optional[int] = None,
+        start_spacing: Optional[float] = None,
+        max_queue_seconds: Optional[float] = None,
+        run_history: Optional[RunHistory] = None,
+    ):
         self.scheduler = AsyncIOScheduler(timezone="Asia/Shanghai")
         self.process_service = process_service
+        self.max_concurrent = max(1, max_concurrent or scheduler_settings.max_concurrent_tasks)
+        self.max_per_account = max(1, max_per_account or scheduler_settings.max_tasks_per_account)
+        self.jitter_seconds = jitter_seconds if jitter_seconds is not None else scheduler_settings.jitter_seconds
+        self.start_spacing = start_spacing if start_spacing is not None else scheduler_settings.start_spacing_seconds
+        self.max_queue_seconds = (
+            max_queue_seconds if max_queue_seconds is not None else scheduler_settings.max_queue_seconds
+        )
+        self.run_history = run_history or RunHistory(scraper_settings.run_history_db)
+        self.adaptive_min_minutes = scheduler_settings.adaptive_min_interval_minutes
+        self.adaptive_max_minutes = scheduler_settings.adaptive_max_interval_minutes
+        self.adaptive_target_items = scheduler_settings.adaptive_target_new_items
+        self._adaptive_tasks: Dict[int, Task] = {}
+        self.queue: List[QueuedRun] = []
+        self._task_meta: Dict[int, tuple] = {}
+        self._seq = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._last_start = float("-inf")
 
     def start(self):
         """Start scheduler"""
@@ -27,23 +93,47 @@ class SchedulerService:
         if self.scheduler.running:
             self.scheduler.shutdown()
             print("Scheduler has stopped")
+        if self._dispatcher and not self._dispatcher.done():
+            self._dispatcher.cancel()
+        self.queue.clear()
 
     async def reload_jobs(self, tasks: List[Task]):
         """Reload all scheduled tasks"""
         print("Reloading scheduled tasks...")
         self.scheduler.remove_all_jobs()
+        self._task_meta = {
+            task.id: (task.priority or 0, task.account_state_file or None) for task in tasks
+        }
+
+        self._adaptive_tasks = {task.id: task for task in tasks if task.enabled and task.adaptive_schedule}
 
         for task in tasks:
-            if task.enabled and task.cron:
+            if task.id in self._adaptive_tasks:
+                interval = await self.adaptive_interval(task)
+                self.scheduler.add_job(
+                    self._run_adaptive_task,
+                    trigger=IntervalTrigger(minutes=interval, jitter=self.jitter_seconds or None),
+                    args=[task.id, task.task_name],
+                    id=f"task_{task.id}",
+                    name=f"Adaptive: {task.task_name}",
+                    replace_existing=True,
+                    coalesce=True,
+                    max_instances=1,
+                )
+                print(f"  -> Task '{task.task_name}' polls adaptively, currently every {interval:.0f} minutes")
+            elif task.enabled and task.cron:
                 try:
                     trigger = CronTrigger.from_crontab(task.cron)
+                    trigger.jitter = self.jitter_seconds or None
                     self.scheduler.add_job(
                         self._run_task,
                         trigger=trigger,
                         args=[task.id, task.task_name],
                         id=f"task_{task.id}",
                         name=f"Scheduled: {task.task_name}",
-                        replace_existing=True
+                        replace_existing=True,
+                        coalesce=True,
+                        max_instances=1,
                     )
                     print(f"  -> Already tasked '{task.task_name}' Add timing rules: '{task.cron}'")
                 except ValueError as e:
@@ -53,5 +143,101 @@ class SchedulerService:
 
     async def _run_task(self, task_id: int, task_name: str):
         """Execute scheduled tasks"""
-        print(f"Scheduled task trigger: working on task '{task_name}' Start the crawler...")
-        await self.process_service.start_task(task_id, task_name)
+        print(f"Scheduled task trigger: working on task '{task_name}' Queued for the crawler...")
+        self.enqueue(task_id, task_name)
+
+    async def adaptive_interval(self, task: Task) -> float:
+        """Polling interval in minutes for an adaptive task, from its recent arrival rate (read off the loop)"""
+        min_minutes = task.min_interval_minutes or self.adaptive_min_minutes
+        max_minutes = task.max_interval_minutes or self.adaptive_max_minutes
+        try:
+            return await asyncio.to_thread(
+                self.run_history.suggest_interval, task.task_name, min_minutes, max_minutes, self.adaptive_target_items
+            )
+        except sqlite3.Error as e:
+            print(f"  -> [warn] Run history unavailable for '{task.task_name}': {e}")
+            return max(min_minutes, min(max_minutes, 60.0))
+
+    async def _run_adaptive_task(self, task_id: int, task_name: str):
+        """Execute an adaptive task and re-derive its interval from the latest run history"""
+        print(f"Adaptive task trigger: working on task '{task_name}' Queued for the crawler...")
+        self.enqueue(task_id, task_name)
+        task = self._adaptive_tasks.get(task_id)
+        job = self.scheduler.get_job(f"task_{task_id}")
+        if task is None or job is None:
+            return
+        interval = await self.adaptive_interval(task)
+        current = job.trigger.interval.total_seconds() / 60
+        # Only reschedule on a real change, every reschedule restarts the interval clock
+        if abs(interval - current) / current > 0.1:
+            job.reschedule(trigger=IntervalTrigger(minutes=interval, jitter=self.jitter_seconds or None))
+            print(f"Adaptive task '{task_name}' now polls every {interval:.0f} minutes (was {current:.0f})")
+
+    def enqueue(self, task_id: int, task_name: str) -> bool:
+        """Queue a run; returns False when it was coalesced into a queued or running one"""
+        if self.process_service.is_running(task_id):
+            print(f"Task '{task_name}' is still running, this firing is skipped")
+            return False
+        if any(run.task_id == task_id for run in self.queue):
+            print(f"Task '{task_name}' is already queued, this firing is merged into it")
+            return False
+        priority, account = self._task_meta.get(task_id, (0, None))
+        self.queue.append(QueuedRun(priority=priority, seq=next(self._seq), task_id=task_id, task_name=task_name, account=account))
+        self._ensure_dispatcher()
+        self._wakeup.set()
+        return True
+
+    def _ensure_dispatcher(self) -> None:
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch_loop())
+
+    def _running_accounts(self) -> Dict[int, Optional[str]]:
+        return {
+            task_id: self._task_meta.get(task_id, (0, None))[1]
+            for task_id in list(self.process_service.processes)
+            if self.process_service.is_running(task_id)
+        }
+
+    def _next_startable(self) -> Optional[QueuedRun]:
+        running = self._running_accounts()
+        if len(running) >= self.max_concurrent:
+            return None
+        for run in sorted(self.queue):
+            if run.task_id in running:
+                continue
+            if run.account is not None and (
+                sum(1 for account in running.values() if account == run.account) >= self.max_per_account
+            ):
+                continue
+            return run
+        return None
+
+    def _drop_stale(self) -> None:
+        now = time.time()
+        for run in [r for r in self.queue if self.max_queue_seconds and now - r.enqueued_at > self.max_queue_seconds]:
+            self.queue.remove(run)
+            print(f"Task '{run.task_name}' waited more than {self.max_queue_seconds:.0f}s in the queue, this run is dropped")
+
+    async def _dispatch_loop(self) -> None:
+        while self.queue:
+            self._drop_stale()
+            run = self._next_startable()
+            if run is None:
+                # Slots free up when a crawler exits; poll since process exits are not signalled here
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=2)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            spacing_left = self._last_start + self.start_spacing - time.monotonic()
+            if spacing_left > 0:
+                await asyncio.sleep(spacing_left)
+                continue
+            self.queue.remove(run)
+            self._last_start = time.monotonic()
+            waited = time.time() - run.enqueued_at
+            print(f"Scheduled task '{run.task_name}' starting after {waited:.0f}s in the queue (priority {run.priority})")
+            await self.process_service.start_task(run.task_id, run.task_name)
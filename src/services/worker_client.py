@@ -0,0 +1,139 @@
+"""
+Browser worker client
+Starts the long-lived browser worker on demand and talks to it over its local socket
+"""
+import asyncio
+import itertools
+import json
+import os
+import sys
+from typing import Callable, Dict, Optional
+
+
+class WorkerRun:
+    """Process-like handle of a task run executed inside the browser worker"""
+
+    def __init__(self, pid: int):
+        self.pid = pid
+        self.returncode: Optional[int] = None
+        self._finished = asyncio.Event()
+
+    def finish(self, returncode: int) -> None:
+        if self.returncode is None:
+            self.returncode = returncode
+        self._finished.set()
+
+    async def wait(self) -> Optional[int]:
+        await self._finished.wait()
+        return self.returncode
+
+
+class WorkerClient:
+    """Connection to the browser worker; requests are answered in order of their ids"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8765, start_timeout: float = 30):
+        self.host = host
+        self.port = port
+        self.start_timeout = start_timeout
+        self.on_event: Optional[Callable[[dict], None]] = None
+        self._process: Optional[asyncio.subprocess.Process] = None
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._listener: Optional[asyncio.Task] = None
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._ids = itertools.count(1)
+        self._connect_lock = asyncio.Lock()
+
+    @property
+    def connected(self) -> bool:
+        return self._writer is not None and not self._writer.is_closing()
+
+    async def _spawn(self) -> None:
+        if self._process is not None and self._process.returncode is None:
+            return
+        os.makedirs("logs", exist_ok=True)
+        child_env = os.environ.copy()
+        child_env["PYTHONIOENCODING"] = "utf-8"
+        child_env["PYTHONUTF8"] = "1"
+        # The worker gets its own copy of the descriptor; ours is closed once it is started
+        with open(os.path.join("logs", "browser_worker.log"), "a", encoding="utf-8") as log_handle:
+            self._process = await asyncio.create_subprocess_exec(
+                sys.executable, "-u", "-m", "src.browser_worker", "--host", self.host, "--port", str(self.port),
+                stdout=log_handle,
+                stderr=log_handle,
+                env=child_env,
+            )
+        print(f"Browser worker started (PID: {self._process.pid})")
+
+    async def connect(self) -> None:
+        async with self._connect_lock:
+            if self.connected:
+                return
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + self.start_timeout
+            spawned = False
+            while True:
+                try:
+                    self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+                    break
+                except OSError:
+                    if not spawned:
+                        await self._spawn()
+                        spawned = True
+                    if loop.time() >= deadline:
+                        raise ConnectionError(f"browser worker did not come up on {self.host}:{self.port}")
+                    await asyncio.sleep(0.5)
+            self._listener = asyncio.create_task(self._listen())
+
+    async def _listen(self) -> None:
+        try:
+            while True:
+                line = await self._reader.readline()
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if "event" in message:
+                    if self.on_event:
+                        self.on_event(message)
+                    continue
+                future = self._pending.pop(message.get("id"), None)
+                if future and not future.done():
+                    future.set_result(message)
+        finally:
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("browser worker connection lost"))
+            self._pending.clear()
+            if self._writer is not None:
+                self._writer.close()
+            self._writer = None
+            if self.on_event:
+                self.on_event({"event": "disconnected"})
+
+    async def request(self, op: str, timeout: float = 30, **payload) -> dict:
+        await self.connect()
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        message = {"id": request_id, "op": op, **payload}
+        self._writer.write((json.dumps(message, ensure_ascii=False) + "\n").encode("utf-8"))
+        await self._writer.drain()
+        try:
+            return await asyncio.wait_for(future, timeout=timeout)
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+        if self._listener is not None:
+            self._listener.cancel()
+        if self._process is not None and self._process.returncode is None:
+            self._process.terminate()
+            try:
+                await asyncio.wait_for(self._process.wait(), timeout=30)
+            except asyncio.TimeoutError:
+                self._process.kill()
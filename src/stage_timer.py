@@ -0,0 +1,165 @@
+import contextlib
+import contextvars
+import math
+import time
+from typing import Dict, Iterable, List, Optional
+
+from src import structured_log
+
+# Stages of a crawl run in pipeline order (the report keeps this order, unknown stages go last)
+STAGES = (
+    "browser_launch",
+    "warmup",
+    "search",
+    "filters",
+    "pagination",
+    "detail_fetch",
+    "profile_scrape",
+    "image_download",
+    "ai_analysis",
+    "notification",
+    "jsonl_write",
+    "rate_wait",
+)
+
+# Item the current asyncio task is working on; every pipeline item runs in its own task
+_current_item: contextvars.ContextVar[Optional[dict]] = contextvars.ContextVar("stage_timer_item", default=None)
+
+
+class StageStats:
+    """Durations of one stage: count, total, max and a bounded sample for percentiles"""
+
+    def __init__(self, max_samples: int = 1000):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.max_samples = max_samples
+        self.samples: List[float] = []
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        if len(self.samples) < self.max_samples:
+            self.samples.append(seconds)
+
+    def percentile(self, fraction: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))]
+
+    def as_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "total_seconds": round(self.total, 3),
+            "mean_seconds": round(self.total / self.count, 3) if self.count else 0.0,
+            "p95_seconds": round(self.percentile(0.95), 3),
+            "max_seconds": round(self.max, 3),
+        }
+
+
+class StageTimer:
+    """
+    Per-stage wall time of one crawl run, overall and per item.
+
+    Stages overlap when the item pipeline runs concurrently, so stage totals can add up to
+    more than the run's wall time; they show where the time goes, not a partition of it.
+    """
+
+    def __init__(self, task_name: str = "", slowest_items: int = 10, clock=time.monotonic):
+        self.task_name = task_name
+        self.slowest_items = slowest_items
+        self._clock = clock
+        self._started = clock()
+        self.stages: Dict[str, StageStats] = {}
+        self.items: List[dict] = []
+
+    def record(self, stage: str, seconds: float) -> None:
+        self.stages.setdefault(stage, StageStats()).add(seconds)
+        item = _current_item.get()
+        if item is not None:
+            item["stages"][stage] = round(item["stages"].get(stage, 0.0) + seconds, 3)
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        started = self._clock()
+        outcome = "error"
+        try:
+            yield
+            outcome = "ok"
+        finally:
+            seconds = self._clock() - started
+            self.record(name, seconds)
+            structured_log.log_event(structured_only=True, stage=name, duration=seconds, outcome=outcome)
+
+    @contextlib.contextmanager
+    def item(self, key: str):
+        """Attribute the stages timed inside this block (in this task) to one item"""
+        entry = {"key": key, "stages": {}}
+        token = _current_item.set(entry)
+        started = self._clock()
+        try:
+            with structured_log.item_context(key):
+                yield entry
+        finally:
+            _current_item.reset(token)
+            entry["total_seconds"] = round(self._clock() - started, 3)
+            self.items.append(entry)
+
+    def summary(self, **extra) -> dict:
+        order = {name: index for index, name in enumerate(STAGES)}
+        stages = sorted(self.stages.items(), key=lambda kv: (order.get(kv[0], len(order)), kv[0]))
+        slowest = sorted(self.items, key=lambda entry: entry.get("total_seconds", 0.0), reverse=True)
+        return {
+            "task_name": self.task_name,
+            "wall_seconds": round(self._clock() - self._started, 3),
+            "items": len(self.items),
+            "stages": {name: stats.as_dict() for name, stats in stages},
+            "slowest_items": slowest[: self.slowest_items],
+            **extra,
+        }
+
+
+def _escape_label(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def prometheus_text(summaries: Iterable[dict]) -> str:
+    """Prometheus text exposition of the latest run summary per task"""
+    metrics = {
+        "goofish_run_wall_seconds": ("gauge", "Wall time of the latest run", []),
+        "goofish_run_new_items": ("gauge", "New items processed by the latest run", []),
+        "goofish_run_succeeded": ("gauge", "1 if the latest run succeeded", []),
+        "goofish_run_finished_timestamp_seconds": ("gauge", "Unix time the latest run finished", []),
+        "goofish_stage_seconds": ("gauge", "Time spent per stage in the latest run", []),
+        "goofish_stage_count": ("gauge", "Number of timed executions per stage in the latest run", []),
+        "goofish_stage_p95_seconds": ("gauge", "95th percentile stage duration in the latest run", []),
+        "goofish_stage_max_seconds": ("gauge", "Slowest stage execution in the latest run", []),
+    }
+    for summary in summaries:
+        task = f'task="{_escape_label(summary.get("task_name", ""))}"'
+        for name, key in (
+            ("goofish_run_wall_seconds", "wall_seconds"),
+            ("goofish_run_new_items", "new_items"),
+            ("goofish_run_succeeded", "succeeded"),
+            ("goofish_run_finished_timestamp_seconds", "finished_at"),
+        ):
+            if summary.get(key) is not None:
+                metrics[name][2].append(f"{name}{{{task}}} {float(summary[key])!r}")
+        for stage, stats in (summary.get("stages") or {}).items():
+            labels = f'{task},stage="{_escape_label(stage)}"'
+            for name, key in (
+                ("goofish_stage_seconds", "total_seconds"),
+                ("goofish_stage_count", "count"),
+                ("goofish_stage_p95_seconds", "p95_seconds"),
+                ("goofish_stage_max_seconds", "max_seconds"),
+            ):
+                metrics[name][2].append(f"{name}{{{labels}}} {float(stats.get(key, 0))!r}")
+
+    lines = []
+    for name, (kind, help_text, samples) in metrics.items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        lines.extend(samples)
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,173 @@
+"""
+Opt-in structured logging for crawler runs
+
+LOG_FORMAT=json turns the crawler output into one JSON event per line (ts, level, task, stage,
+item_id, duration, outcome, msg); plain print() lines are wrapped as info events. LOG_LEVEL
+drops events below debug / info / warning / error (default: debug for text, info for json).
+"""
+import contextlib
+import contextvars
+import json
+import os
+import sys
+from datetime import datetime
+from typing import Optional
+
+LEVELS = {"debug": 10, "info": 20, "warning": 30, "error": 40}
+
+_task: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("log_task", default=None)
+_item: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("log_item", default=None)
+
+# Resolved on first use so a .env loaded by src.config is taken into account
+_settings: Optional[dict] = None
+
+
+def level_value(level: Optional[str]) -> int:
+    return LEVELS.get(str(level or "").strip().lower(), LEVELS["info"])
+
+
+def configure(log_format: Optional[str] = None, level: Optional[str] = None) -> None:
+    global _settings
+    log_format = (log_format if log_format is not None else os.getenv("LOG_FORMAT", "text")).strip().lower()
+    level = (level if level is not None else os.getenv("LOG_LEVEL", "")).strip().lower()
+    json_mode = log_format == "json"
+    _settings = {
+        "json": json_mode,
+        "min_level": level_value(level) if level else LEVELS["info" if json_mode else "debug"],
+    }
+
+
+def _get_settings() -> dict:
+    if _settings is None:
+        configure()
+    return _settings
+
+
+def json_mode() -> bool:
+    return _get_settings()["json"]
+
+
+def enabled(level: str) -> bool:
+    return level_value(level) >= _get_settings()["min_level"]
+
+
+def set_task(task_name: Optional[str]) -> None:
+    """Task name attached to every event of the current run (each run is its own asyncio task)"""
+    _task.set(task_name)
+
+
+@contextlib.contextmanager
+def item_context(item_id: Optional[str]):
+    """Attach an item id to the events emitted inside this block"""
+    token = _item.set(item_id)
+    try:
+        yield
+    finally:
+        _item.reset(token)
+
+
+def build_event(
+    message: str = "",
+    level: str = "info",
+    stage: Optional[str] = None,
+    item_id: Optional[str] = None,
+    duration: Optional[float] = None,
+    outcome: Optional[str] = None,
+    **fields,
+) -> dict:
+    event = {
+        "ts": datetime.now().isoformat(timespec="milliseconds"),
+        "level": level,
+        "task": _task.get(),
+    }
+    if stage:
+        event["stage"] = stage
+    item_id = item_id or _item.get()
+    if item_id:
+        event["item_id"] = str(item_id)
+    if duration is not None:
+        event["duration"] = round(duration, 3)
+    if outcome:
+        event["outcome"] = outcome
+    if message:
+        event["msg"] = message
+    event.update(fields)
+    return event
+
+
+def log_event(message: str = "", level: str = "info", structured_only: bool = False, **fields) -> None:
+    """
+    One log record: a JSON line in structured mode, otherwise the plain message.
+    structured_only events (stage timings) carry no text worth printing in text mode.
+    """
+    if not enabled(level):
+        return
+    if json_mode():
+        print(json.dumps(build_event(message, level, **fields), ensure_ascii=False, default=str))
+    elif not structured_only:
+        print(message)
+
+
+def parse_event(line: str) -> Optional[dict]:
+    if not line.startswith("{"):
+        return None
+    try:
+        event = json.loads(line)
+    except ValueError:
+        return None
+    return event if isinstance(event, dict) and "level" in event else None
+
+
+def event_matches(line: str, min_level: Optional[str] = None, stage: Optional[str] = None) -> bool:
+    """Field-based filter for structured log lines; text lines never match a filter"""
+    event = parse_event(line)
+    if event is None:
+        return False
+    if min_level and level_value(event.get("level")) < level_value(min_level):
+        return False
+    if stage and event.get("stage") != stage:
+        return False
+    return True
+
+
+class JsonLineStream:
+    """stdout/stderr replacement in structured mode: lines that are not events yet are wrapped as one"""
+
+    def __init__(self, target, level: str = "info"):
+        self._target = target
+        self._level = level
+        self._buffer = ""
+
+    def write(self, data):
+        self._buffer += data
+        while "\n" in self._buffer:
+            line, self._buffer = self._buffer.split("\n", 1)
+            self._write_line(line)
+        return len(data)
+
+    def _write_line(self, line: str) -> None:
+        if not line.strip():
+            return
+        if parse_event(line) is None:
+            if not enabled(self._level):
+                return
+            line = json.dumps(build_event(line.strip(), self._level), ensure_ascii=False, default=str)
+        self._target.write(line + "\n")
+        self._target.flush()
+
+    def flush(self):
+        self._target.flush()
+
+    def __getattr__(self, name):
+        return getattr(self._target, name)
+
+
+def install_stdout() -> None:
+    """Route stdout and stderr through JsonLineStream when structured mode is on"""
+    if not json_mode():
+        return
+    if not isinstance(sys.stdout, JsonLineStream):
+        sys.stdout = JsonLineStream(sys.stdout)
+    if not isinstance(sys.stderr, JsonLineStream):
+        # Tracebacks and warnings land on stderr
+        sys.stderr = JsonLineStream(sys.stderr, level="warning")
@@ -0,0 +1,54 @@
+"""
+Task run preparation shared by the CLI spider and the browser worker
+"""
+import json
+from typing import Optional
+
+
+def attach_prompt_text(task: dict) -> None:
+    """Combine the task's prompt files into task['ai_prompt_text']"""
+    if task.get("enabled", False) and task.get("ai_prompt_base_file") and task.get("ai_prompt_criteria_file"):
+        try:
+            with open(task["ai_prompt_base_file"], 'r', encoding='utf-8') as f_base:
+                base_prompt = f_base.read()
+            with open(task["ai_prompt_criteria_file"], 'r', encoding='utf-8') as f_criteria:
+                criteria_text = f_criteria.read()
+            
+            # dynamically combined into the finalPrompt
+            task['ai_prompt_text'] = base_prompt.replace("{{CRITERIA_SECTION}}", criteria_text)
+            
+            # Verify the generatedpromptIs it valid?
+            if len(task['ai_prompt_text']) < 100:
+                print(f"warn: Task '{task['task_name']}' generatedprompttoo short ({len(task['ai_prompt_text'])} character)，There may be a problem。")
+            elif "{{CRITERIA_SECTION}}" in task['ai_prompt_text']:
+                print(f"warn: Task '{task['task_name']}' ofpromptstill contains placeholders, replacement may fail。")
+            else:
+                print(f"✅ Task '{task['task_name']}' ofpromptGenerated successfully, length: {len(task['ai_prompt_text'])} character")
+
+        except FileNotFoundError as e:
+            print(f"warn: Task '{task['task_name']}' ofpromptFile missing: {e}，of this taskAIAnalysis will be skipped。")
+            task['ai_prompt_text'] = ""
+        except Exception as e:
+            print(f"mistake: Task '{task['task_name']}' deal withpromptException occurred while file: {e}，of this taskAIAnalysis will be skipped。")
+            task['ai_prompt_text'] = ""
+    elif task.get("enabled", False) and task.get("ai_prompt_file"):
+        try:
+            with open(task["ai_prompt_file"], 'r', encoding='utf-8') as f:
+                task['ai_prompt_text'] = f.read()
+            print(f"✅ Task '{task['task_name']}' ofpromptFile read successfully, length: {len(task['ai_prompt_text'])} character")
+        except FileNotFoundError:
+            print(f"warn: Task '{task['task_name']}' ofpromptdocument '{task['ai_prompt_file']}' Not found, the task'sAIAnalysis will be skipped。")
+            task['ai_prompt_text'] = ""
+        except Exception as e:
+            print(f"mistake: Task '{task['task_name']}' readpromptException occurred while file: {e}，of this taskAIAnalysis will be skipped。")
+            task['ai_prompt_text'] = ""
+
+
+def load_task_config(config_file: str, task_name: str) -> Optional[dict]:
+    """Read one task from the configuration file with its prompt text attached"""
+    with open(config_file, 'r', encoding='utf-8') as f:
+        tasks_config = json.load(f)
+    task = next((t for t in tasks_config if t.get('task_name') == task_name), None)
+    if task is not None:
+        attach_prompt_text(task)
+    return task
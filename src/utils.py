@@ -12,6 +12,8 @@ from urllib.parse import quote
 from openai import APIStatusError
 from requests.exceptions import HTTPError
 
+from src import structured_log
+
 
 def retry_on_failure(retries=3, delay=5):
     """
@@ -59,12 +61,22 @@ async def safe_get(data, *keys, default="None yet"):
 async def random_sleep(min_seconds: float, max_seconds: float):
     """Asynchronously waits for a random time within a specified range。"""
     delay = random.uniform(min_seconds, max_seconds)
-    print(f"   [Delay] wait {delay:.2f} Second... (scope: {min_seconds}-{max_seconds}s)")
+    structured_log.log_event(
+        f"   [Delay] wait {delay:.2f} Second... (scope: {min_seconds}-{max_seconds}s)",
+        "debug",
+        stage="delay",
+        duration=delay,
+    )
     await asyncio.sleep(delay)
 
 
-def log_time(message: str, prefix: str = "") -> None:
-    """Add before the log YY-MM-DD HH:MM:SS Simple printing of timestamp。"""
+def log_time(message: str, prefix: str = "", level: str = "info", **fields) -> None:
+    """Add before the log YY-MM-DD HH:MM:SS Simple printing of timestamp。In structured mode the line becomes a JSON event。"""
+    if structured_log.json_mode():
+        structured_log.log_event(f"{prefix}{message}", level, **fields)
+        return
+    if not structured_log.enabled(level):
+        return
     try:
         ts = datetime.now().strftime(' %Y-%m-%d %H:%M:%S')
     except Exception:
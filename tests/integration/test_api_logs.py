@@ -0,0 +1,81 @@
+import json
+
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.testclient import TestClient
+
+from src.api.routes import logs
+from src.utils import build_task_log_path
+
+
+def _client_with_task_log(api_context, sample_task_payload, tmp_path, monkeypatch, content: bytes):
+    monkeypatch.chdir(tmp_path)
+    api_context["app"].include_router(logs.router)
+    client = TestClient(api_context["app"])
+    assert client.post("/api/tasks/", json=sample_task_payload).status_code == 200
+    log_path = tmp_path / build_task_log_path(0, sample_task_payload["task_name"])
+    log_path.parent.mkdir(exist_ok=True)
+    log_path.write_bytes(content)
+    return client
+
+
+def test_incremental_reads_are_capped_and_line_aligned(api_context, sample_task_payload, tmp_path, monkeypatch):
+    lines = [f"line {i:04d} " + "x" * 90 + "\n" for i in range(30)]
+    content = "".join(lines).encode()
+    client = _client_with_task_log(api_context, sample_task_payload, tmp_path, monkeypatch, content)
+
+    pos, chunks = 0, []
+    while True:
+        data = client.get("/api/logs", params={"task_id": 0, "from_pos": pos, "max_bytes": 1024}).json()
+        chunks.append(data["new_content"])
+        assert data["file_size"] == len(content)
+        pos = data["new_pos"]
+        if not data["has_more"]:
+            break
+
+    assert "".join(chunks).encode() == content
+    assert all(len(chunk.encode()) <= 1024 and chunk.endswith("\n") for chunk in chunks)
+    assert len(chunks) == 3 and pos == len(content)
+
+
+def test_large_responses_are_gzipped_when_accepted(api_context, sample_task_payload, tmp_path, monkeypatch):
+    # Same middleware as src/app.py
+    api_context["app"].add_middleware(GZipMiddleware, minimum_size=1024)
+    client = _client_with_task_log(api_context, sample_task_payload, tmp_path, monkeypatch, b"same line\n" * 500)
+
+    response = client.get("/api/logs", params={"task_id": 0}, headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.json()["new_content"] == "same line\n" * 500
+
+    raw = client.get("/api/logs", params={"task_id": 0}, headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in raw.headers
+
+
+def test_tail_pages_through_the_whole_log(api_context, sample_task_payload, tmp_path, monkeypatch):
+    content = "".join(f"entry {i}\n" for i in range(2500)).encode()
+    client = _client_with_task_log(api_context, sample_task_payload, tmp_path, monkeypatch, content)
+
+    data = client.get("/api/logs/tail", params={"task_id": 0, "offset_lines": 2400, "limit_lines": 200}).json()
+    assert data["content"].splitlines() == [f"entry {i}" for i in range(100)]
+    assert data["has_more"] is False and data["next_offset"] == 2500
+
+    data = client.get("/api/logs/tail", params={"task_id": 0, "limit_lines": 2}).json()
+    assert data["content"] == "entry 2498\nentry 2499" and data["has_more"] is True
+
+
+def test_tail_filters_structured_events_by_level_and_stage(api_context, sample_task_payload, tmp_path, monkeypatch):
+    events = [
+        {"level": "debug", "stage": "delay", "msg": "wait"},
+        {"level": "info", "stage": "detail_fetch", "duration": 1.2, "outcome": "ok"},
+        {"level": "warning", "msg": "notify failed"},
+    ]
+    content = "".join(json.dumps(event) + "\n" for event in events * 3).encode() + b"plain text\n"
+    client = _client_with_task_log(api_context, sample_task_payload, tmp_path, monkeypatch, content)
+
+    data = client.get("/api/logs/tail", params={"task_id": 0, "level": "warning", "limit_lines": 2}).json()
+    assert [json.loads(line)["msg"] for line in data["content"].splitlines()] == ["notify failed"] * 2
+    assert data["has_more"] is True and data["next_offset"] == 5
+
+    data = client.get("/api/logs/tail", params={"task_id": 0, "stage": "detail_fetch"}).json()
+    assert len(data["content"].splitlines()) == 3 and data["has_more"] is False
+
+    assert client.get("/api/logs/tail", params={"task_id": 0, "level": "verbose"}).status_code == 422
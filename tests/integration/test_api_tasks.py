@@ -1,3 +1,9 @@
+import os
+
+from src.log_rotation import LogRotator, LogSegments
+from src.utils import build_task_log_path
+
+
 def test_create_list_update_delete_task(api_client, api_context, sample_task_payload):
     response = api_client.post("/api/tasks/", json=sample_task_payload)
     assert response.status_code == 200
@@ -44,3 +50,20 @@ def test_start_stop_task_updates_status(api_client, api_context, sample_task_pay
     process_service = api_context["process_service"]
     assert process_service.started == [(0, sample_task_payload["task_name"])]
     assert process_service.stopped == [0]
+
+
+def test_delete_task_removes_rotated_log_files(api_client, sample_task_payload, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert api_client.post("/api/tasks/", json=sample_task_payload).status_code == 200
+    log_path = tmp_path / build_task_log_path(0, sample_task_payload["task_name"])
+    log_path.parent.mkdir(exist_ok=True)
+    log_path.write_text("".join(f"line {i}\n" for i in range(50)))
+    LogRotator(max_bytes=10).maybe_rotate(str(log_path))
+    log_path.write_text("active line\n")
+    segments = LogSegments(str(log_path))
+    segments.tail(0, 10)
+    assert os.path.exists(segments.manifest_path) and os.path.exists(segments.line_index.index_path)
+
+    assert api_client.delete("/api/tasks/0").status_code == 200
+
+    assert os.listdir(log_path.parent) == []
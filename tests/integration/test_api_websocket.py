@@ -0,0 +1,41 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.api.routes import websocket
+from src.services.log_stream_service import LogWatcher
+from src.utils import build_task_log_path
+
+
+class FakeTaskService:
+    def __init__(self, task_name):
+        self.task = type("Task", (), {"task_name": task_name})()
+
+    async def get_task(self, task_id):
+        return self.task
+
+
+def test_bad_requests_and_failed_subscriptions_keep_the_socket_open(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    log_path = tmp_path / build_task_log_path(0, "camera")
+    log_path.parent.mkdir()
+    log_path.write_text("line 1\n")
+    monkeypatch.setattr(websocket, "get_task_service", lambda: FakeTaskService("camera"))
+    monkeypatch.setattr(websocket, "log_stream_hub", websocket.LogStreamHub(poll_interval=0.01))
+
+    async def unreadable(self, start, end):
+        raise OSError("permission denied")
+
+    app = FastAPI()
+    app.include_router(websocket.router)
+    with TestClient(app).websocket_connect("/ws") as ws:
+        ws.send_json({"action": "subscribe_logs", "task_id": 0, "from_pos": "not a number"})
+        with monkeypatch.context() as patch:
+            patch.setattr(LogWatcher, "read_range", unreadable)
+            ws.send_json({"action": "subscribe_logs", "task_id": 0, "from_pos": 0})
+            error = ws.receive_json()
+        assert error["type"] == "log_error" and "permission denied" in error["data"]["message"]
+
+        # The same socket still subscribes afterwards
+        ws.send_json({"action": "subscribe_logs", "task_id": 0, "from_pos": 0})
+        delta = ws.receive_json()
+        assert delta == {"type": "log_delta", "data": {"task_id": 0, "content": "line 1\n", "new_pos": 7}}
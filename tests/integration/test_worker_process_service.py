@@ -0,0 +1,73 @@
+import asyncio
+import json
+
+from src.infrastructure.config.settings import AppSettings
+from src.services import process_service
+from src.services.process_service import ProcessService
+from src.services.worker_client import WorkerClient
+
+
+async def _fake_worker(reader, writer, requests):
+    while True:
+        line = await reader.readline()
+        if not line:
+            break
+        request = json.loads(line)
+        requests.append(request)
+        writer.write((json.dumps({"id": request["id"], "ok": True, "pid": 4242}) + "\n").encode())
+        if request["op"] == "run" and request["task_name"] == "quick":
+            writer.write((json.dumps({"event": "finished", "task_id": request["task_id"], "processed": 3}) + "\n").encode())
+        await writer.drain()
+
+
+def test_process_service_runs_tasks_in_browser_worker(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    async def run():
+        requests = []
+        server = await asyncio.start_server(lambda r, w: _fake_worker(r, w, requests), "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        service = ProcessService(worker_client=WorkerClient(port=port, start_timeout=2))
+        try:
+            assert await service.start_task(1, "quick") is True
+            await asyncio.wait_for(service.processes[1].wait(), timeout=2)
+            assert service.is_running(1) is False
+
+            assert await service.start_task(2, "slow") is True
+            assert service.is_running(2) is True
+            assert await service.stop_task(2) is True
+            assert service.is_running(2) is False
+        finally:
+            await service.worker.close()
+            server.close()
+            await server.wait_closed()
+        return requests
+
+    requests = asyncio.run(run())
+    assert [r["op"] for r in requests] == ["run", "run", "stop"]
+    # The worker picks the log file itself, a client cannot point it at another path
+    assert "log_path" not in requests[0]
+
+
+def test_browser_worker_is_configured_from_the_env_file(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for name in ("BROWSER_WORKER_ENABLED", "BROWSER_WORKER_HOST", "BROWSER_WORKER_PORT"):
+        monkeypatch.delenv(name, raising=False)
+    (tmp_path / ".env").write_text("BROWSER_WORKER_ENABLED=true\nBROWSER_WORKER_PORT=9876\n")
+    monkeypatch.setattr(process_service, "settings", AppSettings())
+
+    service = ProcessService()
+    assert service.worker is not None
+    assert (service.worker.host, service.worker.port) == ("127.0.0.1", 9876)
+
+
+def test_log_rotation_is_configured_from_the_env_file(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for name in ("LOG_ROTATE_MAX_MB", "LOG_ARCHIVE_KEEP", "LOG_ROTATE_CHECK_SECONDS"):
+        monkeypatch.delenv(name, raising=False)
+    (tmp_path / ".env").write_text("LOG_ROTATE_MAX_MB=2\nLOG_ARCHIVE_KEEP=3\nLOG_ROTATE_CHECK_SECONDS=5\n")
+    monkeypatch.setattr(process_service, "settings", AppSettings())
+
+    service = ProcessService()
+    assert (service.log_rotator.max_bytes, service.log_rotator.keep) == (2 * 1024 * 1024, 3)
+    assert process_service.settings.log_rotate_check_seconds == 5
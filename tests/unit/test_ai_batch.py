@@ -0,0 +1,61 @@
+import asyncio
+
+from src import ai_batch
+from src.ai_batch import AIBatchAnalyzer
+
+
+def _analysis(recommended):
+    return {
+        "prompt_version": "v1",
+        "is_recommended": recommended,
+        "reason": "ok",
+        "risk_tags": [],
+        "criteria_analysis": {"seller_type": {"status": "PASS"}},
+    }
+
+
+def _record(item_id):
+    return {"Product information": {"commodityID": item_id, "Product title": f"item {item_id}"}}
+
+
+def test_batch_sends_one_request_and_falls_back_for_invalid_entries(monkeypatch):
+    requests, singles, token_limits = [], [], []
+
+    async def fake_request(messages, usage, validator=None, max_tokens=4000):
+        requests.append(messages)
+        token_limits.append(max_tokens)
+        usage["prompt_tokens"] += 300
+        return {"results": [
+            {"item": "2", "analysis": _analysis(False)},
+            {"item": "1", "analysis": _analysis(True)},
+            {"item": "3", "analysis": {"reason": "incomplete"}},
+        ]}
+
+    async def fake_single(product_data, ai_images, prompt_text, cache_key=None):
+        singles.append(product_data["Product information"]["commodityID"])
+        return _analysis(True)
+
+    monkeypatch.setattr(ai_batch, "client", object())
+    monkeypatch.setattr(ai_batch, "request_ai_analysis", fake_request)
+    monkeypatch.setattr(ai_batch, "analyze_prepared_item", fake_single)
+    async def _no_cached_result(*args):
+        return None, None
+
+    async def _store(*args):
+        return None
+
+    monkeypatch.setattr(ai_batch, "lookup_cached_analysis", _no_cached_result)
+    monkeypatch.setattr(ai_batch, "store_analysis_result", _store)
+    monkeypatch.setattr(ai_batch, "write_ai_request_log", lambda payload: None)
+
+    async def run():
+        batcher = AIBatchAnalyzer("prompt", batch_size=3, max_wait=30, max_tokens=8000, max_tokens_per_item=3000)
+        return await asyncio.gather(*(batcher.analyze(_record(str(i))) for i in (1, 2, 3)))
+
+    results = asyncio.run(run())
+
+    assert len(requests) == 1
+    # 3 items x 3000 tokens stays within the model's output cap
+    assert token_limits == [8000]
+    assert [r["is_recommended"] for r in results] == [True, False, True]
+    assert singles == ["3"]
@@ -0,0 +1,44 @@
+from src import ai_cache
+from src.ai_cache import AIResultCache, analysis_cache_key
+
+
+def _record(item_id, views, title="Sony A7M4"):
+    return {
+        "Crawl time": "2024-01-01T00:00:00",
+        "Task name": "camera",
+        "Product information": {"Product title": title, "commodityID": item_id, "Views": views},
+        "Seller information": {"Seller nickname": "seller"},
+    }
+
+
+def test_cache_key_ignores_volatile_fields():
+    key = analysis_cache_key(_record("1", 10), [b"img"], "prompt", "model")
+    assert analysis_cache_key(_record("2", 99), [b"img"], "prompt", "model") == key
+    assert analysis_cache_key(_record("1", 10, title="Sony A7M3"), [b"img"], "prompt", "model") != key
+    assert analysis_cache_key(_record("1", 10), [b"other"], "prompt", "model") != key
+    assert analysis_cache_key(_record("1", 10), [b"img"], "prompt", "other-model") != key
+
+
+def test_cache_counts_saved_tokens_and_evicts(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(ai_cache.time, "time", lambda: now[0])
+    cache = AIResultCache(str(tmp_path / "ai.db"), ttl=100, max_entries=2)
+
+    assert cache.get("a") is None
+    cache.put("a", {"is_recommended": True}, "model", prompt_tokens=1000, completion_tokens=50)
+    assert cache.get("a") == {"is_recommended": True}
+
+    now[0] += 1
+    cache.put("b", {"is_recommended": False})
+    now[0] += 1
+    cache.put("c", {"is_recommended": False})
+    # "a" is the least recently used entry once the cache is over capacity
+    assert cache.get("a") is None
+
+    stats = cache.stats()
+    assert stats["entries"] == 2
+    assert stats["hits"] == 1 and stats["misses"] == 2
+    assert stats["saved_tokens"] == 1050
+
+    now[0] += 200
+    assert cache.get("b") is None
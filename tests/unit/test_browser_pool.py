@@ -0,0 +1,164 @@
+import asyncio
+
+from src.browser_pool import BrowserPool
+
+
+class FakeFrame:
+    parent_frame = None
+
+    def __init__(self, url):
+        self.url = url
+
+
+class FakePage:
+    def __init__(self):
+        self.closed = False
+        self.handlers = []
+
+    def on(self, event, handler):
+        self.handlers.append(handler)
+
+    def is_closed(self):
+        return self.closed
+
+    async def goto(self, url, **kwargs):
+        for handler in self.handlers:
+            handler(FakeFrame(url))
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeContext:
+    def __init__(self):
+        self.closed = False
+        self.broken = False
+
+    async def add_init_script(self, script):
+        pass
+
+    async def cookies(self):
+        if self.broken:
+            raise RuntimeError("Target closed")
+        return []
+
+    async def new_page(self):
+        return FakePage()
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.closed = False
+
+    def is_connected(self):
+        return True
+
+    async def new_context(self, **kwargs):
+        return FakeContext()
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeChromium:
+    async def launch(self, **kwargs):
+        return FakeBrowser()
+
+
+class FakePlaywright:
+    chromium = FakeChromium()
+
+    async def stop(self):
+        pass
+
+
+def _pool(**kwargs):
+    pool = BrowserPool(**kwargs)
+    pool._playwright = FakePlaywright()
+    return pool
+
+
+async def _acquire(pool, state_file):
+    return await pool.acquire(str(state_file), None, {"headless": True}, str(state_file), {})
+
+
+def test_pool_reuses_contexts_and_pages(tmp_path):
+    state_file = tmp_path / "acc.json"
+    state_file.write_text("{}")
+
+    async def run():
+        pool = _pool(idle_pages=1)
+        lease = await _acquire(pool, state_file)
+        lease.mark_warmed()
+        page = await lease.new_page()
+        await page.goto("https://www.goofish.com/item?id=1")
+        await lease.release_page(page)
+        await pool.release(lease)
+
+        second = await _acquire(pool, state_file)
+        assert second.context is lease.context and second.warm
+        assert await second.new_page() is page
+        await pool.release(second)
+        return pool.stats()
+
+    stats = asyncio.run(run())
+    assert stats["context_hits"] == 1 and stats["context_launches"] == 1
+    assert stats["browser_launches"] == 1
+    assert stats["page_hits"] == 1 and stats["page_launches"] == 1
+
+
+def test_pool_recycles_after_navigation_limit_and_failed_health_check(tmp_path):
+    state_file = tmp_path / "acc.json"
+    state_file.write_text("{}")
+
+    async def run():
+        pool = _pool(max_navigations=2)
+        lease = await _acquire(pool, state_file)
+        page = await lease.new_page()
+        await page.goto("https://www.goofish.com/item?id=1")
+        await page.goto("https://www.goofish.com/item?id=2")
+        await lease.release_page(page)
+        await pool.release(lease)
+        assert lease.context.closed
+
+        fresh = await _acquire(pool, state_file)
+        assert fresh.context is not lease.context
+        await pool.release(fresh)
+        fresh.context.broken = True
+
+        replaced = await _acquire(pool, state_file)
+        assert replaced.context is not fresh.context and fresh.context.closed
+        await pool.release(replaced)
+        return pool.stats()
+
+    stats = asyncio.run(run())
+    assert stats["recycled"] == 1 and stats["unhealthy"] == 1
+    assert stats["context_launches"] == 3 and stats["open_contexts"] == 1
+
+
+def test_browser_stays_open_while_a_retired_context_is_leased(tmp_path):
+    state_file = tmp_path / "acc.json"
+    state_file.write_text("{}")
+
+    async def run():
+        pool = _pool(idle_ttl=0)
+        first = await _acquire(pool, state_file)
+        second = await _acquire(pool, state_file)
+        assert second.context is first.context
+        browser = pool._browsers[first._entry.browser_key]
+
+        # One run hits risk control while another still scrapes with the same context
+        await pool.release(first, healthy=False)
+        other = await pool.acquire(str(state_file), None, {"headless": False}, str(state_file), {})
+        assert not browser.closed and not second.context.closed
+
+        await pool.release(second)
+        assert second.context.closed
+        await pool.release(other)
+        await _acquire(pool, state_file)
+        return browser
+
+    assert asyncio.run(run()).closed
@@ -0,0 +1,78 @@
+import json
+
+from src import dedup_index
+from src.dedup_index import BloomFilter, DedupIndex, link_hash
+
+
+def _append_links(path, *item_ids):
+    with open(path, "a", encoding="utf-8") as f:
+        for item_id in item_ids:
+            record = {"Product information": {"Product link": f"https://www.goofish.com/item?id={item_id}&spm=x"}}
+            f.write(json.dumps(record) + "\n")
+
+
+def _key(item_id):
+    return f"https://www.goofish.com/item?id={item_id}"
+
+
+def test_index_builds_from_history_and_persists_adds(tmp_path):
+    jsonl_path = tmp_path / "sony_full_data.jsonl"
+    index_dir = tmp_path / "dedup"
+    _append_links(jsonl_path, 1, 2)
+
+    index = DedupIndex.open(str(jsonl_path), str(index_dir))
+    assert _key(1) in index and _key(2) in index
+    assert _key(3) not in index
+
+    index.add(_key(3))
+    _append_links(jsonl_path, 3, 4)
+
+    reopened = DedupIndex.open(str(jsonl_path), str(index_dir))
+    assert len(reopened) == 4
+    assert all(_key(i) in reopened for i in (1, 2, 3, 4))
+
+
+def test_index_compacts_and_uses_bloom(tmp_path, monkeypatch):
+    monkeypatch.setattr(dedup_index, "COMPACT_THRESHOLD", 3)
+    jsonl_path = tmp_path / "sony_full_data.jsonl"
+    index_dir = tmp_path / "dedup"
+    _append_links(jsonl_path, *range(10))
+
+    index = DedupIndex.open(str(jsonl_path), str(index_dir), use_bloom=True)
+    assert (index_dir / "sony_full_data.keys").stat().st_size == 10 * 8
+    assert not (index_dir / "sony_full_data.log").exists()
+    assert all(_key(i) in index for i in range(10))
+    assert _key(99) not in index
+
+
+def test_index_resets_when_result_file_is_removed(tmp_path):
+    jsonl_path = tmp_path / "sony_full_data.jsonl"
+    index_dir = tmp_path / "dedup"
+    _append_links(jsonl_path, 1)
+    DedupIndex.open(str(jsonl_path), str(index_dir))
+
+    jsonl_path.unlink()
+    assert _key(1) not in DedupIndex.open(str(jsonl_path), str(index_dir))
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(capacity=100)
+    hashes = [link_hash(_key(i)) for i in range(100)]
+    for value in hashes:
+        bloom.add(value)
+    assert all(value in bloom for value in hashes)
+
+
+def test_stale_bloom_filter_is_rebuilt(tmp_path, monkeypatch):
+    monkeypatch.setattr(dedup_index, "COMPACT_THRESHOLD", 3)
+    jsonl_path = tmp_path / "sony_full_data.jsonl"
+    index_dir = tmp_path / "dedup"
+    _append_links(jsonl_path, *range(5))
+    DedupIndex.open(str(jsonl_path), str(index_dir), use_bloom=True)
+
+    # Compactions while the filter is turned off leave the old .bloom behind
+    _append_links(jsonl_path, *range(5, 10))
+    DedupIndex.open(str(jsonl_path), str(index_dir))
+
+    index = DedupIndex.open(str(jsonl_path), str(index_dir), use_bloom=True)
+    assert all(_key(i) in index for i in range(10))
@@ -0,0 +1,25 @@
+from src.early_stop import EarlyStop
+
+
+def test_early_stop_is_sort_aware():
+    assert EarlyStop.for_task({}, "up to date", 10, 1) is not None
+    assert EarlyStop.for_task({}, "7within days", 10, 1) is None
+    assert EarlyStop.for_task({"early_stop": True}, "", 10, 1) is not None
+    assert EarlyStop.for_task({"early_stop": False}, "up to date", 10, 1) is None
+
+
+def test_stops_after_known_streak_or_fully_known_page():
+    stopper = EarlyStop(known_items=5, known_pages=2)
+    for known in (False, True, True):
+        stopper.observe(known)
+    assert stopper.end_page() is None
+
+    for _ in range(3):
+        stopper.observe(True)
+    assert stopper.end_page() == "5 known items in a row"
+
+    pages = EarlyStop(known_items=0, known_pages=2)
+    pages.observe(True)
+    assert pages.end_page() is None
+    pages.observe(True)
+    assert pages.end_page() == "2 page(s) without new items"
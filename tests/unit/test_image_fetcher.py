@@ -0,0 +1,58 @@
+import asyncio
+
+import httpx
+
+from src.image_fetcher import ImageFetcher
+
+
+def _handler(request):
+    if request.url.path == "/big.jpg":
+        return httpx.Response(200, content=b"x" * 64, headers={"content-type": "image/jpeg"})
+    if request.url.path == "/missing.jpg":
+        return httpx.Response(404)
+    return httpx.Response(200, content=request.url.path.encode(), headers={"content-type": "image/webp"})
+
+
+def _fetcher(**kwargs):
+    return ImageFetcher(transport=httpx.MockTransport(_handler), **kwargs)
+
+
+def test_fetch_all_keeps_order_and_drops_failures():
+    async def run():
+        fetcher = _fetcher(max_image_bytes=32, retries=1)
+        urls = ["https://img.test/a.jpg", "https://img.test/missing.jpg", "https://img.test/big.jpg", "https://img.test/b.jpg"]
+        try:
+            return await fetcher.fetch_all(urls)
+        finally:
+            await fetcher.aclose()
+
+    images = asyncio.run(run())
+    assert [img.data for img in images] == [b"/a.jpg", b"/b.jpg"]
+    assert images[0].content_type == "image/webp"
+
+
+def test_fetch_all_enforces_item_byte_budget():
+    async def run():
+        fetcher = _fetcher(max_item_bytes=10, per_host_concurrency=1)
+        try:
+            return await fetcher.fetch_all(["https://img.test/a.jpg", "https://img.test/b.jpg"])
+        finally:
+            await fetcher.aclose()
+
+    assert [img.data for img in asyncio.run(run())] == [b"/a.jpg"]
+
+
+def test_client_of_a_previous_event_loop_is_closed():
+    fetcher = _fetcher()
+
+    async def run():
+        await fetcher.fetch_all(["https://img.test/a.jpg"])
+        return fetcher._client
+
+    first_client = asyncio.run(run())
+    second_client = asyncio.run(run())
+    try:
+        assert first_client.is_closed
+        assert second_client is not first_client and not second_client.is_closed
+    finally:
+        asyncio.run(fetcher.aclose())
@@ -0,0 +1,38 @@
+import io
+
+from PIL import Image
+
+from src.image_fetcher import FetchedImage
+from src.image_preprocess import ImagePreprocessor
+
+
+def _png(size, color=(200, 30, 30, 255)):
+    buffer = io.BytesIO()
+    Image.new("RGBA", size, color).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def test_process_downscales_reencodes_and_limits():
+    preprocessor = ImagePreprocessor(max_edge=100, image_format="jpeg", quality=70, max_images=2)
+    images = [FetchedImage(url=f"u{i}", data=_png((800, 400)), content_type="image/png") for i in range(3)]
+
+    result, stats = preprocessor.process(images)
+
+    assert len(result) == 2
+    assert result[0].content_type == "image/jpeg"
+    with Image.open(io.BytesIO(result[0].data)) as img:
+        assert img.format == "JPEG"
+        assert max(img.size) == 100
+    assert stats.images_in == 3 and stats.images_out == 2
+    # Identical content is converted once and served from the hash cache
+    assert stats.cache_hits == 1
+
+
+def test_undecodable_image_is_passed_through():
+    preprocessor = ImagePreprocessor()
+    original = FetchedImage(url="u", data=b"not an image", content_type="image/heic")
+
+    result, _ = preprocessor.process([original])
+
+    assert result[0].data == b"not an image"
+    assert result[0].content_type == "image/heic"
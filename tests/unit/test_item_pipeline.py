@@ -0,0 +1,127 @@
+import asyncio
+
+import pytest
+
+from src.item_pipeline import ItemPipeline, RiskControlError, get_account_slots, get_pipeline_settings
+
+
+def test_pipeline_settings_prefer_the_task_and_never_drop_below_one(monkeypatch):
+    monkeypatch.setenv("DETAIL_CONCURRENCY", "3")
+    monkeypatch.setenv("AI_CONCURRENCY", "not-a-number")
+    monkeypatch.setenv("ACCOUNT_DETAIL_CONCURRENCY", "0")
+
+    assert get_pipeline_settings({}) == {
+        "detail_concurrency": 3,
+        "analysis_concurrency": 2,
+        "account_concurrency": 1,
+    }
+    settings = get_pipeline_settings({"detail_concurrency": -2, "analysis_concurrency": "5"})
+    assert (settings["detail_concurrency"], settings["analysis_concurrency"]) == (1, 5)
+
+
+def test_account_slots_are_shared_per_state_file(tmp_path):
+    state_file = str(tmp_path / "state" / "acc_1.json")
+    slots = get_account_slots(state_file, 2)
+
+    # Same account through another path spelling, with another limit: still the first semaphore
+    assert get_account_slots(str(tmp_path / "state" / ".." / "state" / "acc_1.json"), 5) is slots
+    assert get_account_slots(str(tmp_path / "state" / "acc_2.json"), 2) is not slots
+
+    async def _busy_holders():
+        held = []
+
+        async def _hold():
+            async with slots:
+                held.append(1)
+                await asyncio.sleep(0.01)
+                in_use = len(held)
+                held.pop()
+                return in_use
+
+        return max(await asyncio.gather(*(_hold() for _ in range(4))))
+
+    assert asyncio.run(_busy_holders()) == 2
+
+
+def test_wait_for_capacity_bounds_the_items_in_flight():
+    async def _run():
+        pipeline = ItemPipeline(max_pending=2)
+        running = []
+        peak = 0
+
+        async def _item():
+            nonlocal peak
+            running.append(1)
+            peak = max(peak, len(running))
+            await asyncio.sleep(0.01)
+            running.pop()
+
+        for _ in range(6):
+            await pipeline.wait_for_capacity()
+            pipeline.spawn(_item())
+        await pipeline.drain(poll_interval=0.01)
+        return peak, pipeline.pending
+
+    peak, pending = asyncio.run(_run())
+    assert peak == 2
+    assert not pending
+
+
+def test_drain_flushes_batches_until_every_item_finished():
+    async def _run():
+        released = asyncio.Event()
+        flushes = []
+
+        async def _flush():
+            flushes.append(1)
+            released.set()
+
+        async def _item_waiting_for_batch():
+            await released.wait()
+
+        pipeline = ItemPipeline(max_pending=4, flush=_flush)
+        item = pipeline.spawn(_item_waiting_for_batch())
+        await pipeline.drain(poll_interval=0.01)
+        return item.done(), len(flushes)
+
+    done, flushes = asyncio.run(_run())
+    assert done and flushes >= 1
+
+
+def test_risk_control_error_in_an_item_task_ends_the_attempt():
+    async def _item(fail: bool):
+        await asyncio.sleep(0)
+        if fail:
+            raise RiskControlError("FAIL_SYS_USER_VALIDATE")
+
+    async def _attempt():
+        pipeline = ItemPipeline(max_pending=4)
+        try:
+            pipeline.spawn(_item(False))
+            pipeline.spawn(_item(True))
+            await pipeline.drain(poll_interval=0.01)
+        finally:
+            await pipeline.cancel()
+
+    async def _rotation_loop():
+        # Same shape as scrape_xianyu: a RiskControlError from the attempt rotates the account
+        try:
+            await _attempt()
+        except RiskControlError as e:
+            return f"rotate: {e}"
+        return "done"
+
+    assert asyncio.run(_rotation_loop()) == "rotate: FAIL_SYS_USER_VALIDATE"
+
+
+def test_cancel_stops_the_remaining_items():
+    async def _run():
+        pipeline = ItemPipeline(max_pending=4)
+        items = [pipeline.spawn(asyncio.sleep(10)) for _ in range(3)]
+        await asyncio.sleep(0)
+        await pipeline.cancel()
+        return items, pipeline.pending
+
+    items, pending = asyncio.run(_run())
+    assert all(item.cancelled() for item in items)
+    assert not pending
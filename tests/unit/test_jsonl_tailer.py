@@ -0,0 +1,74 @@
+import json
+import os
+
+from src.infrastructure.persistence.jsonl_tailer import (
+    FileCheckpoint,
+    JsonlRecordCache,
+    iter_new_batches,
+    read_appended,
+)
+
+
+def _write(path, mode, *records, tail=""):
+    with open(path, mode, encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+        f.write(tail)
+
+
+def test_read_appended_only_returns_new_complete_lines(tmp_path):
+    path = tmp_path / "data.jsonl"
+    _write(path, "w", {"id": 1}, {"id": 2}, tail='{"id": 3')
+
+    batch = read_appended(str(path))
+    assert [r["id"] for r in batch.records] == [1, 2]
+    assert batch.reset is False
+
+    batch = read_appended(str(path), batch.checkpoint)
+    assert batch.records == []
+
+    _write(path, "a", tail="}\n")
+    batch = read_appended(str(path), batch.checkpoint)
+    assert [r["id"] for r in batch.records] == [3]
+    assert batch.checkpoint.offset == os.path.getsize(path)
+
+
+def test_read_appended_detects_truncation_and_rotation(tmp_path):
+    path = tmp_path / "data.jsonl"
+    _write(path, "w", {"id": 1}, {"id": 2})
+    checkpoint = read_appended(str(path)).checkpoint
+
+    # Truncated and regrown past the old offset: caught by the head fingerprint
+    _write(path, "w", {"id": 7, "padding": "x" * 40})
+    batch = read_appended(str(path), checkpoint)
+    assert batch.reset is True
+    assert [r["id"] for r in batch.records] == [7]
+
+    # Rotated: the old file is moved away and a new one created
+    os.rename(path, tmp_path / "data.jsonl.1")
+    _write(path, "w", {"id": 8}, {"id": 9}, {"id": 10})
+    batch = read_appended(str(path), batch.checkpoint)
+    assert batch.reset is True
+    assert [r["id"] for r in batch.records] == [8, 9, 10]
+
+
+def test_iter_new_batches_bounds_each_read(tmp_path):
+    path = tmp_path / "data.jsonl"
+    _write(path, "w", *({"id": i} for i in range(20)))
+
+    batches = list(iter_new_batches(str(path), FileCheckpoint(), max_bytes=32))
+    assert len(batches) > 1
+    assert [r["id"] for b in batches for r in b.records] == list(range(20))
+
+
+def test_record_cache_follows_appends(tmp_path):
+    path = tmp_path / "data.jsonl"
+    _write(path, "w", {"id": 1})
+    cache = JsonlRecordCache()
+    assert [r["id"] for r in cache.get_records(str(path))] == [1]
+
+    _write(path, "a", {"id": 2})
+    assert [r["id"] for r in cache.get_records(str(path))] == [1, 2]
+
+    os.remove(path)
+    assert cache.get_records(str(path)) == []
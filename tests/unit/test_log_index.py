@@ -0,0 +1,49 @@
+import json
+
+from src.log_index import LogLineIndex
+
+
+def _expected_tail(text, offset, limit):
+    lines = text.splitlines()
+    end = max(0, len(lines) - offset)
+    start = max(0, end - limit)
+    return lines[start:end], start > 0
+
+
+def test_tail_pages_match_a_full_scan_as_the_log_grows(tmp_path):
+    log_path = tmp_path / "task_1.log"
+    text = "".join(f"line {i}\n" for i in range(95))
+    log_path.write_text(text)
+    index = LogLineIndex(str(log_path), stride=10, read_size=64)
+
+    for offset in (0, 7, 40, 90, 94, 95, 200):
+        lines, has_more, size = index.tail(offset, 13)
+        assert (lines, has_more) == _expected_tail(text, offset, 13)
+        assert size == len(text)
+
+    # Appends are indexed incrementally, including a trailing line without its newline yet
+    with open(log_path, "a") as f:
+        f.write("".join(f"more {i}\n" for i in range(20)) + "partial")
+    text = log_path.read_text()
+    for offset in (0, 1, 50, 110):
+        assert index.tail(offset, 25)[:2] == _expected_tail(text, offset, 25)
+
+    # A fresh instance resumes from the persisted checkpoints
+    saved = json.loads((tmp_path / "task_1.log.idx").read_text())
+    assert saved["checkpoints"][1] == len("".join(f"line {i}\n" for i in range(10)))
+    assert LogLineIndex(str(log_path), stride=10).tail(30, 5)[:2] == _expected_tail(text, 30, 5)
+
+
+def test_truncated_or_replaced_log_rebuilds_the_index(tmp_path):
+    log_path = tmp_path / "task_2.log"
+    log_path.write_text("".join(f"old {i}\n" for i in range(50)))
+    index = LogLineIndex(str(log_path), stride=10)
+    index.tail(0, 5)
+
+    log_path.write_text("")
+    assert index.tail(0, 5) == ([], False, 0)
+
+    replacement = "".join(f"new {i}\n" for i in range(60))
+    log_path.write_text(replacement)
+    assert index.tail(0, 3)[0] == ["new 57", "new 58", "new 59"]
+    assert LogLineIndex(str(log_path), stride=10).tail(55, 10)[0] == ["new 0", "new 1", "new 2", "new 3", "new 4"]
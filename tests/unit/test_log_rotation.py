@@ -0,0 +1,80 @@
+import os
+
+from src.log_rotation import LogRotator, LogSegments
+
+
+def _append(path, lines):
+    with open(path, "a", encoding="utf-8") as f:
+        f.writelines(lines)
+
+
+def _read_all(segments, pos=0, max_bytes=64):
+    chunks = []
+    while True:
+        data, pos, size = segments.read_chunk(pos, max_bytes)
+        chunks.append(data)
+        if pos >= size:
+            return b"".join(chunks), pos
+
+
+def test_rotated_segments_read_as_one_log(tmp_path):
+    log_path = str(tmp_path / "camera_1.log")
+    rotator = LogRotator(max_bytes=200, keep=5)
+    written = []
+    for batch in range(3):
+        lines = [f"run {batch} line {i}\n" for i in range(20)]
+        _append(log_path, lines)
+        written += lines
+        assert rotator.maybe_rotate(log_path)["lines"] == 20
+    _append(log_path, ["active line\n"])
+    written.append("active line\n")
+
+    segments = LogSegments(log_path)
+    assert os.path.getsize(log_path) == len("active line\n")
+    assert sorted(f for f in os.listdir(tmp_path) if f.endswith(".gz")) == [
+        "camera_1.log.1.gz", "camera_1.log.2.gz", "camera_1.log.3.gz",
+    ]
+
+    # Byte cursors keep counting across the rotations
+    content, end = _read_all(segments)
+    assert content.decode() == "".join(written) and end == segments.size()
+    cursor = len("".join(written[:25]))
+    assert _read_all(segments, cursor)[0].decode() == "".join(written[25:])
+
+    # Tail pages walk from the active file back into the archives
+    lines, has_more, size = segments.tail(0, 3)
+    assert lines == ["run 2 line 18", "run 2 line 19", "active line"] and has_more
+    lines, has_more, _ = segments.tail(55, 10)
+    assert lines == [line.rstrip("\n") for line in written[:6]] and not has_more
+    assert size == len("".join(written).encode())
+
+
+def test_retention_drops_old_archives_and_clear_resets(tmp_path):
+    log_path = str(tmp_path / "camera_2.log")
+    rotator = LogRotator(max_bytes=10, keep=2)
+    for batch in range(4):
+        _append(log_path, [f"batch {batch} " + "x" * 20 + "\n"])
+        rotator.maybe_rotate(log_path)
+
+    segments = LogSegments(log_path)
+    assert [s["seq"] for s in segments.load()["segments"]] == [3, 4]
+    assert not os.path.exists(log_path + ".1.gz")
+    # A cursor inside a pruned archive resumes at the oldest data kept
+    data, _, _ = segments.read_chunk(0, 1024)
+    assert data.decode().startswith("batch 2 ")
+    assert segments.tail(0, 10)[0] == [f"batch {b} " + "x" * 20 for b in (2, 3)]
+
+    open(log_path, "w").close()
+    segments.clear()
+    assert segments.size() == 0 and not os.path.exists(log_path + ".4.gz")
+
+
+def test_age_rotation_on_start(tmp_path):
+    log_path = str(tmp_path / "camera_3.log")
+    _append(log_path, ["yesterday\n"])
+    old = os.path.getmtime(log_path) - 2 * 86400
+    os.utime(log_path, (old, old))
+    rotator = LogRotator(max_bytes=10 ** 6, max_age_seconds=86400)
+
+    assert rotator.maybe_rotate(log_path) is None
+    assert rotator.maybe_rotate(log_path, starting=True)["lines"] == 1
@@ -0,0 +1,153 @@
+import asyncio
+
+import pytest
+
+from src.services.log_stream_service import LogStreamHub, LogWatcher
+
+
+def test_one_watcher_pushes_bounded_line_aligned_deltas(tmp_path):
+    log_path = tmp_path / "task_1.log"
+    log_path.write_bytes(b"old line\n")
+
+    async def run():
+        hub = LogStreamHub(poll_interval=0.01, max_chunk_bytes=16)
+        first, second = [], []
+
+        async def send_first(message):
+            first.append(message)
+
+        async def send_second(message):
+            second.append(message)
+
+        sub_a = await hub.subscribe(1, str(log_path), send_first, from_pos=0)
+        sub_b = await hub.subscribe(1, str(log_path), send_second)
+        assert hub.stats() == {"watched_logs": 1, "subscriptions": 2}
+
+        with open(log_path, "ab") as f:
+            f.write(b"first new line\nsecond\n")
+        await asyncio.sleep(0.1)
+        log_path.write_bytes(b"")
+        await asyncio.sleep(0.1)
+
+        hub.unsubscribe(sub_a)
+        hub.unsubscribe(sub_b)
+        assert hub.stats() == {"watched_logs": 0, "subscriptions": 0}
+        return first, second
+
+    first, second = asyncio.run(run())
+    deltas = [m["data"]["content"] for m in first if m["type"] == "log_delta"]
+    # The catch-up from position 0 plus the appended lines, each chunk capped and ending on a line break
+    assert "".join(deltas) == "old line\nfirst new line\nsecond\n"
+    assert all(len(chunk.encode()) <= 16 and chunk.endswith("\n") for chunk in deltas)
+    assert [m["data"]["content"] for m in second if m["type"] == "log_delta"] == ["first new line\n", "second\n"]
+    assert first[-1]["type"] == "log_reset" and second[-1]["type"] == "log_reset"
+
+
+def test_slow_subscriber_gets_resync_instead_of_unbounded_backlog(tmp_path):
+    log_path = tmp_path / "task_2.log"
+    log_path.write_bytes(b"")
+
+    async def run():
+        hub = LogStreamHub(poll_interval=0.01, max_chunk_bytes=8, max_pending=2)
+        received = []
+        release = asyncio.Event()
+
+        async def slow_send(message):
+            await release.wait()
+            received.append(message)
+
+        subscription = await hub.subscribe(2, str(log_path), slow_send)
+        with open(log_path, "ab") as f:
+            f.write(b"line 1\nline 2\nline 3\nline 4\nline 5\n")
+        await asyncio.sleep(0.1)
+        assert subscription.queue.qsize() <= 2
+        release.set()
+        await asyncio.sleep(0.05)
+        hub.unsubscribe(subscription)
+        return received
+
+    received = asyncio.run(run())
+    # One chunk is in flight and two fit in the queue; the next overflows it, so the queued backlog is
+    # replaced by the resync notice and nothing more is pushed to this subscription
+    assert [m["type"] for m in received] == ["log_delta", "log_resync"]
+    assert received[-1]["data"] == {"task_id": 2, "new_pos": 28}
+
+
+def test_failed_catch_up_leaves_no_watcher_running(tmp_path, monkeypatch):
+    log_path = tmp_path / "task_3.log"
+    log_path.write_bytes(b"some line\n")
+
+    async def unreadable(self, start, end):
+        raise OSError("permission denied")
+
+    monkeypatch.setattr(LogWatcher, "read_range", unreadable)
+
+    async def run():
+        hub = LogStreamHub(poll_interval=0.01)
+
+        async def send(message):
+            pass
+
+        with pytest.raises(OSError):
+            await hub.subscribe(3, str(log_path), send, from_pos=0)
+        return hub.stats()
+
+    assert asyncio.run(run()) == {"watched_logs": 0, "subscriptions": 0}
+
+
+def test_path_change_sends_resync_to_the_old_subscribers(tmp_path):
+    old_path, new_path = tmp_path / "old.log", tmp_path / "new.log"
+    old_path.write_bytes(b"")
+    new_path.write_bytes(b"")
+
+    async def run():
+        hub = LogStreamHub(poll_interval=0.01)
+        old_messages, new_messages = [], []
+
+        async def send_old(message):
+            old_messages.append(message)
+
+        async def send_new(message):
+            new_messages.append(message)
+
+        old_sub = await hub.subscribe(4, str(old_path), send_old)
+        new_sub = await hub.subscribe(4, str(new_path), send_new)
+        await asyncio.sleep(0.05)
+        assert hub.stats() == {"watched_logs": 1, "subscriptions": 1}
+
+        # The socket re-subscribing drops its retired subscription without touching the new watcher
+        hub.unsubscribe(old_sub)
+        assert hub.stats() == {"watched_logs": 1, "subscriptions": 1}
+        hub.unsubscribe(new_sub)
+        return old_messages, new_messages
+
+    old_messages, new_messages = asyncio.run(run())
+    assert old_messages == [{"type": "log_resync", "data": {"task_id": 4, "new_pos": 0}}]
+    assert new_messages == []
+
+
+def test_log_size_is_read_off_the_event_loop(tmp_path):
+    log_path = tmp_path / "task_5.log"
+    log_path.write_bytes(b"line\n")
+
+    async def run():
+        hub = LogStreamHub(poll_interval=0.01)
+
+        async def send(message):
+            pass
+
+        subscription = await hub.subscribe(5, str(log_path), send)
+        watcher = hub.watchers[5]
+        # A rotation holding the log's lock must not stall the loop while the watcher polls
+        watcher.segments.lock.acquire()
+        try:
+            ticks = 0
+            for _ in range(10):
+                await asyncio.sleep(0.01)
+                ticks += 1
+        finally:
+            watcher.segments.lock.release()
+        hub.unsubscribe(subscription)
+        return ticks, watcher.position
+
+    assert asyncio.run(run()) == (10, 5)
@@ -0,0 +1,78 @@
+import asyncio
+import hashlib
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from src.mtop_client import MtopClient, MtopError, extract_item_id, mtop_sign
+
+
+class FakeResponse:
+    def __init__(self, payload, status=200):
+        self.payload = payload
+        self.status = status
+        self.ok = status == 200
+
+    async def json(self):
+        return self.payload
+
+
+class FakeRequest:
+    def __init__(self, context, replies):
+        self.context = context
+        self.replies = list(replies)
+        self.calls = []
+
+    async def post(self, url, form=None, headers=None, timeout=None):
+        self.calls.append((url, form))
+        reply = self.replies.pop(0)
+        if "token" in reply:
+            self.context.token = reply.pop("token")
+        return FakeResponse(reply)
+
+
+class FakeContext:
+    def __init__(self, replies, token=""):
+        self.token = token
+        self.request = FakeRequest(self, replies)
+
+    async def cookies(self, url=None):
+        if not self.token:
+            return []
+        return [{"name": "_m_h5_tk", "value": f"{self.token}_1700000000000"}]
+
+
+def test_sign_and_item_id():
+    expected = hashlib.md5(b"tok&1700&34839810&{}").hexdigest()
+    assert mtop_sign("tok", "1700", "34839810", "{}") == expected
+    assert extract_item_id("https://www.goofish.com/item?id=712345&categoryId=1") == "712345"
+    assert extract_item_id("https://www.goofish.com/personal") is None
+
+
+def test_call_retries_once_with_refreshed_token():
+    context = FakeContext([
+        {"ret": ["FAIL_SYS_TOKEN_EXOIRED::token expired"], "token": "fresh"},
+        {"ret": ["SUCCESS::ok"], "data": {"itemDO": {"wantCnt": 3}}},
+    ])
+    client = MtopClient(context)
+
+    result = asyncio.run(client.fetch_detail("712345"))
+
+    assert result["data"]["itemDO"]["wantCnt"] == 3
+    retry_url, retry_form = context.request.calls[1]
+    params = parse_qs(urlparse(retry_url).query)
+    assert params["api"] == ["mtop.taobao.idle.pc.detail"]
+    assert params["sign"][0] == mtop_sign("fresh", params["t"][0], "34839810", retry_form["data"])
+    assert client.available
+
+
+def test_validation_challenge_disables_direct_calls():
+    context = FakeContext([{"ret": ["FAIL_SYS_USER_VALIDATE::slide to verify"]}], token="tok")
+    client = MtopClient(context)
+
+    with pytest.raises(MtopError):
+        asyncio.run(client.fetch_user_head("42"))
+    assert not client.available
+    with pytest.raises(MtopError):
+        asyncio.run(client.fetch_user_head("42"))
+    assert len(context.request.calls) == 1
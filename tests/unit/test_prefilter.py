@@ -0,0 +1,50 @@
+import pytest
+from pydantic import ValidationError
+
+from src.domain.models.task import TaskUpdate
+from src.prefilter import Prefilter, PrefilterError
+
+
+def _item(title, price="¥3000", area="Shanghai"):
+    return {"Product title": title, "Current selling price": price, "Shipping area": area}
+
+
+def test_prefilter_rules_and_counters():
+    prefilter = Prefilter.from_config({
+        "include_keywords": ["a7m4"],
+        "exclude_keywords": "broken, for parts",
+        "exclude_regex": [r"\brent(al)?\b"],
+        "min_price": 2000,
+        "max_price": "12000",
+        "blocked_regions": ["Xinjiang"],
+    })
+
+    assert prefilter.evaluate(_item("Sony A7M4 body")).passed
+    assert prefilter.evaluate(_item("Sony A7M4 broken screen")).reason == "exclude_keyword:broken"
+    assert prefilter.evaluate(_item("A7M4 rental per day")).reason == r"exclude_regex:\brent(al)?\b"
+    assert prefilter.evaluate(_item("Sony A7M3")).reason == "missing_include_keyword"
+    assert prefilter.evaluate(_item("Sony A7M4", price="¥500")).reason == "price_below_min"
+    assert prefilter.evaluate(_item("Sony A7M4", area="Xinjiang Urumqi")).reason == "blocked_region:Xinjiang"
+
+    assert prefilter.stats["pass"] == 1
+    assert prefilter.summary().startswith("1 passed, 5 rejected")
+
+
+def test_prefilter_without_rules_is_disabled():
+    assert Prefilter.from_config(None) is None
+    assert Prefilter.from_config({"include_keywords": [], "min_price": ""}) is None
+
+
+def test_regex_strings_are_not_split_on_commas():
+    prefilter = Prefilter.from_config({"include_regex": r"a7m\d{1,2}", "exclude_keywords": "broken,rental"})
+
+    assert [p.pattern for p in prefilter.include_regex] == [r"a7m\d{1,2}"]
+    assert prefilter.exclude_keywords == ["broken", "rental"]
+    assert prefilter.evaluate(_item("Sony A7M4 body")).passed
+
+
+def test_invalid_regex_is_a_validation_error():
+    with pytest.raises(PrefilterError, match="exclude_regex"):
+        Prefilter.from_config({"exclude_regex": ["(unclosed"]})
+    with pytest.raises(ValidationError, match="Invalid prefilter include_regex pattern"):
+        TaskUpdate(prefilter={"include_regex": "[a-"})
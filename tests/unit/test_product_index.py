@@ -0,0 +1,83 @@
+import json
+
+from src.infrastructure.persistence.sqlite_product_index import SqliteProductIndex
+
+
+def _record(task_name, commodity_id, title, price, crawl_time, recommended=None):
+    record = {
+        "Crawl time": crawl_time,
+        "Search keywords": task_name.lower(),
+        "Task name": task_name,
+        "Product information": {
+            "Product title": title,
+            "Current selling price": price,
+            "Product link": f"https://www.goofish.com/item?id={commodity_id}",
+            "commodityID": commodity_id,
+        },
+        "Seller information": {},
+    }
+    if recommended is not None:
+        record["ai_analysis"] = {"is_recommended": recommended}
+    return record
+
+
+def _append(path, *records):
+    with open(path, "a", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def test_sync_is_incremental_and_queries_filter_sort_page(tmp_path):
+    jsonl_dir = tmp_path / "jsonl"
+    jsonl_dir.mkdir()
+    data_file = jsonl_dir / "sony_full_data.jsonl"
+    _append(
+        data_file,
+        _record("Sony", "1", "Sony A7M4 Body", "¥9000", "2024-01-01T10:00:00", True),
+        _record("Sony", "2", "Sony A7M3 Kit", "¥7000", "2024-01-02T10:00:00", False),
+    )
+
+    index = SqliteProductIndex(jsonl_dir=str(jsonl_dir), db_path=str(tmp_path / "index.db"))
+    assert index.sync() == 2
+    assert index.sync() == 0
+
+    _append(data_file, _record("Sony", "3", "Sony A7C", "¥8000", "2024-01-03T10:00:00", True))
+    assert index.sync() == 1
+
+    records, total = index.query(sort_by="price", sort_order="asc", page=1, limit=2)
+    assert total == 3
+    assert [r["Product information"]["commodityID"] for r in records] == ["2", "3"]
+
+    records, total = index.query(search="a7m", is_recommended=True)
+    assert total == 1
+    assert records[0]["Product information"]["commodityID"] == "1"
+
+    records, total = index.query(min_price=7500, max_price=8500, task_names={"Sony"})
+    assert total == 1
+    assert index.query(task_names=set())[1] == 0
+
+    assert index.get_by_product_id("Sony_3")["Product information"]["Product title"] == "Sony A7C"
+
+
+def test_sync_rebuilds_truncated_and_drops_deleted_files(tmp_path):
+    jsonl_dir = tmp_path / "jsonl"
+    jsonl_dir.mkdir()
+    data_file = jsonl_dir / "sony_full_data.jsonl"
+    _append(
+        data_file,
+        _record("Sony", "1", "Sony A7M4 Body", "¥9000", "2024-01-01T10:00:00"),
+        _record("Sony", "2", "Sony A7M3 Kit", "¥7000", "2024-01-02T10:00:00"),
+    )
+    index = SqliteProductIndex(jsonl_dir=str(jsonl_dir), db_path=str(tmp_path / "index.db"))
+    index.sync()
+
+    data_file.write_text("", encoding="utf-8")
+    _append(data_file, _record("Sony", "9", "Sony FX3", "¥20000", "2024-02-01T10:00:00"))
+    index.sync()
+    records, total = index.query()
+    assert total == 1
+    assert records[0]["Product information"]["commodityID"] == "9"
+
+    data_file.unlink()
+    index.sync()
+    assert index.query()[1] == 0
@@ -0,0 +1,75 @@
+import asyncio
+import sqlite3
+import threading
+
+from src.rate_governor import RateGovernor, RateUsage
+
+
+def test_buckets_refill_and_are_keyed_by_account_and_proxy(tmp_path):
+    governor = RateGovernor(str(tmp_path / "rate.db"), rates={"detail": 6, "search": 0}, burst=2)
+
+    assert governor.try_take("detail", "acc1.json", None, now=1000) == 0
+    assert governor.try_take("detail", "acc1.json", None, now=1000) == 0
+    # Burst used up: 6 per minute means one token every 10 seconds
+    assert governor.try_take("detail", "acc1.json", None, now=1000) == 10
+    assert governor.try_take("detail", "acc1.json", None, now=1005) == 5
+    assert governor.try_take("detail", "acc1.json", None, now=1010) == 0
+
+    # Another proxy or account has its own bucket, unlimited kinds never wait
+    assert governor.try_take("detail", "acc1.json", "http://p1:8080", now=1010) == 0
+    assert governor.try_take("detail", "acc2.json", None, now=1010) == 0
+    assert governor.try_take("search", "acc1.json", None, now=1010) == 0
+    governor.close()
+
+
+def test_buckets_are_shared_between_governor_instances(tmp_path):
+    db_path = str(tmp_path / "rate.db")
+    first = RateGovernor(db_path, rates={"profile": 60}, burst=1, jitter=0)
+    second = RateGovernor(db_path, rates={"profile": 60}, burst=1, jitter=0)
+
+    first_usage, second_usage = RateUsage(), RateUsage()
+
+    async def run():
+        await first.acquire("profile", "acc.json", usage=first_usage)
+        return await second.acquire("profile", "acc.json", usage=second_usage)
+
+    waited = asyncio.run(run())
+    assert 0.5 < waited <= 1.1
+    # Each run reports only its own requests
+    assert first_usage.summary() == "profile 1 granted / 0s waited"
+    assert second_usage.summary().startswith("profile 1 granted")
+    first.close()
+    second.close()
+
+
+def test_acquire_waits_for_a_locked_bucket_off_the_event_loop(tmp_path):
+    db_path = str(tmp_path / "rate.db")
+    governor = RateGovernor(db_path, rates={"search": 60}, burst=1, jitter=0)
+    governor.try_take("search", "acc.json", now=0)  # creates the table
+
+    # Another process holds the write lock for a moment
+    other = sqlite3.connect(db_path, isolation_level=None, check_same_thread=False)
+    other.execute("BEGIN IMMEDIATE")
+    release = threading.Timer(0.3, lambda: other.execute("COMMIT"))
+
+    async def run():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticking = asyncio.create_task(ticker())
+        release.start()
+        await governor.acquire("search", "acc.json")
+        ticking.cancel()
+        return ticks
+
+    try:
+        assert asyncio.run(run()) >= 10
+    finally:
+        release.join()
+        other.close()
+        governor.close()
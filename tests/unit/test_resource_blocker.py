@@ -0,0 +1,78 @@
+import asyncio
+
+from src.resource_blocker import PageTraffic, ResourceBlocker
+
+
+class FakeRequest:
+    def __init__(self, url, resource_type):
+        self.url = url
+        self.resource_type = resource_type
+
+
+class FakeRoute:
+    def __init__(self, request):
+        self.request = request
+        self.outcome = None
+
+    async def abort(self, error_code=None):
+        self.outcome = "aborted"
+
+    async def continue_(self):
+        self.outcome = "continued"
+
+
+class FakeResponse:
+    def __init__(self, size):
+        self.headers = {"content-length": str(size)}
+
+
+class FakePage:
+    def __init__(self):
+        self.route_handler = None
+        self.listeners = {}
+
+    async def route(self, pattern, handler):
+        self.route_handler = handler
+
+    def on(self, event, handler):
+        self.listeners[event] = handler
+
+    async def load(self, url, resource_type, size=0):
+        request = FakeRequest(url, resource_type)
+        self.listeners["request"](request)
+        route = FakeRoute(request)
+        if self.route_handler:
+            await self.route_handler(route)
+        if route.outcome != "aborted":
+            self.listeners["response"](FakeResponse(size))
+        return route.outcome
+
+
+def test_should_block_respects_types_patterns_and_allow_list():
+    blocker = ResourceBlocker(deny_patterns="mmstat.com", allow_patterns=["mtop."])
+
+    assert blocker.should_block("image", "https://img.alicdn.com/a.jpg")
+    assert blocker.should_block("script", "https://log.mmstat.com/v.gif")
+    assert not blocker.should_block("script", "https://g.alicdn.com/app.js")
+    assert not blocker.should_block("image", "https://h5api.m.goofish.com/h5/mtop.x/1.0/")
+
+
+def test_attach_blocks_per_page_kind_and_counts_traffic():
+    blocker = ResourceBlocker(pages="detail")
+    run_traffic = PageTraffic(kind="run")
+    page = FakePage()
+
+    async def run():
+        detail = await blocker.attach(page, "detail", parent=run_traffic)
+        assert await page.load("https://img.alicdn.com/a.jpg", "image") == "aborted"
+        assert await page.load("https://h5api.m.goofish.com/h5/mtop.detail", "fetch", size=2048) == "continued"
+
+        # The same pooled page reused for a profile visit, where blocking is switched off
+        profile = await blocker.attach(page, "profile", parent=run_traffic)
+        assert await page.load("https://img.alicdn.com/b.jpg", "image", size=1024) == "continued"
+        return detail, profile
+
+    detail, profile = asyncio.run(run())
+    assert (detail.requests, detail.blocked, detail.bytes) == (2, 1, 2048)
+    assert (profile.requests, profile.blocked, profile.bytes) == (1, 0, 1024)
+    assert (run_traffic.requests, run_traffic.blocked, run_traffic.bytes) == (3, 1, 3072)
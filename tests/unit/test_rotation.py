@@ -0,0 +1,93 @@
+import time
+
+from src.rotation import RotationHealthStore, RotationItem, RotationPool
+
+
+def test_failures_back_off_exponentially_and_success_resets(tmp_path):
+    pool = RotationPool(["a.json", "b.json"], blacklist_ttl=60, name="account")
+    item = pool.items[0]
+
+    pool.mark_bad(item, "FAIL_SYS_USER_VALIDATE")
+    first = pool.health["a.json"].cooldown_until - time.time()
+    pool.mark_bad(item, "TimeoutError")
+    second = pool.health["a.json"].cooldown_until - time.time()
+
+    assert 55 < first <= 60 and 115 < second <= 120
+    assert [i.value for i in pool.available_items()] == ["b.json"]
+    assert pool.health["a.json"].validation_hits == 1
+
+    pool.mark_good(item)
+    assert pool.health["a.json"].failure_streak == 0
+    assert len(pool.available_items()) == 2
+
+
+def test_weights_favour_healthy_fast_items():
+    pool = RotationPool(["fast", "slow", "risky"], blacklist_ttl=0, name="proxy")
+    fast, slow, risky = pool.items
+    for _ in range(5):
+        pool.observe_latency(fast, 1.0)
+        pool.observe_latency(slow, 4.0)
+        pool.observe_latency(risky, 1.0)
+    pool.mark_bad(risky, "baxia-dialog")
+
+    assert pool.weight(fast, reference_latency=2.0) > pool.weight(slow, reference_latency=2.0)
+    assert pool.weight(fast, reference_latency=2.0) > pool.weight(risky, reference_latency=2.0)
+    # blacklist_ttl 0 keeps the old "never blacklist" behaviour
+    assert len(pool.available_items()) == 3
+
+
+def test_health_persists_across_pools(tmp_path):
+    store = RotationHealthStore(str(tmp_path / "health.db"))
+    pool = RotationPool(["a.json"], blacklist_ttl=300, name="account", store=store)
+    pool.observe_latency(pool.items[0], 2.5)
+    pool.mark_bad(pool.items[0], "FAIL_SYS_USER_VALIDATE")
+
+    reloaded = RotationPool(["a.json"], blacklist_ttl=300, name="account", store=store)
+    snapshot = reloaded.snapshot()["a.json"]
+    assert snapshot["validation_hits"] == 1 and snapshot["latency_p50"] == 2.5
+    assert snapshot["success_ewma"] < 1
+    assert snapshot["failure_streak"] == 1 and snapshot["cooldown_until"] > time.time() + 290
+
+    # The streak carries over, so the next run's failure cools down longer
+    reloaded.mark_bad(reloaded.items[0], "TimeoutError")
+    assert reloaded.health["a.json"].cooldown_until > time.time() + 590
+    # The whole pool is cooling down: its only account is still used rather than none
+    assert reloaded.available_items() == []
+    assert reloaded.pick_random() is reloaded.items[0]
+    assert RotationPool(["a.json"], name="proxy", store=store).pick_random() == RotationItem("a.json")
+    store.close()
+
+
+def test_concurrent_pools_do_not_overwrite_each_others_outcomes(tmp_path):
+    db_path = str(tmp_path / "health.db")
+    first_store, second_store = RotationHealthStore(db_path), RotationHealthStore(db_path)
+    first = RotationPool(["a.json"], name="account", store=first_store)
+    second = RotationPool(["a.json"], name="account", store=second_store)
+
+    # Both pools loaded the same (empty) history before either recorded anything
+    first.observe_latency(first.items[0], 1.0)
+    first.mark_bad(first.items[0], "FAIL_SYS_USER_VALIDATE")
+    second.observe_latency(second.items[0], 3.0)
+    second.mark_bad(second.items[0], "baxia-dialog")
+
+    stored = RotationPool(["a.json"], name="account", store=first_store).snapshot()["a.json"]
+    assert stored["validation_hits"] == 2
+    assert stored["success_ewma"] == round((1 - 0.3) ** 2, 4)
+    assert sorted(second.health["a.json"].latencies) == [1.0, 3.0]
+    first_store.close()
+    second_store.close()
+
+
+def test_cooled_down_pool_falls_back_to_the_item_recovering_first():
+    pool = RotationPool(["a.json", "b.json", "c.json"], blacklist_ttl=60, name="account")
+    a, b, c = pool.items
+    pool.mark_bad(a, "TimeoutError")
+    pool.mark_bad(a, "TimeoutError")
+    pool.mark_bad(b, "TimeoutError")
+    pool.mark_bad(c, "TimeoutError")
+    pool.mark_bad(c, "TimeoutError")
+    pool.mark_bad(c, "TimeoutError")
+
+    assert pool.available_items() == []
+    assert pool.pick_random() is b
+    assert RotationPool([], name="proxy").pick_random() is None
@@ -0,0 +1,41 @@
+import asyncio
+
+from src.domain.models.task import Task
+from src.run_history import RunHistory
+from src.services.scheduler_service import SchedulerService
+
+
+def _record_hourly(history, task_name, new_items_per_run, start=1_000_000.0):
+    for i, new_items in enumerate(new_items_per_run):
+        started = start + i * 3600
+        history.record(task_name, started, started + 120, new_items)
+
+
+def test_arrival_rate_and_interval_bounds(tmp_path):
+    history = RunHistory(str(tmp_path / "runs.db"))
+    _record_hourly(history, "hot", [5, 12, 12, 12])
+    _record_hourly(history, "quiet", [3, 0, 0, 0])
+    history.record("flaky", 1_000_000, 1_000_100, 0, succeeded=False)
+
+    assert history.arrival_rate("hot") == 12
+    assert history.arrival_rate("flaky") is None
+    # 3 new items wanted per run at 12 per hour -> every 15 minutes, clamped by the bounds
+    assert history.suggest_interval("hot", 10, 360, target_items=3) == 15
+    assert history.suggest_interval("hot", 30, 360, target_items=3) == 30
+    assert history.suggest_interval("quiet", 10, 360, target_items=3) == 360
+    assert history.suggest_interval("flaky", 10, 360, target_items=3) == 60
+    history.close()
+
+
+def test_scheduler_uses_task_bounds_for_adaptive_interval(tmp_path):
+    history = RunHistory(str(tmp_path / "runs.db"))
+    _record_hourly(history, "hot", [5, 60, 60])
+    scheduler = SchedulerService(process_service=None, run_history=history)
+    task = Task(
+        id=1, task_name="hot", enabled=True, keyword="hot", max_pages=1, personal_only=True,
+        ai_prompt_base_file="base.txt", ai_prompt_criteria_file="criteria.txt",
+        adaptive_schedule=True, min_interval_minutes=5, max_interval_minutes=120,
+    )
+
+    assert asyncio.run(scheduler.adaptive_interval(task)) == 5
+    history.close()
@@ -0,0 +1,95 @@
+import asyncio
+
+from src.domain.models.task import Task
+from src.infrastructure.config.settings import SchedulerSettings
+from src.services import scheduler_service
+from src.services.scheduler_service import SchedulerService
+
+
+class FakeRun:
+    returncode = None
+
+
+class FakeProcessService:
+    def __init__(self):
+        self.processes = {}
+        self.started = []
+
+    def is_running(self, task_id):
+        process = self.processes.get(task_id)
+        return process is not None and process.returncode is None
+
+    async def start_task(self, task_id, task_name):
+        self.processes[task_id] = FakeRun()
+        self.started.append(task_name)
+        return True
+
+
+def _task(task_id, name, priority=0, account=None):
+    return Task(
+        id=task_id, task_name=name, enabled=True, keyword=name, max_pages=1, personal_only=True,
+        ai_prompt_base_file="base.txt", ai_prompt_criteria_file="criteria.txt",
+        account_state_file=account, priority=priority,
+    )
+
+
+def test_queue_respects_priority_caps_and_coalesces():
+    processes = FakeProcessService()
+    scheduler = SchedulerService(processes, max_concurrent=2, max_per_account=1, jitter_seconds=0, start_spacing=0)
+
+    async def run():
+        await scheduler.reload_jobs([
+            _task(1, "low", priority=0, account="a.json"),
+            _task(2, "high", priority=5, account="a.json"),
+            _task(3, "other", priority=1, account="b.json"),
+            _task(4, "third", priority=0, account="c.json"),
+        ])
+        for task_id, name in [(1, "low"), (2, "high"), (3, "other"), (4, "third")]:
+            scheduler.enqueue(task_id, name)
+        assert scheduler.enqueue(2, "high") is False
+        await asyncio.sleep(0.05)
+        started_first = list(processes.started)
+
+        # "high" finishes: the account slot of a.json frees up, "third" still waits for the global cap
+        processes.processes[2].returncode = 0
+        scheduler._wakeup.set()
+        await asyncio.sleep(0.05)
+        started_after = list(processes.started)
+        queued = [queued_run.task_name for queued_run in scheduler.queue]
+        scheduler.stop()
+        return started_first, started_after, queued
+
+    started_first, started_after, queued = asyncio.run(run())
+    assert started_first == ["high", "other"]
+    assert started_after == ["high", "other", "low"]
+    assert queued == ["third"]
+
+
+def test_queue_limits_come_from_the_env_file(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for name in ("SCHEDULER_MAX_CONCURRENT_TASKS", "ADAPTIVE_TARGET_NEW_ITEMS"):
+        monkeypatch.delenv(name, raising=False)
+    (tmp_path / ".env").write_text("SCHEDULER_MAX_CONCURRENT_TASKS=5\nADAPTIVE_TARGET_NEW_ITEMS=7\n")
+    monkeypatch.setattr(scheduler_service, "scheduler_settings", SchedulerSettings())
+
+    scheduler = SchedulerService(FakeProcessService(), run_history=object())
+    assert scheduler.max_concurrent == 5
+    assert scheduler.adaptive_target_items == 7
+
+
+def test_tasks_without_a_fixed_account_run_concurrently():
+    processes = FakeProcessService()
+    scheduler = SchedulerService(processes, max_concurrent=3, max_per_account=1, jitter_seconds=0, start_spacing=0)
+
+    async def run():
+        await scheduler.reload_jobs([_task(1, "rotating"), _task(2, "default"), _task(3, "pinned", account="a.json")])
+        for task_id, name in [(1, "rotating"), (2, "default"), (3, "pinned")]:
+            scheduler.enqueue(task_id, name)
+        await asyncio.sleep(0.05)
+        queued = [queued_run.task_name for queued_run in scheduler.queue]
+        scheduler.stop()
+        return processes.started, queued
+
+    started, queued = asyncio.run(run())
+    assert sorted(started) == ["default", "pinned", "rotating"]
+    assert queued == []
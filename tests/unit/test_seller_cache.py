@@ -0,0 +1,36 @@
+from src import seller_cache
+from src.seller_cache import SellerProfileCache
+
+
+def test_sections_expire_independently(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(seller_cache.time, "time", lambda: now[0])
+    cache = SellerProfileCache(str(tmp_path / "sellers.db"), head_ttl=60, ratings_ttl=600)
+
+    assert cache.get("42", "head") is None
+    cache.put("42", "head", {"Seller nickname": "a"})
+    cache.put("42", "ratings", {"List of reviews received by the seller": []})
+
+    now[0] += 120
+    assert cache.get("42", "head") is None
+    assert cache.get("42", "ratings") == {"List of reviews received by the seller": []}
+
+    stats = cache.stats()
+    assert stats["sellers"] == 1
+    assert stats["head"]["hits"] == 0 and stats["head"]["misses"] == 2
+    assert stats["ratings"]["hits"] == 1
+
+
+def test_lease_is_shared_across_cache_instances(tmp_path):
+    db_path = str(tmp_path / "sellers.db")
+    first = SellerProfileCache(db_path)
+    second = SellerProfileCache(db_path)
+
+    assert first.try_claim("42", "head") is True
+    assert second.try_claim("42", "head") is False
+
+    first.put("42", "head", {"Seller nickname": "a"})
+    assert second.get("42", "head") == {"Seller nickname": "a"}
+    assert second.try_claim("42", "head") is True
+    second.release("42", "head")
+    assert first.try_claim("42", "head") is True
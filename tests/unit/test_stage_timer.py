@@ -0,0 +1,74 @@
+import asyncio
+import sqlite3
+
+from src.run_history import RunHistory
+from src.stage_timer import StageTimer, prometheus_text
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_stages_are_collected_per_run_and_per_item():
+    clock = FakeClock()
+    timer = StageTimer("camera", clock=clock)
+
+    async def item(key, detail_seconds):
+        with timer.item(key):
+            with timer.stage("detail_fetch"):
+                clock.now += detail_seconds
+            await asyncio.sleep(0)
+            with timer.stage("ai_analysis"):
+                clock.now += 1
+
+    async def run():
+        with timer.stage("browser_launch"):
+            clock.now += 2
+        await asyncio.gather(asyncio.create_task(item("a", 3)), asyncio.create_task(item("b", 5)))
+
+    asyncio.run(run())
+    summary = timer.summary(pages_skipped=1)
+
+    assert list(summary["stages"]) == ["browser_launch", "detail_fetch", "ai_analysis"]
+    assert summary["stages"]["detail_fetch"]["count"] == 2
+    assert summary["stages"]["detail_fetch"]["total_seconds"] == 8
+    assert summary["stages"]["detail_fetch"]["max_seconds"] == 5
+    assert {entry["key"]: entry["stages"] for entry in summary["slowest_items"]} == {
+        "a": {"detail_fetch": 3, "ai_analysis": 1},
+        "b": {"detail_fetch": 5, "ai_analysis": 1},
+    }
+    assert summary["wall_seconds"] == 12 and summary["pages_skipped"] == 1
+
+
+def test_run_history_serves_stage_summaries_as_prometheus_text(tmp_path):
+    db_path = str(tmp_path / "runs.db")
+    # A history written before stage timing existed gains the column on open
+    legacy = sqlite3.connect(db_path)
+    legacy.execute(
+        "CREATE TABLE task_runs (id INTEGER PRIMARY KEY AUTOINCREMENT, task_name TEXT NOT NULL, started_at REAL NOT NULL, "
+        "finished_at REAL NOT NULL, new_items INTEGER NOT NULL, succeeded INTEGER NOT NULL)"
+    )
+    legacy.execute("INSERT INTO task_runs (task_name, started_at, finished_at, new_items, succeeded) VALUES ('old', 1, 2, 0, 1)")
+    legacy.commit()
+    legacy.close()
+
+    history = RunHistory(db_path)
+    stats = {"wall_seconds": 42.5, "stages": {"detail_fetch": {"count": 3, "total_seconds": 12.0, "p95_seconds": 5.5, "max_seconds": 6.0}}}
+    history.record("camera", 100, 150, 3, stats=stats)
+    history.record("camera", 200, 240, 1, stats={**stats, "wall_seconds": 40.0})
+
+    runs = history.run_summaries("camera")
+    assert [run["started_at"] for run in runs] == [200, 100]
+    latest = history.latest_summaries()
+    assert [(run["task_name"], run.get("wall_seconds")) for run in latest] == [("camera", 40.0), ("old", None)]
+    history.close()
+
+    text = prometheus_text(latest)
+    assert '# TYPE goofish_stage_seconds gauge' in text
+    assert 'goofish_stage_seconds{task="camera",stage="detail_fetch"} 12.0' in text
+    assert 'goofish_run_new_items{task="camera"} 1.0' in text
+    assert 'goofish_run_wall_seconds{task="old"}' not in text
@@ -0,0 +1,116 @@
+import io
+import json
+
+import pytest
+
+from src import structured_log
+from src.log_rotation import LogSegments
+from src.stage_timer import StageTimer
+
+
+@pytest.fixture(autouse=True)
+def _reset_log_settings(monkeypatch):
+    # Every test configures its own mode; the next one starts from the environment again
+    monkeypatch.setattr(structured_log, "_settings", None)
+
+
+def _events(text):
+    return [json.loads(line) for line in text.splitlines()]
+
+
+def test_json_mode_writes_one_event_per_line_and_filters_by_level(capsys):
+    structured_log.configure("json", "info")
+    structured_log.set_task("Sony A7M4")
+
+    structured_log.log_event("scrolling...", "debug")
+    with structured_log.item_context("item-1"):
+        structured_log.log_event("fetched", stage="detail_fetch", duration=1.23456, outcome="ok")
+    structured_log.log_event("notify failed", "warning")
+
+    events = _events(capsys.readouterr().out)
+    assert [event["level"] for event in events] == ["info", "warning"]
+    assert events[0]["task"] == "Sony A7M4"
+    assert events[0]["item_id"] == "item-1"
+    assert (events[0]["stage"], events[0]["duration"], events[0]["outcome"]) == ("detail_fetch", 1.235, "ok")
+    assert "item_id" not in events[1]
+
+
+def test_text_mode_prints_messages_and_skips_structured_only_events(capsys):
+    structured_log.configure("text", "")
+
+    structured_log.log_event("   [Delay] wait 1.00 Second...", "debug", stage="delay", duration=1.0)
+    structured_log.log_event(structured_only=True, stage="search", duration=0.5, outcome="ok")
+
+    assert capsys.readouterr().out == "   [Delay] wait 1.00 Second...\n"
+
+    structured_log.configure("text", "warning")
+    structured_log.log_event("scrolling...", "debug")
+    assert capsys.readouterr().out == ""
+
+
+def test_json_line_stream_wraps_plain_print_output():
+    structured_log.configure("json", "info")
+    target = io.StringIO()
+    stream = structured_log.JsonLineStream(target)
+
+    stream.write("LOG: plain ")
+    stream.write("line\n\n")
+    stream.write(json.dumps({"level": "error", "msg": "already an event"}) + "\n")
+
+    events = _events(target.getvalue())
+    assert [(event["level"], event["msg"]) for event in events] == [
+        ("info", "LOG: plain line"),
+        ("error", "already an event"),
+    ]
+
+
+def test_stage_timer_emits_stage_events_with_outcome(capsys):
+    structured_log.configure("json", "info")
+    timer = StageTimer("task")
+
+    with timer.item("item-9"):
+        with timer.stage("detail_fetch"):
+            pass
+        with pytest.raises(RuntimeError):
+            with timer.stage("ai_analysis"):
+                raise RuntimeError("boom")
+
+    events = _events(capsys.readouterr().out)
+    assert [(e["stage"], e["outcome"], e["item_id"]) for e in events] == [
+        ("detail_fetch", "ok", "item-9"),
+        ("ai_analysis", "error", "item-9"),
+    ]
+    assert timer.summary()["stages"]["ai_analysis"]["count"] == 1
+
+
+def test_filtered_tail_pages_through_matching_events(tmp_path):
+    structured_log.configure("json", "debug")
+    log_path = tmp_path / "task_1.log"
+    lines = []
+    for i in range(30):
+        level = "warning" if i % 7 == 0 else "debug"
+        stage = "search" if i % 5 == 0 else "delay"
+        lines.append(json.dumps(structured_log.build_event(f"event {i}", level, stage=stage)))
+        lines.append(f"plain text line {i}")
+    log_path.write_text("\n".join(lines) + "\n")
+    segments = LogSegments(str(log_path))
+
+    def matcher(**filters):
+        return lambda line: structured_log.event_matches(line, **filters)
+
+    page, has_more, next_offset, _ = segments.tail_matching(0, 3, matcher(min_level="warning"), page_lines=4)
+    assert [json.loads(line)["msg"] for line in page] == ["event 14", "event 21", "event 28"]
+    assert has_more
+    # next_offset counts raw lines from the end, so it resumes right before "event 14"
+    assert next_offset == len(lines) - lines.index(page[0])
+
+    page, has_more, _, _ = segments.tail_matching(next_offset, 3, matcher(min_level="warning"), page_lines=4)
+    assert [json.loads(line)["msg"] for line in page] == ["event 0", "event 7"]
+    assert not has_more
+
+    page, _, _, _ = segments.tail_matching(0, 100, matcher(stage="search"))
+    assert [json.loads(line)["msg"] for line in page] == [f"event {i}" for i in range(0, 30, 5)]
+
+    # The scan cap bounds the work of a filter that matches nothing
+    page, has_more, next_offset, _ = segments.tail_matching(0, 5, matcher(stage="missing"), max_scan_lines=25)
+    assert (page, has_more, next_offset) == ([], True, 25)
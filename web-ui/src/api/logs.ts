@@ -1,6 +1,9 @@
 import { http } from '@/lib/http'
 
-export async function getLogs(fromPos: number = 0, taskId?: number | null): Promise<{ new_content: string; new_pos: number }> {
+export async function getLogs(
+  fromPos: number = 0,
+  taskId?: number | null
+): Promise<{ new_content: string; new_pos: number; has_more?: boolean; file_size?: number }> {
   const params: Record<string, number> = { from_pos: fromPos }
   if (taskId !== null && taskId !== undefined) {
     params.task_id = taskId
@@ -1,5 +1,6 @@
 import { ref, onMounted, onUnmounted } from 'vue'
 import * as logsApi from '@/api/logs'
+import { wsService } from '@/services/websocket'
 
 export function useLogs() {
   const logs = ref('')
@@ -13,8 +14,11 @@ export function useLogs() {
   const error = ref<Error | null>(null)
   
   let refreshInterval: number | null = null
+  // Task whose log is pushed over the WebSocket; polling is only the fallback while disconnected
+  let subscribedTaskId: number | null = null
   const MAX_LOG_CHARS = 200_000
   const TRIM_LOG_CHARS = 150_000
+  const MAX_CATCH_UP_PAGES = 8
   const TRIM_NOTICE = '...The log is too long and has been truncated. Only the latest content is retained....'
 
   function appendLogs(content: string) {
@@ -31,21 +35,34 @@ export function useLogs() {
     if (isLoading.value) return
     if (currentTaskId.value === null) return
     isLoading.value = true
+    let reloadTail = false
     try {
-      const data = await logsApi.getLogs(currentPos.value, currentTaskId.value)
-      if (data.new_pos < currentPos.value) {
-        // Log file rotated or cleared.
-        logs.value = ''
+      // Each response is capped by the server; follow the cursor while there is more
+      for (let page = 0; page < MAX_CATCH_UP_PAGES; page++) {
+        const data = await logsApi.getLogs(currentPos.value, currentTaskId.value)
+        if (data.new_pos < currentPos.value) {
+          // Log file rotated or cleared.
+          logs.value = ''
+        }
+        if (data.new_content) {
+          appendLogs(data.new_content)
+        }
+        currentPos.value = data.new_pos
+        if (!data.has_more) break
+        if ((data.file_size ?? 0) - data.new_pos > MAX_LOG_CHARS) {
+          // Far behind: more than the view keeps anyway, jump to the tail instead
+          reloadTail = true
+          break
+        }
       }
-      if (data.new_content) {
-        appendLogs(data.new_content)
-      }
-      currentPos.value = data.new_pos
     } catch (e) {
       if (e instanceof Error) error.value = e
     } finally {
       isLoading.value = false
     }
+    if (reloadTail) {
+      await loadLatest()
+    }
   }
 
   async function loadLatest(limitLines: number = 50) {
@@ -63,6 +80,10 @@ export function useLogs() {
     } finally {
       isFetchingHistory.value = false
     }
+    // Continue the live stream from the position just loaded
+    if (isAutoRefresh.value && subscribe()) {
+      stopPolling()
+    }
   }
 
   async function loadPrevious(limitLines: number = 50) {
@@ -99,18 +120,74 @@ export function useLogs() {
     }
   }
 
-  function startAutoRefresh() {
+  function subscribe(): boolean {
+    if (currentTaskId.value === null) return false
+    const sent = wsService.send({
+      action: 'subscribe_logs',
+      task_id: currentTaskId.value,
+      from_pos: currentPos.value,
+    })
+    subscribedTaskId = sent ? currentTaskId.value : null
+    return sent
+  }
+
+  function unsubscribe() {
+    if (subscribedTaskId === null) return
+    wsService.send({ action: 'unsubscribe_logs', task_id: subscribedTaskId })
+    subscribedTaskId = null
+  }
+
+  function startPolling() {
     if (refreshInterval) return
-    fetchLogs() // Fetch immediately
     refreshInterval = window.setInterval(fetchLogs, 2000)
-    isAutoRefresh.value = true
   }
 
-  function stopAutoRefresh() {
+  function stopPolling() {
     if (refreshInterval) {
       clearInterval(refreshInterval)
       refreshInterval = null
     }
+  }
+
+  function onLogDelta(data: { task_id: number; content: string; new_pos: number }) {
+    if (data.task_id !== subscribedTaskId) return
+    appendLogs(data.content)
+    currentPos.value = data.new_pos
+  }
+
+  function onLogReset(data: { task_id: number }) {
+    if (data.task_id !== subscribedTaskId) return
+    // Log file cleared or truncated
+    logs.value = ''
+    currentPos.value = 0
+  }
+
+  function onLogResync(data: { task_id: number }) {
+    if (data.task_id !== subscribedTaskId) return
+    // Fell too far behind the stream: reload the tail instead of the missed chunks
+    loadLatest()
+  }
+
+  function onConnected() {
+    if (!isAutoRefresh.value) return
+    if (subscribe()) stopPolling()
+  }
+
+  function onDisconnected() {
+    subscribedTaskId = null
+    if (isAutoRefresh.value) startPolling()
+  }
+
+  async function startAutoRefresh() {
+    isAutoRefresh.value = true
+    await fetchLogs() // Catch up immediately
+    if (!isAutoRefresh.value) return
+    if (!subscribe()) startPolling()
+  }
+
+  function stopAutoRefresh() {
+    stopPolling()
+    unsubscribe()
     isAutoRefresh.value = false
   }
 
@@ -124,6 +201,7 @@ export function useLogs() {
 
   function setTaskId(taskId: number | null) {
     if (currentTaskId.value === taskId) return
+    unsubscribe()
     currentTaskId.value = taskId
     logs.value = ''
     currentPos.value = 0
@@ -132,11 +210,21 @@ export function useLogs() {
   }
 
   onMounted(() => {
+    wsService.on('log_delta', onLogDelta)
+    wsService.on('log_reset', onLogReset)
+    wsService.on('log_resync', onLogResync)
+    wsService.on('connected', onConnected)
+    wsService.on('disconnected', onDisconnected)
     startAutoRefresh()
   })
 
   onUnmounted(() => {
     stopAutoRefresh()
+    wsService.off('log_delta', onLogDelta)
+    wsService.off('log_reset', onLogReset)
+    wsService.off('log_resync', onLogResync)
+    wsService.off('connected', onConnected)
+    wsService.off('disconnected', onDisconnected)
   })
 
   return {
@@ -79,6 +79,15 @@ class WebSocketService {
     };
   }
 
+  public send(message: object): boolean {
+    // Only delivered while connected; callers re-send their subscriptions on 'connected'
+    if (!this.ws || this.ws.readyState !== WebSocket.OPEN) {
+      return false;
+    }
+    this.ws.send(JSON.stringify(message));
+    return true;
+  }
+
   public on(event: string, handler: WebSocketEventHandler) {
     if (!this.listeners.has(event)) {
       this.listeners.set(event, []);